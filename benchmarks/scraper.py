@@ -0,0 +1,238 @@
+"""
+Offline benchmarks for the parse and save stages of `news/news_scraper.py`.
+
+The parse stage runs both extractors over pages built from the recorded Hacker
+News listing in `benchmarks/fixtures/`, grown to several sizes by repeating its
+rows with fresh ids. The save and pipeline stages run against a local stand-in
+for the news API and the news sources, so no network access or database is
+needed. Every stage reports items/sec and wall time; the parse stage also
+reports peak memory, and the save and pipeline stages the HTTP requests they
+issued.
+
+Usage:
+    python -m benchmarks.scraper [--sizes 30 300 3000] [--repeat 5] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from news.news_scraper import (
+    SAVE_BATCH_SIZE,
+    Source,
+    parse_hacker_news,
+    parse_hacker_news_soup,
+    run,
+    save_news,
+)
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+ENGINES = {"streaming": parse_hacker_news, "soup": parse_hacker_news_soup}
+ROW_START = "<tr class='athing'"
+ROWS_END = '<tr class="morespace"'
+
+
+def build_page(rows: int) -> str:
+    """Returns the recorded front page grown (or cut) to `rows` stories."""
+    page = (FIXTURES / "hn_front.html").read_text(encoding="utf-8")
+    start, end = page.index(ROW_START), page.index(ROWS_END)
+    recorded = [ROW_START + row for row in page[start:end].split(ROW_START)[1:]]
+    stories = []
+    for index in range(rows):
+        copy, row = divmod(index, len(recorded))
+        stories.append(
+            re.sub(
+                r"4050\d{4}",
+                lambda match: str(int(match.group()) + copy * 100000),
+                recorded[row],
+            )
+        )
+    return page[:start] + "".join(stories) + page[end:]
+
+
+def peak_memory(function, *args):
+    """Returns the peak memory in KiB allocated while running `function(*args)`."""
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def result(stage, variant, items, seconds, memory_kib=None, requests=None):
+    return {
+        "stage": stage,
+        "variant": variant,
+        "items": items,
+        "time_ms": round(seconds * 1000, 3),
+        "items_per_sec": round(items / seconds) if seconds else None,
+        "peak_kib": round(memory_kib, 1) if memory_kib is not None else None,
+        "requests": dict(requests) if requests is not None else None,
+    }
+
+
+def bench_parse(sizes, repeat):
+    results = []
+    for size in sizes:
+        page = build_page(size)
+        for engine, parse in ENGINES.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                items = parse(page)
+                timings.append(time.perf_counter() - started)
+            results.append(
+                result(
+                    "parse",
+                    f"{engine}/{size}",
+                    len(items),
+                    statistics.median(timings),
+                    peak_memory(parse, page),
+                )
+            )
+    return results
+
+
+class StandIn:
+    """A local replacement for the news API and the news sources.
+
+    Attributes:
+        pages (dict): The HTML served at `/source/<name>`, each with an `ETag`.
+        stored (list): The URLs saved through the API, in insertion order.
+        requests (Counter): The number of requests per endpoint.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.stored = []
+        self.requests = Counter()
+        self.app = web.Application(client_max_size=64 * 1024**2)
+        self.app.router.add_get("/source/{name}", self.source)
+        self.app.router.add_get("/api/async/news/urls/", self.urls)
+        self.app.router.add_post("/api/async/news/bulk/", self.bulk)
+
+    async def source(self, request):
+        self.requests["GET source"] += 1
+        name = request.match_info["name"]
+        etag = f'"{name}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(
+            text=self.pages[name], content_type="text/html", headers={"ETag": etag}
+        )
+
+    async def urls(self, request):
+        self.requests["GET /api/async/news/urls/"] += 1
+        after = int(request.query["after"])
+        return web.json_response(
+            {"urls": self.stored[after:], "last_id": len(self.stored), "more": False}
+        )
+
+    async def bulk(self, request):
+        self.requests["POST /api/async/news/bulk/"] += 1
+        items = await request.json()
+        if len(items) > SAVE_BATCH_SIZE:
+            return web.json_response({"message": "Batch too large."}, status=400)
+        known = set(self.stored)
+        created = [item["url"] for item in items if item["url"] not in known]
+        self.stored.extend(created)
+        return web.json_response(
+            {"created": len(created), "skipped": len(items) - len(created)}, status=201
+        )
+
+
+async def bench_save(sizes):
+    results = []
+    for size in sizes:
+        items = parse_hacker_news(build_page(size))
+        stand_in = StandIn({})
+        async with TestServer(stand_in.app) as server:
+            api_url = str(server.make_url("")).rstrip("/")
+            async with aiohttp.ClientSession() as session:
+                started = time.perf_counter()
+                await save_news(items, session, api_url)
+                seconds = time.perf_counter() - started
+        results.append(
+            result("save", f"bulk/{size}", len(items), seconds, None, stand_in.requests)
+        )
+    return results
+
+
+async def bench_pipeline(sizes):
+    results = []
+    pages = {f"page-{size}": build_page(size) for size in sizes}
+    stand_in = StandIn(pages)
+    async with TestServer(stand_in.app) as server:
+        api_url = str(server.make_url("")).rstrip("/")
+        sources = [
+            Source(name, str(server.make_url(f"/source/{name}")), parse_hacker_news)
+            for name in pages
+        ]
+        with tempfile.TemporaryDirectory() as state_dir:
+            state_path = str(Path(state_dir) / "state.json")
+            for variant in ["cold", "unchanged"]:
+                stand_in.requests.clear()
+                started = time.perf_counter()
+                fetched = await run(sources, api_url=api_url, state_path=state_path)
+                seconds = time.perf_counter() - started
+                results.append(
+                    result(
+                        "pipeline", variant, fetched, seconds, None, stand_in.requests
+                    )
+                )
+    return results
+
+
+def print_table(results):
+    header = ["stage", "variant", "items", "time_ms", "items/sec", "peak_kib", "requests"]
+    rows = [
+        [
+            entry["stage"],
+            entry["variant"],
+            entry["items"],
+            entry["time_ms"],
+            entry["items_per_sec"] if entry["items_per_sec"] is not None else "-",
+            entry["peak_kib"] if entry["peak_kib"] is not None else "-",
+            (
+                ", ".join(f"{k}={v}" for k, v in entry["requests"].items()) or "0"
+                if entry["requests"] is not None
+                else "-"
+            ),
+        ]
+        for entry in results
+    ]
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 300, 3000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    options = parser.parse_args()
+
+    results = bench_parse(options.sizes, options.repeat)
+    results += asyncio.run(bench_save(options.sizes))
+    results += asyncio.run(bench_pipeline(options.sizes))
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmarks the Telegram bot's update processing against a local stand-in for
+the Bot API.
+
+A burst of updates whose handler takes `--delay` seconds is fed through the
+same path as the webhook view (`telegram_bot.feed_update`), once with updates
+handled one at a time and once with the concurrent cap. Each run reports the
+time until the last reply reached the stand-in, the updates/sec and the Bot API
+requests issued.
+
+Usage:
+    python -m benchmarks.telegram [--updates 100] [--delay 0.05] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from telegram.ext import CommandHandler
+
+from benchmarks.scraper import print_table, result
+from telegram_bot import (
+    MAX_CONCURRENT_UPDATES,
+    build_application,
+    feed_update,
+    stop_application,
+)
+
+TOKEN = "123:fake"
+
+
+def make_update(update_id: int, chat_id: int, text: str) -> dict:
+    """Returns the JSON Telegram sends for a private message, e.g. a command."""
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": {"id": chat_id, "is_bot": False, "first_name": "Reader"},
+        "text": text,
+    }
+    if text.startswith("/"):
+        command = text.split()[0]
+        message["entities"] = [
+            {"type": "bot_command", "offset": 0, "length": len(command)}
+        ]
+    return {"update_id": update_id, "message": message}
+
+
+class FakeTelegram:
+    """A local replacement for the Telegram Bot API.
+
+    Serves `<url>/bot<token>/<method>`; pass `base_url` to a bot built with
+    `telegram_bot.build_application`.
+
+    Attributes:
+        sent (list): The `(chat_id, text)` of every message sent, in order.
+        webhook (dict): The parameters of the last `setWebhook` call.
+        requests (Counter): The number of requests per Bot API method.
+        replied (asyncio.Event): Set when `expected` messages have been sent.
+    """
+
+    def __init__(self, expected: int = None):
+        self.sent = []
+        self.webhook = None
+        self.requests = Counter()
+        self.expected = expected
+        self.replied = asyncio.Event()
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self.method)
+
+    def base_url(self, server: TestServer) -> str:
+        return str(server.make_url("/bot"))
+
+    async def method(self, request):
+        method = request.match_info["method"]
+        self.requests[method] += 1
+        params = dict(await request.post())
+        if method == "getMe":
+            answer = {
+                "id": 1,
+                "is_bot": True,
+                "first_name": "Blogify",
+                "username": "blogify_bot",
+            }
+        elif method == "sendMessage":
+            chat_id = int(params["chat_id"])
+            self.sent.append((chat_id, params["text"]))
+            answer = {
+                "message_id": len(self.sent),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params["text"],
+            }
+            if self.expected and len(self.sent) >= self.expected:
+                self.replied.set()
+        else:
+            if method == "setWebhook":
+                self.webhook = params
+            answer = True
+        return web.json_response({"ok": True, "result": answer})
+
+
+async def bench_updates(updates, delay):
+    results = []
+
+    async def slow(update, context):
+        await asyncio.sleep(delay)
+        await update.message.reply_text("done")
+
+    for variant, concurrency in [("sequential", 1), ("concurrent", MAX_CONCURRENT_UPDATES)]:
+        fake = FakeTelegram(expected=updates)
+        async with TestServer(fake.app) as server:
+            application = build_application(
+                TOKEN, fake.base_url(server), concurrent_updates=concurrency
+            )
+            application.add_handler(CommandHandler("slow", slow))
+            started = time.perf_counter()
+            for update_id in range(1, updates + 1):
+                await feed_update(application, make_update(update_id, update_id, "/slow"))
+            await fake.replied.wait()
+            seconds = time.perf_counter() - started
+            await stop_application(application)
+        results.append(
+            result("updates", f"{variant}/{concurrency}", updates, seconds, None, fake.requests)
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    options = parser.parse_args()
+
+    results = asyncio.run(bench_updates(options.updates, options.delay))
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
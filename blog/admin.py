@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Article, Subscriber
+from .models import Article, Notification, Subscriber
 
 admin.site.register(Article)
 admin.site.register(Subscriber)
+admin.site.register(Notification)
@@ -1,5 +1,4 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
 
 
 class BlogConfig(AppConfig):
@@ -8,5 +7,3 @@ class BlogConfig(AppConfig):
 
     def ready(self) -> None:
         from . import signals
-
-        post_save.connect(signals.article_post_save)
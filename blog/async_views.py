@@ -0,0 +1,145 @@
+"""
+Native async versions of the blog API endpoints, mounted under `/api/async/`.
+
+They serve the same payloads as the DRF views in `blog.views` but run on the
+event loop under ASGI. The article list always uses keyset pages (the `cursor`
+query parameter), which need no `COUNT(*)`.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from decouple import config
+from rest_framework.exceptions import NotFound, PermissionDenied
+from blogify.async_views import AsyncAPIView
+from blogify.fieldsets import SparseFieldsetMixin
+from blogify.pagination import KeysetPagination
+from .cache import aget_latest_article
+from .conditional import add_validators, article_validators, data_validators, not_modified
+from .models import Article, Subscriber
+from .serializers import ArticleSerializer
+from .views import ArticleListCreate
+
+
+class AsyncArticleListCreate(SparseFieldsetMixin, AsyncAPIView):
+    """Lists articles in keyset pages and creates new ones.
+
+    Attributes:
+    - ordering: The keyset ordering, backed by the `(published_date, id)` index.
+    - list_fields: The fields listed by default, as on `ArticleListCreate`.
+    - defer_fields: The body is not loaded unless `?fields=` asks for it."""
+
+    ordering = ArticleListCreate.ordering
+    list_fields = ArticleListCreate.list_fields
+    defer_fields = ArticleListCreate.defer_fields
+
+    def get_serializer_class(self):
+        return ArticleSerializer
+
+    async def get(self, request):
+        await self.get_user(request)
+        fields = self.get_sparse_fields()
+        paginator = KeysetPagination()
+        queryset = self.defer_unused_fields(Article.objects.all(), fields)
+        page = await paginator.apaginate_queryset(queryset, request, self)
+        data = ArticleSerializer(page, many=True, fields=fields).data
+        return JsonResponse(paginator.get_paginated_data(data))
+
+    async def post(self, request):
+        user = await self.get_user(request)
+        serializer = ArticleSerializer(data=self.get_data(request))
+        serializer.is_valid(raise_exception=True)
+        article = await self.create_article(user, serializer.validated_data)
+        return JsonResponse(ArticleSerializer(article).data, status=201)
+
+    @staticmethod
+    @sync_to_async
+    def create_article(author, validated_data):
+        """Saves the article and its notification outbox entry in one transaction.
+
+        Django has no async transactions yet, so this one step runs in a thread."""
+        with transaction.atomic():
+            return Article.objects.create(author=author, **validated_data)
+
+
+class AsyncArticleDetail(AsyncAPIView):
+    """Retrieves, updates and deletes an article.
+
+    Anyone logged in may read an article; only its author or an administrator may
+    change or delete it."""
+
+    async def get_article(self, request, pk, change=False):
+        user = await self.get_user(request)
+        try:
+            article = await Article.objects.aget(pk=pk)
+        except Article.DoesNotExist:
+            raise NotFound()
+        if change and article.author_id != user.pk and not user.is_staff:
+            raise PermissionDenied()
+        return article
+
+    async def get(self, request, pk):
+        article = await self.get_article(request, pk)
+        validators = article_validators(article.pk, article.updated_at)
+        return not_modified(request, validators) or add_validators(
+            JsonResponse(ArticleSerializer(article).data), validators
+        )
+
+    async def put(self, request, pk, partial=False):
+        article = await self.get_article(request, pk, change=True)
+        serializer = ArticleSerializer(
+            article, data=self.get_data(request), partial=partial
+        )
+        serializer.is_valid(raise_exception=True)
+        for name, value in serializer.validated_data.items():
+            setattr(article, name, value)
+        await article.asave()
+        return JsonResponse(ArticleSerializer(article).data)
+
+    async def patch(self, request, pk):
+        return await self.put(request, pk, partial=True)
+
+    async def delete(self, request, pk):
+        article = await self.get_article(request, pk, change=True)
+        await article.adelete()
+        return HttpResponse(status=204)
+
+
+class AsyncLatestArticleView(AsyncAPIView):
+    """Returns the latest published article from the cache (see `blog.cache`),
+    with the same conditional request support as `LatestArticleView`."""
+
+    async def get(self, request):
+        latest_article = await aget_latest_article()
+        if latest_article is None:
+            raise NotFound("No articles have been published yet.")
+        validators = data_validators(latest_article)
+        return not_modified(request, validators) or add_validators(
+            JsonResponse(latest_article), validators
+        )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncSubscriberView(AsyncAPIView):
+    """Subscribes a Telegram chat; the bot authenticates with the body credentials,
+    as with `SubscriberApiView`."""
+
+    async def post(self, request):
+        data = self.get_data(request)
+        chat_id = data.get("chat_id")
+        username = data.get("username")
+        password = data.get("password")
+        if not chat_id or not username or not password:
+            return JsonResponse({"message": "Missing required fields."}, status=400)
+        if username != config("TELEGRAM_USER") or password != config(
+            "TELEGRAM_PASSWORD"
+        ):
+            return JsonResponse({"message": "Incorrect login or password"}, status=401)
+        subscriber, created = await Subscriber.objects.aget_or_create(chat_id=chat_id)
+        if created:
+            return JsonResponse(
+                {"message": "Subscription created successfully."}, status=201
+            )
+        return JsonResponse({"message": "Already subscribed."})
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.cache import cache
+from .models import Article
+from .serializers import ArticleSerializer
+
+LATEST_ARTICLE_CACHE_KEY = "blog:latest-article"
+NO_ARTICLE = "none"
+
+
+def load_latest_article():
+    """Reads the latest article from the database and stores it in the cache.
+
+    The lookup is served by the `(published_date, id)` index. An empty table is
+    cached as well, so that it does not turn every request into a query. The
+    entry expires after `RESPONSE_CACHE_TIMEOUT` seconds, so that a value made
+    stale by a write in another process (with the per-process default cache)
+    does not outlive it.
+
+    Returns:
+    - The serialized latest article, or None if there are no articles."""
+    article = Article.objects.order_by("-published_date", "-id").first()
+    data = dict(ArticleSerializer(article).data) if article else None
+    cache.set(
+        LATEST_ARTICLE_CACHE_KEY,
+        data or NO_ARTICLE,
+        timeout=settings.RESPONSE_CACHE_TIMEOUT,
+    )
+    return data
+
+
+def get_latest_article():
+    """Returns the serialized latest article, hitting the database only on a miss.
+
+    Returns:
+    - The serialized latest article, or None if there are no articles."""
+    data = cache.get(LATEST_ARTICLE_CACHE_KEY)
+    if data is None:
+        return load_latest_article()
+    return None if data == NO_ARTICLE else data
+
+
+async def aget_latest_article():
+    """Asynchronous version of `get_latest_article` for the async views."""
+    data = await cache.aget(LATEST_ARTICLE_CACHE_KEY)
+    if data is None:
+        article = await Article.objects.order_by("-published_date", "-id").afirst()
+        data = dict(ArticleSerializer(article).data) if article else None
+        await cache.aset(
+            LATEST_ARTICLE_CACHE_KEY,
+            data or NO_ARTICLE,
+            timeout=settings.RESPONSE_CACHE_TIMEOUT,
+        )
+        return data
+    return None if data == NO_ARTICLE else data
+
+
+def invalidate_latest_article():
+    """Drops the cached latest article so that the next read reloads it."""
+    cache.delete(LATEST_ARTICLE_CACHE_KEY)
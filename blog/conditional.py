@@ -0,0 +1,58 @@
+"""
+Validators for conditional requests on articles.
+
+An article version is identified by its id and `updated_at`, which every save
+refreshes. The `ETag` carries both (to the microsecond); `Last-Modified` carries
+`updated_at` to the second, as HTTP dates do. `If-None-Match` takes precedence
+over `If-Modified-Since`, so clients that send both are not fooled by two edits
+within one second.
+"""
+
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+
+
+def article_validators(pk, updated_at):
+    """Returns the `(etag, last_modified)` of an article version.
+
+    Parameters:
+    - pk: The id of the article.
+    - updated_at: Its `updated_at` timestamp.
+
+    Returns:
+    - The quoted ETag and the modification time as a Unix timestamp."""
+    last_modified = timegm(updated_at.utctimetuple())
+    return f'"{pk}.{last_modified}.{updated_at.microsecond}"', last_modified
+
+
+def data_validators(data):
+    """Returns the validators of a serialized article, or None if it has no `updated_at`."""
+    updated_at = data.get("updated_at")
+    if not updated_at:
+        return None
+    return article_validators(data["id"], parse_datetime(updated_at))
+
+
+def not_modified(request, validators):
+    """Returns a 304 (or 412) response if the client's copy is current, else None.
+
+    Parameters:
+    - request: The request, with its `If-None-Match`/`If-Modified-Since` headers.
+    - validators: The `(etag, last_modified)` of the current version, or None."""
+    if validators is None:
+        return None
+    etag, last_modified = validators
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    return add_validators(response, validators) if response is not None else None
+
+
+def add_validators(response, validators):
+    """Sets the `ETag` and `Last-Modified` headers of `response` and returns it."""
+    if validators is not None:
+        etag, last_modified = validators
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(last_modified)
+    return response
@@ -0,0 +1,63 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from blogify.export import (
+    DATASETS,
+    EXPORT_CHUNK_SIZE,
+    FILE_EXTENSIONS,
+    export_chunks,
+    get_export_queryset,
+)
+
+
+class Command(BaseCommand):
+    """Writes a whole dataset as NDJSON, one JSON object per row.
+
+    Rows are streamed from the database in chunks and written as they arrive, so
+    memory use does not depend on the size of the table."""
+
+    help = "Export every article or news article as (compressed) NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(DATASETS))
+        parser.add_argument(
+            "--compress",
+            choices=["gzip", "br"],
+            help="Compress the output with gzip or Brotli.",
+        )
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="The file to write, '-' for standard output. Defaults to "
+            "<dataset>.ndjson with the extension of the compression.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Rows fetched per database round trip.",
+        )
+
+    def handle(self, *args, **options):
+        dataset, compression = options["dataset"], options["compress"]
+        output = options["output"] or dataset + FILE_EXTENSIONS[compression]
+        queryset = get_export_queryset(dataset)
+        chunks = export_chunks(queryset, compression, options["chunk_size"])
+        started = time.perf_counter()
+        written = 0
+        if output == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+                written += len(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            with open(output, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+                    written += len(chunk)
+        self.stderr.write(
+            f"Exported {dataset} ({written} bytes) to {output} in "
+            f"{time.perf_counter() - started:.1f}s."
+        )
@@ -0,0 +1,155 @@
+import json
+import sys
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.cache import invalidate_latest_article, load_latest_article
+from blog.models import Article
+from blogify.cache import bump_generation
+
+
+class Command(BaseCommand):
+    """Bulk-loads articles from a JSONL file, e.g. one written by `export_ndjson`.
+
+    Each line holds one article with `title`, `content` and `author_id` and,
+    optionally, `published_date` and `updated_at` (ISO 8601); other keys such as
+    `id` are ignored. Rows are inserted with `bulk_create`, one transaction per
+    batch, which sends no model signals. `bulk_create` still fills the
+    `auto_now` dates, so the original dates are written back with `bulk_update`
+    in the same transaction. Imported articles are marked as notified, get no
+    outbox entry and send no Telegram messages. Progress is reported after every
+    batch with the offset to pass to `--offset` to resume after an interruption.
+
+    When it is done, the article response caches and the cached latest article
+    are refreshed in the cache this command uses. Only a shared `CACHE_BACKEND`
+    makes that reach the web server; with the per-process default, the server
+    shows the imported articles once its entries expire after
+    `RESPONSE_CACHE_TIMEOUT` seconds."""
+
+    help = (
+        "Import articles from a JSONL file without notifying subscribers. "
+        "Running web servers see the import at once only with a shared "
+        "CACHE_BACKEND; otherwise after RESPONSE_CACHE_TIMEOUT seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="The JSONL file to read, '-' for standard input."
+        )
+        parser.add_argument(
+            "--offset",
+            type=int,
+            default=0,
+            help="The number of lines to skip, to resume an interrupted import.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The number of articles inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        offset, batch_size = options["offset"], options["batch_size"]
+        if options["path"] == "-":
+            file = sys.stdin
+        else:
+            file = open(options["path"], encoding="utf-8")
+        started = time.perf_counter()
+        imported = 0
+        try:
+            with file:
+                lines = islice(file, offset, None)
+                while batch := list(islice(lines, batch_size)):
+                    articles = []
+                    for number, line in enumerate(batch, offset + 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            articles.append(self.build_article(line))
+                        except (ValueError, KeyError, TypeError) as e:
+                            raise CommandError(
+                                f"Invalid article on line {number}: {e!r}. "
+                                f"Fix it and resume with --offset {offset}."
+                            )
+                    try:
+                        with transaction.atomic():
+                            self.insert(articles)
+                    except DatabaseError as e:
+                        raise CommandError(
+                            f"Could not insert lines {offset + 1}-{offset + len(batch)}: "
+                            f"{e}. Resume with --offset {offset}."
+                        )
+                    offset += len(batch)
+                    imported += len(articles)
+                    self.stdout.write(
+                        f"{offset} lines done, {imported} articles imported "
+                        f"({self.rate(imported, started)} rows/sec)"
+                    )
+        finally:
+            if imported:
+                bump_generation("articles")
+                invalidate_latest_article()
+                load_latest_article()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} articles in {time.perf_counter() - started:.1f}s "
+                f"({self.rate(imported, started)} rows/sec)."
+            )
+        )
+        if imported and isinstance(caches["default"], LocMemCache):
+            self.stdout.write(
+                self.style.WARNING(
+                    "The cache is local to this process: running web servers show "
+                    f"the import within {settings.RESPONSE_CACHE_TIMEOUT}s."
+                )
+            )
+
+    @staticmethod
+    def insert(articles):
+        """Inserts `articles`, keeping the dates they were built with."""
+        dates = [(article.published_date, article.updated_at) for article in articles]
+        Article.objects.bulk_create(articles)
+        for article, (published_date, updated_at) in zip(articles, dates):
+            article.published_date, article.updated_at = published_date, updated_at
+        Article.objects.bulk_update(articles, ["published_date", "updated_at"])
+
+    @staticmethod
+    def rate(rows, started):
+        return round(rows / max(time.perf_counter() - started, 1e-9))
+
+    def build_article(self, line):
+        """Returns the unsaved `Article` described by one JSONL line.
+
+        Raises:
+            ValueError, KeyError, TypeError: If the line is not a valid article.
+        """
+        row = json.loads(line)
+        published_date = self.parse_date(row.get("published_date")) or timezone.now()
+        return Article(
+            title=row["title"],
+            content=row["content"],
+            author_id=row["author_id"],
+            published_date=published_date,
+            updated_at=self.parse_date(row.get("updated_at")) or published_date,
+            notified=True,
+        )
+
+    @staticmethod
+    def parse_date(value):
+        if not value:
+            return None
+        date = parse_datetime(value)
+        if date is None:
+            raise ValueError(f"Invalid date {value!r}")
+        if timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        return date
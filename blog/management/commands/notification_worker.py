@@ -0,0 +1,181 @@
+import logging
+import time
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Article, Notification
+from blogify import metrics
+from telegram_notifications import notify_subscribers
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Drains the `Notification` outbox and sends the Telegram messages.
+
+    The worker claims a batch of due entries with `SELECT ... FOR UPDATE SKIP
+    LOCKED` and moves their `available_at` forward by the lease time before
+    releasing the lock, so several workers can run side by side and an entry whose
+    worker died is picked up again once the lease expires. Failed deliveries are
+    retried with exponential backoff up to `--max-attempts` times.
+
+    Articles published close together are announced in one digest: the claimed
+    entries are held back until no article has been queued for `--quiet-period`
+    seconds, or until the oldest of them has waited `--max-delay` seconds, and are
+    then sent as a single message per subscriber. A burst of articles therefore
+    costs one fan-out instead of one per article."""
+
+    help = "Send queued Telegram notifications about new articles."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once nothing is due instead of polling for new entries. "
+            "Entries held back for a digest stay queued; a later run sends them "
+            "once the quiet period or the max delay has passed.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10,
+            help="The number of entries claimed per transaction, i.e. the maximum "
+            "number of articles in one digest.",
+        )
+        parser.add_argument(
+            "--quiet-period",
+            type=float,
+            help="Seconds without new articles after which the pending digest is "
+            "sent. Defaults to NOTIFICATION_DIGEST_QUIET; 0 sends at once.",
+        )
+        parser.add_argument(
+            "--max-delay",
+            type=float,
+            help="Seconds after which a pending digest is sent even while articles "
+            "keep coming. Defaults to NOTIFICATION_DIGEST_WINDOW.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when nothing is due.",
+        )
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=600,
+            help="Seconds a claimed entry stays invisible to other workers.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="Attempts after which an entry is left in the outbox for inspection.",
+        )
+
+    def handle(self, *args, **options):
+        self.lease = timedelta(seconds=options["lease"])
+        self.max_attempts = options["max_attempts"]
+        quiet_period = options["quiet_period"]
+        if quiet_period is None:
+            quiet_period = settings.NOTIFICATION_DIGEST_QUIET
+        max_delay = options["max_delay"]
+        if max_delay is None:
+            max_delay = settings.NOTIFICATION_DIGEST_WINDOW
+        self.quiet_period = timedelta(seconds=quiet_period)
+        self.max_delay = timedelta(seconds=max_delay)
+        while True:
+            notifications = self.claim(options["batch_size"])
+            if notifications:
+                self.deliver(notifications)
+                metrics.REGISTRY.flush()
+            else:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+
+    def claim(self, batch_size):
+        """Locks a batch of due outbox entries and leases them to this worker.
+
+        Nothing is claimed while the batch is still collecting a digest (see
+        `digest_ready`).
+
+        Parameters:
+        - batch_size: The maximum number of entries to claim.
+
+        Returns:
+        - A list of `Notification` objects with their articles loaded."""
+        now = timezone.now()
+        with transaction.atomic():
+            notifications = list(
+                Notification.objects.select_for_update(skip_locked=True, of=("self",))
+                .select_related("article")
+                .filter(
+                    sent_at__isnull=True,
+                    available_at__lte=now,
+                    attempts__lt=self.max_attempts,
+                )
+                .order_by("available_at", "id")[:batch_size]
+            )
+            if not self.digest_ready(notifications, now, batch_size):
+                return []
+            Notification.objects.filter(
+                pk__in=[notification.pk for notification in notifications]
+            ).update(available_at=now + self.lease, attempts=F("attempts") + 1)
+        return notifications
+
+    def digest_ready(self, notifications, now, batch_size):
+        """Tells whether the due entries should be sent now.
+
+        They are sent once the newest of them is `quiet_period` old, the oldest
+        `max_delay` old, the digest is full, or one of them is being retried.
+
+        Parameters:
+        - notifications: The due entries, oldest first.
+        - now: The current time.
+        - batch_size: The maximum number of articles in one digest."""
+        if not notifications:
+            return False
+        created = [notification.created_at for notification in notifications]
+        return (
+            max(created) <= now - self.quiet_period
+            or min(created) <= now - self.max_delay
+            or len(notifications) >= batch_size
+            or any(notification.attempts for notification in notifications)
+        )
+
+    def deliver(self, notifications):
+        """Sends the claimed outbox entries as one digest and records the outcome.
+
+        Parameters:
+        - notifications: The claimed `Notification` objects."""
+        pks = [notification.pk for notification in notifications]
+        attempts = max(notification.attempts for notification in notifications) + 1
+        try:
+            report = async_to_sync(notify_subscribers)(
+                *[notification.article for notification in notifications]
+            )
+        except Exception as e:
+            logger.exception(f"Error delivering {notifications}: {e}")
+            backoff = timedelta(seconds=min(30 * 2 ** (attempts - 1), 3600))
+            Notification.objects.filter(pk__in=pks).update(
+                available_at=timezone.now() + backoff, last_error=str(e)
+            )
+            return
+        with transaction.atomic():
+            Notification.objects.filter(pk__in=pks).update(
+                sent_at=timezone.now(), last_error=""
+            )
+            Article.objects.filter(
+                pk__in=[notification.article_id for notification in notifications]
+            ).update(notified=True)
+        logger.info(
+            f"Delivered {len(notifications)} article(s) after {attempts} attempt(s): "
+            f"{report.sent} sent, {report.failed} failed"
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:07
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_subscribers(apps, schema_editor):
+    """Keeps the oldest row of every chat_id so that the unique index can be built."""
+    Subscriber = apps.get_model("blog", "Subscriber")
+    duplicates = (
+        Subscriber.objects.values("chat_id")
+        .annotate(keep=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    for row in duplicates:
+        Subscriber.objects.filter(chat_id=row["chat_id"]).exclude(id=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_notification'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_subscribers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='subscriber',
+            name='chat_id',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
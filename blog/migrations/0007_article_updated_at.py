@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:36
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_published_date(apps, schema_editor):
+    """Existing articles have not been edited as far as we know."""
+    Article = apps.get_model("blog", "Article")
+    Article.objects.update(updated_at=F("published_date"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_subscriber_chat_id_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_published_date, migrations.RunPython.noop),
+    ]
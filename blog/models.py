@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Article(models.Model):
@@ -10,6 +11,8 @@ class Article(models.Model):
     - content: The content of the article.
     - published_date: The date and time the article was published.
     - author: The author of the article. Reference to User model.
+    - updated_at: The date and time the article was last saved. Together with the
+      id it identifies a version of the article (see `blog.conditional`).
 
     Methods:
     - __str__: Returns a string representation of the Article object."""
@@ -17,16 +20,62 @@ class Article(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
     published_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     notified = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["published_date", "id"], name="blog_article_published_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
 
 class Subscriber(models.Model):
-    chat_id = models.CharField(max_length=100)
+    chat_id = models.CharField(max_length=100, unique=True)
     subscribed_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self) -> str:
         return self.chat_id
+
+
+class Notification(models.Model):
+    """An outbox entry announcing a new article to the Telegram subscribers.
+
+    Entries are written in the same transaction as the article and drained by the
+    `notification_worker` management command, so publishing an article does not
+    wait for the Telegram fan-out.
+
+    Attributes:
+    - article: The article to announce.
+    - created_at: The date and time the entry was queued.
+    - available_at: The earliest time a worker may (re)try the entry. A worker that
+      claims the entry moves it forward, which acts as a lease.
+    - attempts: The number of delivery attempts made so far.
+    - last_error: The error of the last failed attempt.
+    - sent_at: The date and time the subscribers were notified, None while pending."""
+
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="notifications"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"],
+                name="blog_notification_pending_idx",
+                condition=models.Q(sent_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Notification for {self.article_id}"
@@ -11,6 +11,8 @@ class IsAuthorOrAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         """Checks whether the user has permission to perform an operation on a particular object.
 
+        The author is compared by id, so the check does not load the author.
+
         Parameters:
         - request: HttpRequest object.
         - view: The View object that is executing the current request.
@@ -19,4 +21,4 @@ class IsAuthorOrAdmin(permissions.BasePermission):
         Returns:
         - True if the user is the author of the object or an administrator. Otherwise, False.
         """
-        return request.user == obj.author or request.user.is_staff
+        return obj.author_id == request.user.pk or request.user.is_staff
@@ -1,12 +1,15 @@
 from pyexpat import model
 from attr import field
 from rest_framework import serializers
+from blogify.fieldsets import SparseFieldsetSerializerMixin
 from .models import Article, Subscriber
 
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """A serialiser for the Article model.
 
+    Pass `fields` to serialise only some of the fields (see `blogify.fieldsets`).
+
     Attributes:
     - model: The model to be serialised.
     - fields: The fields of the model that should be included in the serialised data.
@@ -17,7 +20,7 @@ class ArticleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Article
-        fields = ["id", "title", "content", "published_date", "author"]
+        fields = ["id", "title", "content", "published_date", "updated_at", "author"]
         read_only_fields = ["author"]
 
     def create(self, validated_data):
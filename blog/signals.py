@@ -1,26 +1,26 @@
-from django import dispatch
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from blog.models import Article
-import asyncio
-from telegram_notifications import notify_subscribers
+from blog.cache import invalidate_latest_article, load_latest_article
+from blogify.cache import bump_generation_on_write
+from blog.models import Article, Notification
 
 
 @receiver(post_save, sender=Article)
 def article_post_save(sender, instance, created, **kwargs):
     """
-    Asynchronous signal handler for Article model post-save events.
+    Signal handler for Article model post-save events.
 
     This function is registered as a receiver for the `post_save` signal emitted by
     the `Article` model. It is designed to handle new article creation specifically.
 
-    When a new article is saved (indicated by `created=True`), it performs the following actions:
-        1. Checks if the article has a primary key (`pk`) and hasn't been notified yet (`notified=False`).
-        2. If both conditions are met, sets `notified` to `True` to prevent duplicate notifications.
-        3. Saves the updated article instance with `update_fields=["notified"]`.
-        4. Asynchronously executes the `notify_subscribers` function (assumed to be imported)
-           to notify subscribers about the new article using a Telegram bot (implementation details
-           depend on `telegram_notifications`).
+    When a new article that hasn't been notified yet (`notified=False`) is saved, it
+    queues a `Notification` outbox entry. The entry is written on the same database
+    connection, so it commits or rolls back together with the article when the save
+    runs inside a transaction. The actual Telegram fan-out is done by the
+    `notification_worker` management command, which also sets `notified` once the
+    subscribers have been messaged, so the request that created the article no
+    longer waits for it.
 
     Args:
         sender (Model): The model class that sent the signal (in this case, `Article`).
@@ -29,8 +29,38 @@ def article_post_save(sender, instance, created, **kwargs):
                         was updated (`False`).
         **kwargs: Additional keyword arguments passed by the signal.
     """
-    if isinstance(instance, Article):
-        if created and instance.pk and not instance.notified:
-            instance.notified = True
-            instance.save(update_fields=["notified"])
-            asyncio.run(notify_subscribers(instance))
+    if created and not instance.notified:
+        Notification.objects.create(article=instance)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def refresh_latest_article_cache(sender, instance, **kwargs):
+    """
+    Keeps the cached latest article in step with writes to the `Article` table.
+
+    The cached entry is dropped immediately, so no request can read a stale article,
+    and reloaded once the surrounding transaction commits, so that steady-state
+    requests to `/api/articles/latest/` are served from the cache alone.
+
+    Args:
+        sender (Model): The model class that sent the signal (in this case, `Article`).
+        instance (Article): The article that was saved or deleted.
+        **kwargs: Additional keyword arguments passed by the signal.
+    """
+    invalidate_latest_article()
+    transaction.on_commit(load_latest_article)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_responses(sender, instance, **kwargs):
+    """
+    Invalidates the cached article list pages and article details.
+
+    Args:
+        sender (Model): The model class that sent the signal (in this case, `Article`).
+        instance (Article): The article that was saved or deleted.
+        **kwargs: Additional keyword arguments passed by the signal.
+    """
+    bump_generation_on_write("articles")
@@ -1,7 +1,51 @@
+import asyncio
+from datetime import timedelta
+import gzip
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+import zlib
+from unittest import mock
+import aiohttp
+import brotli
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from asgiref.sync import async_to_sync
+from telegram.error import Forbidden, RetryAfter, TimedOut
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
-from .models import Article
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from benchmarks.telegram import FakeTelegram, make_update
+from news.models import NewsArticle
+from blogify import metrics
+from blogify.cache import bump_generation, get_generation
+from blogify.export import export_chunks, get_export_queryset
+from blogify.middleware import (
+    ProfilingMiddleware,
+    StackSampler,
+    profiler_lock,
+    request_stats,
+)
+from blogify.testing import QueryBudgetMixin
+from .models import Article, Notification, Subscriber
+from .serializers import ArticleSerializer
+from .webhook import BotLifespan
+import telegram_bot
+import telegram_notifications
+
+CREDENTIALS = {"TELEGRAM_USER": "bot", "TELEGRAM_PASSWORD": "pw"}
 
 
 class ArticleTests(APITestCase):
@@ -115,3 +159,1378 @@ class ArticleTests(APITestCase):
 
         # Check if the response status is 403 Forbidden
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ArticleCursorPaginationTests(APITestCase):
+
+    def setUp(self):
+        # The rows below are written without signals, which would invalidate
+        # responses cached by earlier tests.
+        cache.clear()
+        self.user = User.objects.create_user(username="reader", password="password123")
+        self.client.force_authenticate(self.user)
+        Article.objects.bulk_create(
+            Article(title=f"Article {i}", content="Content", author=self.user)
+            for i in range(25)
+        )
+        # Give half of the articles the same timestamp to exercise the id tiebreak
+        Article.objects.filter(id__in=Article.objects.order_by("id")[:12]).update(
+            published_date=Article.objects.order_by("id")[0].published_date
+        )
+
+    def test_page_number_mode_is_default(self):
+        response = self.client.get("/api/articles/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 25)
+
+    def test_cursor_mode_walks_all_articles_newest_first(self):
+        expected = list(
+            Article.objects.order_by("-published_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        seen = []
+        url = "/api/articles/?pagination=cursor"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(seen, expected)
+
+    def test_cursor_mode_previous_link(self):
+        first = self.client.get("/api/articles/?pagination=cursor")
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_cursor_query_is_bounded_by_the_leading_field(self):
+        first = self.client.get("/api/articles/?pagination=cursor")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data["next"])
+
+        page_query = next(q["sql"] for q in queries if "LIMIT" in q["sql"])
+        self.assertIn('"blog_article"."published_date" <= ', page_query)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/articles/?cursor=garbage")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ArticleFieldsetTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", password="password123")
+        self.article = Article.objects.create(
+            title="Long read", content="A very long body. " * 1000, author=self.user
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_leaves_out_and_defers_content(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/articles/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(response.data["results"][0]), ["id", "title", "published_date", "author"]
+        )
+        article_selects = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "blog_article"' in query["sql"] and "COUNT" not in query["sql"]
+        ]
+        self.assertEqual(len(article_selects), 1)
+        self.assertNotIn('"content"', article_selects[0])
+
+    def test_sparse_fieldsets(self):
+        response = self.client.get("/api/articles/", {"fields": "id,content"})
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.article.id, "content": self.article.content}],
+        )
+
+        response = self.client.get(
+            "/api/articles/", {"fields": "title", "pagination": "cursor"}
+        )
+        self.assertEqual(response.data["results"], [{"title": "Long read"}])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get("/api/articles/", {"fields": "title,secret"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secret", str(response.data["fields"]))
+
+    def test_detail_and_create_return_the_full_article(self):
+        response = self.client.get(f"/api/articles/{self.article.id}/")
+        self.assertEqual(response.data["content"], self.article.content)
+
+        response = self.client.post(
+            "/api/articles/?fields=id", {"title": "New", "content": "Body"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["content"], "Body")
+
+
+class ResponseCacheTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="reader", password="password123")
+        self.client.force_authenticate(self.user)
+        self.article = Article.objects.create(
+            title="Cached", content="Body", author=self.user
+        )
+        self.detail_url = f"/api/articles/{self.article.id}/"
+
+    def test_repeated_reads_are_served_from_the_cache(self):
+        for url in ["/api/articles/", self.detail_url, "/api/articles/?fields=title"]:
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(second.data, first.data)
+
+    def test_query_strings_are_cached_separately(self):
+        self.assertIn("content", self.client.get(self.detail_url).data)
+        response = self.client.get("/api/articles/", {"fields": "id,content"})
+        self.assertEqual(response.data["results"][0]["content"], "Body")
+
+    def test_writes_invalidate_cached_responses(self):
+        self.client.get("/api/articles/")
+        self.client.get(self.detail_url)
+
+        self.client.patch(self.detail_url, {"title": "Changed"}, format="json")
+
+        self.assertEqual(self.client.get(self.detail_url).data["title"], "Changed")
+        self.assertEqual(
+            self.client.get("/api/articles/").data["results"][0]["title"], "Changed"
+        )
+        self.article.delete()
+        self.assertEqual(self.client.get("/api/articles/").data["count"], 0)
+
+    def test_generation_is_bumped_again_on_commit(self):
+        before = get_generation("articles")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.save()
+            during = get_generation("articles")
+        self.assertGreater(during, before)
+        self.assertGreater(get_generation("articles"), during)
+
+    def test_errors_are_not_cached(self):
+        self.client.get("/api/articles/999/")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/articles/999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ConditionalRequestTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="reader", password="password123")
+        self.client.force_authenticate(self.user)
+        self.article = Article.objects.create(
+            title="Versioned", content="Body", author=self.user
+        )
+        self.detail_url = f"/api/articles/{self.article.id}/"
+
+    def assertNotModified(self, url, **headers):
+        with mock.patch.object(
+            ArticleSerializer, "to_representation"
+        ) as to_representation:
+            response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        to_representation.assert_not_called()
+        return response
+
+    def test_detail_revalidation(self):
+        response = self.client.get(self.detail_url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        self.assertIn("updated_at", response.data)
+
+        # Served from the cached data...
+        with self.assertNumQueries(0):
+            self.assertNotModified(self.detail_url, if_none_match=etag)
+        # ...and, after a cache flush, from a single primary key lookup.
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.assertNotModified(self.detail_url, if_none_match=etag)
+        self.assertEqual(response["ETag"], etag)
+        self.assertNotModified(self.detail_url, if_modified_since=last_modified)
+
+        self.client.patch(self.detail_url, {"content": "Edited"}, format="json")
+        response = self.client.get(self.detail_url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_latest_article_revalidation(self):
+        for url in ["/api/articles/latest/", "/api/async/articles/latest/"]:
+            etag = self.client.get(url)["ETag"]
+            with self.assertNumQueries(0):
+                self.assertNotModified(url, if_none_match=etag)
+
+        newer = Article.objects.create(title="Newer", content="Body", author=self.user)
+        response = self.client.get(
+            "/api/articles/latest/", headers={"if_none_match": etag}
+        )
+        self.assertEqual(response.data["id"], newer.id)
+
+    def test_async_detail_revalidation(self):
+        url = f"/api/async/articles/{self.article.id}/"
+        self.client.force_login(self.user)
+        etag = self.client.get(url)["ETag"]
+
+        self.assertNotModified(url, if_none_match=etag)
+
+
+class ExportTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="password123", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        for number in range(5):
+            Article.objects.create(
+                title=f"Article {number}", content="Тело", author=self.admin
+            )
+        NewsArticle.objects.create(title="News", url="https://example.com/1")
+
+    def read(self, response):
+        content = b"".join(response.streaming_content)
+        encoding = response.get("Content-Encoding")
+        if encoding == "gzip":
+            content = gzip.decompress(content)
+        elif encoding == "br":
+            content = brotli.decompress(content)
+        return [json.loads(line) for line in content.decode().splitlines()]
+
+    def test_articles_are_streamed_as_ndjson(self):
+        response = self.client.get("/api/export/articles/")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = self.read(response)
+        self.assertEqual([row["title"] for row in rows], [f"Article {n}" for n in range(5)])
+        self.assertEqual(rows[0]["content"], "Тело")
+        self.assertEqual(rows[0]["author_id"], self.admin.id)
+
+    def test_rows_are_encoded_chunk_by_chunk(self):
+        queryset = get_export_queryset("articles")
+
+        chunks = list(export_chunks(queryset, "gzip", chunk_size=2))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(gzip.decompress(b"".join(chunks)).splitlines()), 5)
+        first = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(chunks[0])
+        self.assertEqual(len(first.splitlines()), 2)
+
+    def test_export_round_trips_through_import(self):
+        Article.objects.update(
+            published_date=timezone.now().replace(microsecond=123456)
+        )
+        original = list(Article.objects.order_by("pk"))
+        rows = self.read(self.client.get("/api/export/articles/"))
+        Article.objects.all().delete()
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as file:
+            file.writelines(json.dumps(row) + "\n" for row in rows)
+        self.addCleanup(os.remove, file.name)
+
+        call_command("import_articles", file.name, stdout=mock.Mock())
+
+        imported = list(Article.objects.order_by("published_date", "title"))
+        self.assertEqual(
+            [(a.published_date, a.updated_at) for a in imported],
+            [(a.published_date, a.updated_at) for a in original],
+        )
+
+    def test_news_are_exported(self):
+        rows = self.read(self.client.get("/api/export/news/"))
+
+        self.assertEqual([row["url"] for row in rows], ["https://example.com/1"])
+
+    def test_response_is_compressed_as_negotiated(self):
+        for accept_encoding, encoding in [
+            ("gzip, deflate", "gzip"),
+            ("gzip, br", "br"),
+            ("br;q=0, gzip", "gzip"),
+            ("identity", None),
+        ]:
+            response = self.client.get(
+                "/api/export/articles/", HTTP_ACCEPT_ENCODING=accept_encoding
+            )
+            self.assertEqual(response.get("Content-Encoding"), encoding)
+            self.assertEqual(len(self.read(response)), 5)
+
+    def test_export_is_staff_only(self):
+        self.client.force_authenticate(User.objects.create_user(username="reader"))
+
+        response = self.client.get("/api/export/articles/")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unknown_dataset(self):
+        response = self.client.get("/api/export/users/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_async_export_streams(self):
+        await self.async_client.aforce_login(self.admin)
+
+        response = await self.async_client.get(
+            "/api/async/export/articles/", headers={"Accept-Encoding": "gzip"}
+        )
+
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        lines = gzip.decompress(content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+
+    def test_command_writes_compressed_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "articles.ndjson.br")
+            call_command(
+                "export_ndjson", "articles", compress="br", output=path, stderr=mock.Mock()
+            )
+            with open(path, "rb") as file:
+                lines = brotli.decompress(file.read()).decode().splitlines()
+
+        self.assertEqual(len(lines), 5)
+
+
+class ImportArticlesTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="password123")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, rows):
+        path = os.path.join(self.directory.name, "articles.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            for row in rows:
+                file.write((row if isinstance(row, str) else json.dumps(row)) + "\n")
+        return path
+
+    def row(self, number):
+        return {
+            "id": 1000 + number,
+            "title": f"Archived {number}",
+            "content": "Body",
+            "author_id": self.user.id,
+            "published_date": f"2020-01-{number + 1:02d}T10:00:00Z",
+        }
+
+    def import_articles(self, path, **options):
+        call_command("import_articles", path, stdout=mock.Mock(), **options)
+
+    def test_articles_are_imported_without_notifications(self):
+        path = self.write([self.row(number) for number in range(5)])
+
+        self.import_articles(path, batch_size=2)
+
+        articles = Article.objects.order_by("published_date")
+        self.assertEqual([article.title for article in articles], [f"Archived {n}" for n in range(5)])
+        self.assertTrue(all(article.notified for article in articles))
+        self.assertEqual(articles[0].published_date.isoformat(), "2020-01-01T10:00:00+00:00")
+        self.assertEqual(articles[0].updated_at, articles[0].published_date)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_local_cache_is_reported(self):
+        stdout = mock.Mock()
+        call_command("import_articles", self.write([self.row(0)]), stdout=stdout)
+
+        output = " ".join(str(call.args[0]) for call in stdout.write.call_args_list)
+        self.assertIn("local to this process", output)
+
+    def test_date_fields_are_not_patched_during_the_import(self):
+        flags = []
+        bulk_create = Article.objects.bulk_create
+
+        def record(articles):
+            field = Article._meta.get_field("published_date")
+            flags.append(field.auto_now_add)
+            return bulk_create(articles)
+
+        with mock.patch.object(Article.objects, "bulk_create", record):
+            self.import_articles(self.write([self.row(0)]))
+
+        self.assertEqual(flags, [True])
+        article = Article.objects.get()
+        self.assertEqual(article.published_date.isoformat(), "2020-01-01T10:00:00+00:00")
+
+    def test_timestamps_are_managed_again_after_the_import(self):
+        self.import_articles(self.write([self.row(0)]))
+
+        article = Article.objects.create(title="New", content="Body", author=self.user)
+
+        self.assertEqual(article.published_date.year, timezone.now().year)
+
+    def test_caches_are_refreshed(self):
+        self.assertIsNone(self.client.get("/api/articles/latest/").data.get("title"))
+
+        self.import_articles(self.write([self.row(0), self.row(3)]))
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/articles/latest/")
+        self.assertEqual(response.data["title"], "Archived 3")
+
+    def test_invalid_line_reports_the_offset_to_resume_from(self):
+        rows = [self.row(0), self.row(1), self.row(2), "{not json", self.row(4)]
+        path = self.write(rows)
+
+        with self.assertRaisesMessage(CommandError, "resume with --offset 2"):
+            self.import_articles(path, batch_size=2)
+        self.assertEqual(Article.objects.count(), 2)
+
+        rows[3] = self.row(3)
+        self.import_articles(self.write(rows), offset=2, batch_size=2)
+
+        self.assertEqual(Article.objects.count(), 5)
+
+
+class LatestArticleTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="password123")
+
+    def test_latest_article_without_articles(self):
+        response = self.client.get("/api/articles/latest/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_latest_article_is_served_from_cache(self):
+        Article.objects.create(title="Old", content="Old content", author=self.user)
+        newest = Article.objects.create(
+            title="New", content="New content", author=self.user
+        )
+
+        response = self.client.get("/api/articles/latest/")
+        self.assertEqual(response.data["id"], newest.id)
+        self.assertEqual(response.data["content"], "New content")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/articles/latest/")
+        self.assertEqual(response.data["id"], newest.id)
+
+    def test_latest_article_cache_follows_writes(self):
+        article = Article.objects.create(title="First", content="Body", author=self.user)
+        self.client.get("/api/articles/latest/")
+
+        article.title = "Edited"
+        article.save()
+        self.assertEqual(self.client.get("/api/articles/latest/").data["title"], "Edited")
+
+        newer = Article.objects.create(title="Second", content="Body", author=self.user)
+        self.assertEqual(self.client.get("/api/articles/latest/").data["id"], newer.id)
+
+        newer.delete()
+        self.assertEqual(self.client.get("/api/articles/latest/").data["id"], article.id)
+
+    def test_latest_article_cache_is_reloaded_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(
+                title="Committed", content="Body", author=self.user
+            )
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/articles/latest/")
+        self.assertEqual(response.data["id"], article.id)
+
+
+@override_settings(NOTIFICATION_DIGEST_QUIET=0)
+class NotificationOutboxTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="writer", password="password123")
+        self.client.force_authenticate(self.user)
+        self.notify = mock.patch(
+            "blog.management.commands.notification_worker.notify_subscribers",
+            new_callable=mock.AsyncMock,
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_creating_article_queues_notification(self):
+        response = self.client.post(
+            "/api/articles/", {"title": "New", "content": "Body"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        notification = Notification.objects.get(article_id=response.data["id"])
+        self.assertIsNone(notification.sent_at)
+        self.assertFalse(Article.objects.get(id=response.data["id"]).notified)
+        self.notify.assert_not_called()
+
+    def test_updating_article_does_not_queue_notification(self):
+        article = Article.objects.create(title="New", content="Body", author=self.user)
+        article.title = "Edited"
+        article.save()
+
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_worker_drains_outbox(self):
+        article = Article.objects.create(title="New", content="Body", author=self.user)
+
+        call_command("notification_worker", "--once")
+
+        self.notify.assert_awaited_once()
+        self.assertEqual(self.notify.await_args.args[0], article)
+        notification = Notification.objects.get(article=article)
+        self.assertIsNotNone(notification.sent_at)
+        self.assertEqual(notification.attempts, 1)
+        article.refresh_from_db()
+        self.assertTrue(article.notified)
+
+        call_command("notification_worker", "--once")
+        self.notify.assert_awaited_once()
+
+    def test_worker_backs_off_after_failure(self):
+        article = Article.objects.create(title="New", content="Body", author=self.user)
+        self.notify.side_effect = RuntimeError("Telegram is down")
+
+        call_command("notification_worker", "--once")
+
+        notification = Notification.objects.get(article=article)
+        self.assertIsNone(notification.sent_at)
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(notification.last_error, "Telegram is down")
+        self.assertGreater(notification.available_at, notification.created_at)
+        article.refresh_from_db()
+        self.assertFalse(article.notified)
+
+
+@override_settings(NOTIFICATION_DIGEST_QUIET=60, NOTIFICATION_DIGEST_WINDOW=300)
+class NotificationDigestTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="writer", password="password123")
+        self.notify = mock.patch(
+            "blog.management.commands.notification_worker.notify_subscribers",
+            new_callable=mock.AsyncMock,
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+        self.articles = [
+            Article.objects.create(title=f"Burst {n}", content="Body", author=self.user)
+            for n in range(3)
+        ]
+
+    def age(self, seconds, **filters):
+        Notification.objects.filter(**filters).update(
+            created_at=timezone.now() - timedelta(seconds=seconds)
+        )
+
+    def test_burst_is_held_until_the_quiet_period(self):
+        call_command("notification_worker", "--once")
+
+        self.notify.assert_not_awaited()
+        self.assertFalse(Notification.objects.filter(attempts__gt=0).exists())
+
+    def test_burst_is_sent_as_one_digest(self):
+        self.age(61)
+
+        call_command("notification_worker", "--once")
+
+        self.notify.assert_awaited_once()
+        self.assertEqual(list(self.notify.await_args.args), self.articles)
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+        self.assertFalse(Article.objects.filter(notified=False).exists())
+
+    def test_digest_is_sent_after_the_max_delay(self):
+        self.age(301, article=self.articles[0])
+
+        call_command("notification_worker", "--once")
+
+        self.assertEqual(len(self.notify.await_args.args), 3)
+
+    def test_full_digest_is_sent_at_once(self):
+        call_command("notification_worker", "--once", "--batch-size", "2")
+
+        self.notify.assert_awaited_once()
+        self.assertEqual(list(self.notify.await_args.args), self.articles[:2])
+
+    def test_digest_text_lists_titles_within_the_message_limit(self):
+        self.assertIn("Body", telegram_notifications.message_text(self.articles[:1]))
+
+        text = telegram_notifications.message_text(self.articles)
+        self.assertTrue(text.startswith("Новые статьи (3)"))
+        self.assertIn("• Burst 2", text)
+
+        long_articles = [Article(title="x" * 255) for _ in range(20)]
+        text = telegram_notifications.message_text(long_articles)
+        self.assertEqual(len(text), telegram_notifications.MESSAGE_LIMIT)
+
+        long_article = Article(title="Long", content="x" * 5000)
+        text = telegram_notifications.message_text([long_article])
+        self.assertEqual(len(text), telegram_notifications.MESSAGE_LIMIT)
+        self.assertTrue(text.endswith("…"))
+
+
+class FakeBot:
+    """Stands in for `telegram.Bot`, failing chats according to `errors`."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.sent = []
+
+    def __call__(self, token, request):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def send_message(self, chat_id, text):
+        errors = self.errors.get(chat_id)
+        if errors:
+            raise errors.pop(0)
+        self.sent.append(chat_id)
+
+
+@override_settings(TELEGRAM_SEND_RATE=1000, TELEGRAM_CHAT_SEND_RATE=1000)
+class NotifySubscribersTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="writer", password="password123")
+        self.article = Article(title="New", content="Body", author=self.user)
+        for chat_id in ["1", "2", "3", "4"]:
+            Subscriber.objects.create(chat_id=chat_id)
+        mock.patch.object(telegram_notifications, "RETRY_BACKOFF", 0).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def notify(self, errors):
+        bot = FakeBot(errors)
+        with mock.patch.object(telegram_notifications, "Bot", bot):
+            report = async_to_sync(telegram_notifications.notify_subscribers)(
+                self.article
+            )
+        return bot, report
+
+    def test_every_subscriber_is_notified(self):
+        bot, report = self.notify({})
+
+        self.assertCountEqual(bot.sent, ["1", "2", "3", "4"])
+        self.assertEqual(report.sent, 4)
+        self.assertEqual(report.failed, 0)
+
+    def test_subscribers_are_streamed_in_chunks(self):
+        for chat_id in range(5, 12):
+            Subscriber.objects.create(chat_id=str(chat_id))
+
+        with mock.patch.object(telegram_notifications, "SUBSCRIBER_CHUNK_SIZE", 3):
+            bot, report = self.notify({})
+
+        self.assertCountEqual(bot.sent, [str(chat_id) for chat_id in range(1, 12)])
+        self.assertEqual(report.sent, 11)
+
+    def test_failing_recipient_does_not_abort_fan_out(self):
+        bot, report = self.notify({"2": [Forbidden("bot was blocked by the user")]})
+
+        self.assertCountEqual(bot.sent, ["1", "3", "4"])
+        self.assertEqual(report.sent, 3)
+        self.assertEqual(report.failed, 1)
+
+    def test_flood_control_and_network_errors_are_retried(self):
+        bot, report = self.notify({"1": [RetryAfter(0)], "3": [TimedOut()]})
+
+        self.assertCountEqual(bot.sent, ["1", "2", "3", "4"])
+        self.assertEqual(report.retried, 2)
+
+    def test_deliveries_are_counted_in_the_metrics(self):
+        counters = [
+            (metrics.NOTIFICATIONS, ("sent",)),
+            (metrics.NOTIFICATIONS, ("failed",)),
+            (metrics.NOTIFICATION_RETRIES, ("network",)),
+        ]
+        before = [counter.values.get(labels, 0) for counter, labels in counters]
+
+        self.notify({"2": [Forbidden("blocked")], "3": [TimedOut()]})
+
+        after = [counter.values.get(labels, 0) for counter, labels in counters]
+        self.assertEqual([b - a for a, b in zip(before, after)], [3, 1, 1])
+
+    def test_recipient_is_given_up_after_retries(self):
+        bot, report = self.notify({"4": [TimedOut()] * 10})
+
+        self.assertCountEqual(bot.sent, ["1", "2", "3"])
+        self.assertEqual(report.failed, 1)
+        self.assertEqual(report.retried, 3)
+
+
+class TokenBucketTests(APITestCase):
+
+    def test_bucket_paces_acquisitions(self):
+        bucket = telegram_notifications.TokenBucket(rate=100)
+
+        async def acquire_many():
+            started = time.monotonic()
+            for _ in range(11):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        self.assertGreaterEqual(async_to_sync(acquire_many)(), 0.09)
+
+    def test_limiter_drops_idle_chat_buckets(self):
+        limiter = telegram_notifications.RateLimiter(rate=1000, chat_rate=100)
+
+        async def send(chat_ids):
+            for chat_id in chat_ids:
+                await limiter.acquire(chat_id)
+
+        async_to_sync(send)(["1", "2", "3"])
+        time.sleep(0.02)
+        async_to_sync(send)(["4"])
+
+        self.assertEqual(list(limiter.chats), ["4"])
+
+    def test_fan_outs_share_the_limiter(self):
+        self.assertIs(
+            telegram_notifications.get_limiter(30, 1),
+            telegram_notifications.get_limiter(30, 1),
+        )
+
+
+class BotLatestArticleTests(TestCase):
+    """The bot's latest-article cache against a stand-in for the API."""
+
+    ARTICLE = {"id": 1, "title": "Latest", "content": "Body"}
+
+    def setUp(self):
+        self.requests = []
+
+    async def latest(self, request):
+        await asyncio.sleep(0.05)
+        self.requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"1"':
+            return web.Response(status=304)
+        return web.json_response(self.ARTICLE, headers={"ETag": '"1"'})
+
+    def run_scenario(self, scenario, ttl=60):
+        async def run():
+            app = web.Application()
+            app.router.add_get("/latest/", self.latest)
+            async with TestServer(app) as server:
+                self.server = server
+                async with aiohttp.ClientSession() as session:
+                    cache = telegram_bot.LatestArticleCache(ttl=ttl)
+                    url = str(server.make_url("/latest/"))
+                    return await scenario(lambda: cache.get(session, url))
+
+        return asyncio.run(run())
+
+    def test_burst_costs_one_request(self):
+        async def scenario(get):
+            return await asyncio.gather(*(get() for _ in range(100)))
+
+        results = self.run_scenario(scenario)
+
+        self.assertEqual(results, [self.ARTICLE] * 100)
+        self.assertEqual(self.requests, [None])
+
+    def test_stale_article_is_revalidated(self):
+        async def scenario(get):
+            return [await get(), await get()]
+
+        results = self.run_scenario(scenario, ttl=0)
+
+        self.assertEqual(results, [self.ARTICLE] * 2)
+        self.assertEqual(self.requests, [None, '"1"'])
+
+    def test_stale_article_is_served_while_the_api_is_down(self):
+        async def scenario(get):
+            first = await get()
+            await self.server.close()
+            return [first, await get(), await get()]
+
+        results = self.run_scenario(scenario, ttl=0)
+
+        self.assertEqual(results, [self.ARTICLE] * 3)
+        self.assertEqual(self.requests, [None])
+
+    def test_session_follows_application_lifecycle(self):
+        async def lifecycle():
+            application = mock.Mock(bot_data={})
+            with mock.patch.object(telegram_bot, "BOT_BACKEND", "rest"):
+                await telegram_bot.post_init(application)
+            session = application.bot_data["backend"].session
+            self.assertFalse(session.closed)
+            await telegram_bot.post_shutdown(application)
+            return session
+
+        self.assertTrue(asyncio.run(lifecycle()).closed)
+
+
+@override_settings(TELEGRAM_WEBHOOK_SECRET="s3cret")
+class BotWebhookTests(TestCase):
+    """Webhook updates processed by a bot talking to a stand-in for Telegram."""
+
+    async def run_bot(self, scenario, expected, concurrent_updates=8, backend=None):
+        fake = FakeTelegram(expected=expected)
+        async with TestServer(fake.app) as server:
+            application = telegram_bot.build_application(
+                "123:fake", fake.base_url(server), concurrent_updates, backend
+            )
+            try:
+                await scenario(application)
+                await asyncio.wait_for(fake.replied.wait(), timeout=5)
+            finally:
+                await telegram_bot.stop_application(application)
+        return fake
+
+    async def post_update(self, data, secret="s3cret"):
+        return await self.async_client.post(
+            reverse("telegram-webhook"),
+            data,
+            content_type="application/json",
+            headers={"X-Telegram-Bot-Api-Secret-Token": secret},
+        )
+
+    async def test_webhook_update_is_answered(self):
+        async def scenario(application):
+            with mock.patch.object(telegram_bot, "application", application):
+                response = await self.post_update(make_update(1, 42, "/help"))
+            self.assertEqual(response.status_code, 200)
+
+        fake = await self.run_bot(scenario, expected=1)
+
+        self.assertEqual(fake.sent[0][0], 42)
+        self.assertIn("/latest", fake.sent[0][1])
+
+    async def test_orm_backend_subscribes_in_process(self):
+        async def scenario(application):
+            for update_id in [1, 2]:
+                await telegram_bot.feed_update(
+                    application, make_update(update_id, 42, "/subscribe")
+                )
+
+        fake = await self.run_bot(
+            scenario, expected=2, concurrent_updates=1, backend=telegram_bot.OrmBackend()
+        )
+
+        self.assertTrue(await Subscriber.objects.filter(chat_id="42").aexists())
+        self.assertEqual(
+            [text for chat_id, text in fake.sent],
+            [
+                "You have successfully subscribed to the blog updates.",
+                "You have already subscribed to the blog updates.",
+            ],
+        )
+
+    async def test_orm_backend_reads_latest_article(self):
+        user = await User.objects.acreate(username="writer")
+        await Article.objects.acreate(title="Fresh", content="Body", author=user)
+        await cache.aclear()
+
+        async def scenario(application):
+            await telegram_bot.feed_update(application, make_update(1, 42, "/latest"))
+
+        fake = await self.run_bot(
+            scenario, expected=1, backend=telegram_bot.OrmBackend()
+        )
+
+        self.assertEqual(fake.sent, [(42, "Recent article:\n\nFresh\n\nBody")])
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            telegram_bot.get_backend("smtp")
+
+    async def test_wrong_secret_is_refused(self):
+        with mock.patch.object(telegram_bot, "feed_update") as feed_update:
+            response = await self.post_update(make_update(1, 42, "/help"), "wrong")
+
+        self.assertEqual(response.status_code, 403)
+        feed_update.assert_not_called()
+
+    async def test_non_ascii_secret_is_refused(self):
+        with mock.patch.object(telegram_bot, "feed_update") as feed_update:
+            response = await self.post_update(make_update(1, 42, "/help"), "sécret")
+
+        self.assertEqual(response.status_code, 403)
+        feed_update.assert_not_called()
+
+    async def test_lifespan_shutdown_processes_queued_updates(self):
+        async def slow(update, context):
+            await asyncio.sleep(0.1)
+            await update.message.reply_text("done")
+
+        async def scenario(application):
+            application.add_handler(telegram_bot.CommandHandler("slow", slow))
+            for update_id in [1, 2]:
+                await telegram_bot.feed_update(
+                    application, make_update(update_id, update_id, "/slow")
+                )
+            messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+            sent = []
+
+            async def receive():
+                return next(messages)
+
+            async def send(message):
+                sent.append(message["type"])
+
+            with mock.patch.object(telegram_bot, "application", application):
+                await BotLifespan(None)({"type": "lifespan"}, receive, send)
+            self.assertFalse(application.running)
+            self.assertEqual(
+                sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+            )
+
+        fake = await self.run_bot(scenario, expected=2, concurrent_updates=1)
+
+        self.assertEqual(len(fake.sent), 2)
+
+    async def test_updates_are_processed_concurrently_up_to_the_cap(self):
+        running, peak = 0, 0
+
+        async def slow(update, context):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.1)
+            running -= 1
+            await update.message.reply_text("done")
+
+        async def scenario(application):
+            application.add_handler(telegram_bot.CommandHandler("slow", slow))
+            for update_id in range(1, 9):
+                await telegram_bot.feed_update(
+                    application, make_update(update_id, update_id, "/slow")
+                )
+
+        started = time.monotonic()
+        fake = await self.run_bot(scenario, expected=8, concurrent_updates=4)
+
+        self.assertEqual(len(fake.sent), 8)
+        self.assertEqual(peak, 4)
+        self.assertLess(time.monotonic() - started, 0.6)
+
+
+class MetricsTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", password="password123")
+        Article.objects.create(title="Measured", content="Body", author=self.user)
+
+    def requests(self, view, method="GET", status="200"):
+        value = metrics.REQUEST_LATENCY.values.get((view, method, status))
+        return sum(value[:-1]) if value else 0
+
+    def queries(self, view):
+        value = metrics.REQUEST_QUERIES.values.get((view,))
+        return value[-1] if value else 0
+
+    def test_requests_are_recorded_per_view(self):
+        requests = self.requests("latest-article")
+        self.client.get("/api/articles/latest/")
+        self.client.get("/api/articles/latest/")
+        self.client.get("/api/articles/999/")
+
+        self.assertEqual(self.requests("latest-article"), requests + 2)
+        self.assertGreaterEqual(self.requests("article-detail", status="403"), 1)
+
+    def test_queries_are_counted(self):
+        self.client.force_authenticate(self.user)
+        cache.clear()
+        queries = self.queries("article-list-create")
+
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get("/api/articles/?fields=title")
+
+        self.assertEqual(self.queries("article-list-create"), queries + len(captured))
+
+    async def test_queries_of_async_views_are_counted(self):
+        await self.async_client.aforce_login(self.user)
+        queries = self.queries("async-article-list-create")
+
+        response = await self.async_client.get("/api/async/articles/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(self.queries("async-article-list-create"), queries)
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        self.client.get("/api/articles/latest/")
+
+        response = self.client.get("/metrics")
+
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        text = response.content.decode()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", text)
+        self.assertIn(
+            'http_request_duration_seconds_bucket{view="latest-article",method="GET",'
+            'status="200",le="+Inf"}',
+            text,
+        )
+        self.assertIn("# TYPE notifications_total counter", text)
+
+    def test_snapshots_of_all_processes_are_added_up(self):
+        with tempfile.TemporaryDirectory() as directory:
+            registry = metrics.Registry(directory)
+            counter = metrics.Counter("jobs_total", "Jobs.", ("queue",), registry)
+            histogram = metrics.Histogram(
+                "job_seconds", "Job time.", buckets=(1, 5), registry=registry
+            )
+            counter.inc("default", amount=2)
+            histogram.observe(0.5)
+            other_process = {
+                "jobs_total": [[["default"], 3], [["mail"], 1]],
+                "job_seconds": [[[], [0, 1, 1, 13.0]]],
+            }
+            with open(os.path.join(directory, "1.json"), "w") as file:
+                json.dump(other_process, file)
+
+            text = registry.render()
+
+        self.assertIn('jobs_total{queue="default"} 5', text)
+        self.assertIn('jobs_total{queue="mail"} 1', text)
+        self.assertIn('job_seconds_bucket{le="1"} 1', text)
+        self.assertIn('job_seconds_bucket{le="5"} 2', text)
+        self.assertIn('job_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("job_seconds_count 3", text)
+        self.assertIn("job_seconds_sum 13.5", text)
+
+    def test_concurrent_flushes_do_not_fail(self):
+        errors = []
+
+        def flush(registry):
+            for _ in range(50):
+                try:
+                    registry.flush(force=True)
+                except OSError as e:
+                    errors.append(e)
+
+        with tempfile.TemporaryDirectory() as directory:
+            registry = metrics.Registry(directory)
+            metrics.Counter("jobs_total", "Jobs.", registry=registry).inc()
+            threads = [
+                threading.Thread(target=flush, args=(registry,)) for _ in range(16)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            files = os.listdir(directory)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(files, [f"{os.getpid()}.json"])
+
+    def test_flush_errors_do_not_fail_the_request(self):
+        self.client.force_authenticate(self.user)
+        with mock.patch.object(
+            metrics.REGISTRY, "flush", side_effect=OSError("disk full")
+        ), self.assertLogs("blogify.middleware", "WARNING"):
+            response = self.client.get("/api/articles/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ProfilingTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="reader", password="password123")
+        Article.objects.create(title="Profiled", content="Body", author=self.user)
+        self.client.force_authenticate(self.user)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def profiles(self, suffix):
+        return sorted(
+            name for name in os.listdir(self.directory) if name.endswith(suffix)
+        )
+
+    def test_disabled_middleware_removes_itself(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+        response = self.client.get("/api/articles/")
+
+        self.assertNotIn("Server-Timing", response)
+
+    def test_stack_sampler_sleeps_while_idle(self):
+        sampler = StackSampler(interval=0.001)
+        request = sampler.watch(0)
+        time.sleep(0.02)
+        sampler.unwatch(request)
+        time.sleep(0.02)
+
+        self.assertTrue(request.samples)
+        with mock.patch("blogify.middleware.time.sleep") as sleep:
+            threading.Event().wait(0.05)
+        sleep.assert_not_called()
+
+    @override_settings(PROFILING_ENABLED=True)
+    def test_server_timing_splits_the_request(self):
+        response = self.client.get("/api/articles/")
+
+        parts = [part.split(";")[0] for part in response["Server-Timing"].split(", ")]
+        self.assertEqual(parts, ["db", "serialize", "render", "total"])
+        self.assertRegex(response["Server-Timing"], r'db;desc="\d+ queries";dur=')
+
+    def test_sampled_requests_are_profiled(self):
+        with self.settings(
+            PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1, PROFILING_DIR=self.directory
+        ):
+            self.client.get("/api/articles/")
+
+        [name] = self.profiles(".prof")
+        self.assertIn("article-list-create", name)
+        stats = pstats.Stats(os.path.join(self.directory, name))
+        self.assertTrue(
+            any(function == "to_representation" for _, _, function in stats.stats)
+        )
+
+    def test_slow_requests_are_sampled(self):
+        def slow_latest_article():
+            time.sleep(0.1)
+            return None
+
+        with self.settings(
+            PROFILING_ENABLED=True, PROFILING_SLOW_MS=20, PROFILING_DIR=self.directory
+        ), mock.patch("blog.views.get_latest_article", slow_latest_article):
+            self.client.get("/api/articles/latest/")
+            self.client.get("/api/articles/")
+
+        [name] = self.profiles(".folded")
+        self.assertIn("latest-article", name)
+        with open(os.path.join(self.directory, name)) as file:
+            self.assertIn("slow_latest_article", file.read())
+
+    def test_overlapping_sampled_requests_are_profiled_one_at_a_time(self):
+        both_running = threading.Barrier(2, timeout=5)
+
+        def view(request):
+            both_running.wait()
+            time.sleep(0.02)
+            return HttpResponse()
+
+        with self.settings(
+            PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1, PROFILING_DIR=self.directory
+        ):
+            middleware = ProfilingMiddleware(view)
+            responses = []
+            threads = [
+                threading.Thread(
+                    target=lambda: responses.append(
+                        middleware(RequestFactory().get("/api/articles/"))
+                    )
+                )
+                for _ in range(2)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+        self.assertEqual(len(self.profiles(".prof")), 1)
+        self.assertEqual(len(self.profiles(".folded")), 1)
+        self.assertFalse(profiler_lock.locked())
+
+    def test_after_runs_when_before_raises(self):
+        with self.settings(PROFILING_ENABLED=True):
+            middleware = ProfilingMiddleware(lambda request: HttpResponse())
+        with mock.patch.object(
+            middleware, "before", side_effect=ValueError("profiler busy")
+        ), mock.patch.object(middleware, "after") as after:
+            with self.assertRaises(ValueError):
+                middleware(RequestFactory().get("/"))
+
+        after.assert_called_once()
+        self.assertIsNone(request_stats.get())
+
+    async def test_async_requests_are_sampled(self):
+        await self.async_client.aforce_login(self.user)
+
+        with self.settings(
+            PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1, PROFILING_DIR=self.directory
+        ):
+            response = await self.async_client.get("/api/async/articles/")
+
+        self.assertIn("total;dur=", response["Server-Timing"])
+        self.assertEqual(self.profiles(".prof"), [])
+
+
+class SubscriberApiTests(APITestCase):
+
+    def setUp(self):
+        self.data = {"chat_id": "42", "username": "bot", "password": "secret"}
+        credentials = {"TELEGRAM_USER": "bot", "TELEGRAM_PASSWORD": "secret"}
+        patcher = mock.patch("blog.views.config", side_effect=credentials.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_subscribe_once(self):
+        first = self.client.post("/api/subscribe/", self.data, format="json")
+        second = self.client.post("/api/subscribe/", self.data, format="json")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(Subscriber.objects.filter(chat_id="42").count(), 1)
+
+    def test_chat_id_is_unique(self):
+        Subscriber.objects.create(chat_id="42")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Subscriber.objects.create(chat_id="42")
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="budget", password="password123")
+        self.client.login(username="budget", password="password123")
+        self.article = Article.objects.create(
+            title="First", content="Body", author=self.user
+        )
+
+    def populate(self, size):
+        missing = size - Article.objects.count()
+        Article.objects.bulk_create(
+            Article(title=f"Article {n}", content="Body " * 100, author=self.user)
+            for n in range(missing)
+        )
+        # Measure the uncached path; bulk_create sends no signals.
+        bump_generation("articles")
+
+    def test_article_list(self):
+        self.assertQueryBudgetAtSizes(
+            "ArticleListCreate GET",
+            4,
+            self.populate,
+            lambda: self.client.get("/api/articles/"),
+            milliseconds=200,
+        )
+        self.assertQueryBudgetAtSizes(
+            "ArticleListCreate GET cursor",
+            3,
+            self.populate,
+            lambda: self.client.get("/api/articles/", {"pagination": "cursor"}),
+        )
+
+    def test_article_create(self):
+        data = {"title": "New", "content": "Body"}
+        with self.assertQueryBudget("ArticleListCreate POST", 6):
+            response = self.client.post("/api/articles/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_article_detail(self):
+        url = f"/api/articles/{self.article.id}/"
+        self.assertQueryBudgetAtSizes(
+            "ArticleDetail GET", 3, self.populate, lambda: self.client.get(url)
+        )
+        data = {"title": "Changed", "content": "Body"}
+        with self.assertQueryBudget("ArticleDetail PUT", 4):
+            response = self.client.put(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_latest_article(self):
+        with self.assertQueryBudget("LatestArticleView GET cold", 1):
+            self.client.get("/api/articles/latest/")
+        self.assertQueryBudgetAtSizes(
+            "LatestArticleView GET",
+            0,
+            self.populate,
+            lambda: self.client.get("/api/articles/latest/"),
+        )
+
+    @mock.patch("blog.views.config", CREDENTIALS.get)
+    def test_subscribe(self):
+        data = {"chat_id": "42", "username": "bot", "password": "pw"}
+        with self.assertQueryBudget("SubscriberApiView POST new", 4):
+            self.client.post("/api/subscribe/", data, format="json")
+        with self.assertQueryBudget("SubscriberApiView POST existing", 1):
+            self.client.post("/api/subscribe/", data, format="json")
+
+
+class AsyncViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="password123")
+        self.other = User.objects.create_user(username="other", password="password123")
+        self.articles = [
+            Article.objects.create(
+                title=f"Article {n}", content="Body", author=self.author
+            )
+            for n in range(12)
+        ]
+
+    async def test_list_requires_login_and_pages_by_cursor(self):
+        response = await self.async_client.get("/api/async/articles/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        await self.async_client.aforce_login(self.author)
+        first = (await self.async_client.get("/api/async/articles/")).json()
+        self.assertEqual(
+            [item["id"] for item in first["results"]],
+            [article.id for article in reversed(self.articles)][:10],
+        )
+        self.assertNotIn("content", first["results"][0])
+        second = (await self.async_client.get(first["next"])).json()
+        self.assertEqual(
+            [item["id"] for item in second["results"]],
+            [self.articles[1].id, self.articles[0].id],
+        )
+
+    async def test_create_article(self):
+        await self.async_client.aforce_login(self.author)
+        response = await self.async_client.post(
+            "/api/async/articles/",
+            {"title": "Async", "content": "Body"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["author"], self.author.id)
+        notifications = Notification.objects.filter(article_id=response.json()["id"])
+        self.assertTrue(await notifications.aexists())
+
+        response = await self.async_client.post(
+            "/api/async/articles/", {"title": ""}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("content", response.json())
+
+    async def test_detail_permissions(self):
+        url = f"/api/async/articles/{self.articles[0].id}/"
+        await self.async_client.aforce_login(self.other)
+        self.assertEqual((await self.async_client.get(url)).json()["content"], "Body")
+        response = await self.async_client.patch(
+            url, {"title": "Mine"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = await self.async_client.get("/api/async/articles/999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        await self.async_client.aforce_login(self.author)
+        response = await self.async_client.patch(
+            url, {"title": "Renamed"}, content_type="application/json"
+        )
+        self.assertEqual(response.json()["title"], "Renamed")
+        response = await self.async_client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(await Article.objects.filter(pk=self.articles[0].id).aexists())
+
+    def test_latest_article_matches_the_sync_view(self):
+        sync_response = self.client.get("/api/articles/latest/")
+        async_response = self.client.get("/api/async/articles/latest/")
+
+        self.assertEqual(async_response.json(), sync_response.json())
+
+    @mock.patch("blog.async_views.config", CREDENTIALS.get)
+    async def test_subscribe(self):
+        data = {"chat_id": "7", "username": "bot", "password": "pw"}
+        responses = [
+            await self.async_client.post(
+                "/api/async/subscribe/", body, content_type="application/json"
+            )
+            for body in [data, data, {**data, "password": "no"}, {"chat_id": "7"}]
+        ]
+        self.assertEqual([r.status_code for r in responses], [201, 200, 401, 400])
@@ -1,4 +1,11 @@
 from django.urls import path
+from .async_views import (
+    AsyncArticleDetail,
+    AsyncArticleListCreate,
+    AsyncLatestArticleView,
+    AsyncSubscriberView,
+)
+from .webhook import TelegramWebhookView
 from .views import (
     ArticleListCreate,
     ArticleDetail,
@@ -11,4 +18,25 @@ urlpatterns = [
     path("articles/<int:pk>/", ArticleDetail.as_view(), name="article-detail"),
     path("articles/latest/", LatestArticleView.as_view(), name="latest-article"),
     path("subscribe/", SubscriberApiView.as_view(), name="subscribe"),
+    path(
+        "async/articles/",
+        AsyncArticleListCreate.as_view(),
+        name="async-article-list-create",
+    ),
+    path(
+        "async/articles/<int:pk>/",
+        AsyncArticleDetail.as_view(),
+        name="async-article-detail",
+    ),
+    path(
+        "async/articles/latest/",
+        AsyncLatestArticleView.as_view(),
+        name="async-latest-article",
+    ),
+    path("async/subscribe/", AsyncSubscriberView.as_view(), name="async-subscribe"),
+    path(
+        "telegram/webhook/",
+        TelegramWebhookView.as_view(),
+        name="telegram-webhook",
+    ),
 ]
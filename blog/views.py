@@ -1,45 +1,94 @@
 import logging
+from django.db import transaction
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from .cache import get_latest_article
+from .conditional import add_validators, article_validators, data_validators, not_modified
 from .models import Article, Subscriber
 from .serializers import ArticleSerializer, SubscriberSerializer
 from .permissions import IsAuthorOrAdmin
 from decouple import config
+from blogify.cache import CachedResponseMixin
+from blogify.fieldsets import SparseFieldsetMixin
+from blogify.pagination import CursorOrPageNumberPagination
 
 
-class ArticleListCreate(generics.ListCreateAPIView):
+class ArticleListCreate(
+    CachedResponseMixin, SparseFieldsetMixin, generics.ListCreateAPIView
+):
     """A view class for viewing a list of articles and creating a new article.
 
     Attributes:
     - queryset: A dataset containing all Article objects.
     - serializer_class: Serializer class used for validation and serialisation of data.
-    - permission_classes: Permission classes used to validate user permissions."""
+    - permission_classes: Permission classes used to validate user permissions.
+    - pagination_class: Page numbers by default, keyset pages with `?pagination=cursor`.
+    - ordering: The keyset ordering, backed by the `(published_date, id)` index.
+    - list_fields: The fields listed by default; the article body is left out and
+      not loaded, clients that need it ask for `?fields=...,content` or use the
+      detail endpoint.
+    - cache_namespace: Pages are cached per query string until an article changes."""
 
     queryset = Article.objects.all()
     serializer_class = ArticleSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CursorOrPageNumberPagination
+    ordering = ("-published_date", "-id")
+    list_fields = ("id", "title", "published_date", "author")
+    defer_fields = ("content",)
+    cache_namespace = "articles"
 
     def perform_create(self, serializer):
         """A method to save the author when creating a new article.
 
+        The article and its notification outbox entry are written in one transaction.
+
         Parameters:
         - serializer: Serialiser for data validation.
         """
-        serializer.save(author=self.request.user)
+        with transaction.atomic():
+            serializer.save(author=self.request.user)
 
 
-class ArticleDetail(generics.RetrieveUpdateDestroyAPIView):
+class ArticleDetail(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """A view class for viewing, updating, and deleting a specific article.
 
     Attributes:
     - queryset: A dataset containing all Article objects.
     - serializer_class: A serialiser class used for validating and serialising data.
-    - permission_classes: Permission classes used to validate user permissions."""
+    - permission_classes: Permission classes used to validate user permissions.
+    - cache_namespace: Articles are cached until an article changes."""
 
     queryset = Article.objects.all()
     serializer_class = ArticleSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_namespace = "articles"
+
+    def retrieve(self, request, *args, **kwargs):
+        """Returns the article with `ETag` and `Last-Modified` headers.
+
+        A cached article is checked against the client's validators without any
+        query; otherwise the article is loaded by its primary key. Either way a
+        client with the current version gets a 304 before anything is serialized.
+
+        Returns:
+        - The article, or a 304 response without a body."""
+        data = self.get_cached_data(request)
+        if data is not None:
+            validators = data_validators(data)
+            return not_modified(request, validators) or add_validators(
+                Response(data), validators
+            )
+        instance = self.get_object()
+        validators = article_validators(instance.pk, instance.updated_at)
+        response = not_modified(request, validators)
+        if response is None:
+            data = self.get_serializer(instance).data
+            self.set_cached_data(data)
+            response = add_validators(Response(data), validators)
+        return response
 
     def get_permissions(self):
         """A method to define permission classes depending on the HTTP method.
@@ -56,21 +105,32 @@ class LatestArticleView(APIView):
     """
     API endpoint that retrieves and returns the latest published article.
 
-    This view class provides a GET method that fetches the most recently published
-    article from the database using the `Article.objects.latest` queryset method.
-    It then serializes the article data using the `ArticleSerializer` and returns
-    a JSON response containing the serialized data.
+    This view class provides a GET method that returns the most recently published
+    article serialized with the `ArticleSerializer`. The serialized article is kept
+    in the cache and refreshed by the `Article` post-save/post-delete signals, so
+    steady-state requests do not touch the database. The response carries `ETag`
+    and `Last-Modified` headers; clients that already have the latest version get
+    a 304 without a body.
 
     This endpoint is useful for clients (e.g., mobile apps, web applications) that
     need to display the latest article information.
 
+    The endpoint is public, so it skips authentication: looking up the session
+    and the user would be the only queries left on a cache hit.
+
     Raises:
-        DoesNotExist: If no articles exist in the database."""
+        NotFound: If no articles exist in the database."""
+
+    authentication_classes = []
 
     def get(self, request, format=None):
-        latest_article = Article.objects.latest("published_date")
-        serializer = ArticleSerializer(latest_article)
-        return Response(serializer.data)
+        latest_article = get_latest_article()
+        if latest_article is None:
+            raise NotFound("No articles have been published yet.")
+        validators = data_validators(latest_article)
+        return not_modified(request, validators) or add_validators(
+            Response(latest_article), validators
+        )
 
 
 class SubscriberApiView(APIView):
@@ -81,11 +141,15 @@ class SubscriberApiView(APIView):
     `chat_id`, `username`, and `password` to be provided in the request data.
     If the provided username and password match the expected values from the
     environment variables, a new subscriber is created if it doesn't already exist.
+    The credentials travel in the request body, so session authentication (and the
+    session and user queries it costs) is skipped.
 
     Methods:
         post(request, *args, **kwargs): Handles the POST request to create a subscriber.
     """
 
+    authentication_classes = []
+
     def post(self, request, *args, **kwargs):
         """
         Handle the POST request to create a new subscriber.
@@ -0,0 +1,70 @@
+"""
+Receives Telegram updates when the bot runs in webhook mode.
+
+Telegram posts every update to `/api/telegram/webhook/` with the secret token
+registered by `python telegram_bot.py --webhook`. The view only queues the
+update; the bot application processes it in the background on the event loop
+of this process, which therefore has to be served by ASGI. The application is
+started by the first update and stopped, after processing the updates it has
+queued, by `BotLifespan` when the server shuts down.
+"""
+
+import json
+from secrets import compare_digest
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+import telegram_bot
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class TelegramWebhookView(View):
+    """Queues the updates Telegram posts to the webhook.
+
+    Requests without the `X-Telegram-Bot-Api-Secret-Token` header matching
+    `TELEGRAM_WEBHOOK_SECRET` are refused, and so is every request while no
+    secret is configured."""
+
+    http_method_names = ["post"]
+
+    async def post(self, request):
+        secret = settings.TELEGRAM_WEBHOOK_SECRET
+        token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        # Header values are decoded as latin-1; compare bytes, as `compare_digest`
+        # refuses non-ASCII strings.
+        if not secret or not compare_digest(token.encode("latin-1"), secret.encode()):
+            return JsonResponse({"message": "Invalid secret token."}, status=403)
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"message": "Invalid JSON."}, status=400)
+        await telegram_bot.feed_update(telegram_bot.application, data)
+        return HttpResponse()
+
+
+class BotLifespan:
+    """
+    ASGI wrapper handling the lifespan events, which Django does not support.
+
+    On shutdown it stops the bot application if the webhook started it, so the
+    updates still in its queue are processed before the server exits. Every
+    other connection is passed to the wrapped application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "lifespan":
+            return await self.application(scope, receive, send)
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if telegram_bot.application.running:
+                    await telegram_bot.stop_application(telegram_bot.application)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogify.settings')
 
 application = get_asgi_application()
+
+# Serve static files in development, as runserver does.
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
+
+from blog.webhook import BotLifespan  # noqa: E402 (needs the app registry)
+
+# Stop the webhook's bot application cleanly when the server shuts down.
+application = BotLifespan(application)
@@ -0,0 +1,71 @@
+"""
+Base class for the native async API views.
+
+DRF views are synchronous, so under ASGI every request to them is handed to a
+worker thread. The async views in `blog.async_views` and `news.async_views` run
+on the event loop instead and use Django's async ORM interface, so slow clients
+and database round trips do not tie up threads. They reuse the DRF serializers
+for validation and output (neither touches the database) and return the same
+payloads and error bodies as their DRF counterparts, but only accept JSON.
+"""
+
+import json
+
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    NotAuthenticated,
+    ParseError,
+    PermissionDenied,
+)
+
+
+class AsyncAPIView(View):
+    """
+    A Django class-based view for async handlers with DRF-style errors.
+
+    Handlers may raise DRF's `APIException`s (`ValidationError`, `NotFound`, ...),
+    which are turned into JSON responses the way DRF's exception handler does.
+    Unauthenticated requests get 403, as with DRF's session authentication.
+
+    Attributes:
+        ordering (tuple): The keyset ordering used by `KeysetPagination`.
+    """
+
+    ordering = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            data = exc.detail
+            if not isinstance(data, (list, dict)):
+                data = {"detail": data}
+            status = exc.status_code
+            if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+                status = PermissionDenied.status_code
+            return JsonResponse(data, status=status, safe=False)
+
+    def get_data(self, request):
+        """Returns the parsed JSON body of the request.
+
+        Raises:
+            ParseError: If the body is not valid JSON.
+        """
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError as e:
+            raise ParseError(f"JSON parse error - {e}")
+
+    async def get_user(self, request):
+        """Returns the authenticated user.
+
+        Raises:
+            NotAuthenticated: If the request is anonymous.
+        """
+        user = await request.auser()
+        if not user.is_authenticated:
+            raise NotAuthenticated()
+        return user
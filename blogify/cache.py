@@ -0,0 +1,110 @@
+"""
+Versioned caching of API response data.
+
+Cached responses are keyed by a per-namespace generation counter kept in the
+cache. Writes bump the counter (see `bump_generation`) instead of deleting
+entries, which makes every response cached under the previous generation
+unreachable at once, whatever pages and query strings it was stored for; the
+orphaned entries simply expire. Only the response data is cached, not the
+rendered response, so content negotiation and the browsable API still work, and
+the view's authentication and permission checks run before the cache is read.
+"""
+
+import hashlib
+import time
+from functools import partial
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+GENERATION_KEY = "generation:{}"
+RESPONSE_KEY = "response:{}:{}:{}"
+
+
+def get_generation(namespace):
+    """Returns the current generation of `namespace`."""
+    key = GENERATION_KEY.format(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        # A fresh counter starts from the clock rather than from 1, so that a
+        # counter evicted from the cache never returns to an earlier value.
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(namespace):
+    """Moves `namespace` to a new generation, orphaning its cached responses."""
+    key = GENERATION_KEY.format(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_generation_on_write(namespace):
+    """Bumps `namespace` now and again once the current transaction commits.
+
+    The first bump stops cached responses from being served while the write is in
+    flight; the second orphans responses built from the old rows by requests that
+    ran between the first bump and the commit."""
+    bump_generation(namespace)
+    transaction.on_commit(partial(bump_generation, namespace))
+
+
+def response_cache_key(namespace, request):
+    """Builds the cache key of a response from the URL and the sorted query string."""
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    url = f"{request.build_absolute_uri(request.path)}?{query}"
+    digest = hashlib.sha1(url.encode()).hexdigest()
+    return RESPONSE_KEY.format(namespace, get_generation(namespace), digest)
+
+
+class CachedResponseMixin:
+    """
+    Caches the data of successful `list` and `retrieve` responses.
+
+    Attributes:
+        cache_namespace (str): The generation counter the cached data belongs to.
+            Writes to the underlying models must bump it.
+        cache_timeout (int): Seconds a cached response is kept; it bounds how long
+            another process can serve stale data when the cache is not shared.
+    """
+
+    cache_namespace = None
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def get_cached_data(self, request):
+        """Returns the cached data for the request, or None on a miss.
+
+        The key is remembered for `set_cached_data`: it has to carry the
+        generation read before the database, or data read just before a bump
+        could be stored under the new generation."""
+        self.response_key = response_cache_key(self.cache_namespace, request)
+        return cache.get(self.response_key)
+
+    def set_cached_data(self, data):
+        """Caches the data built after a miss in `get_cached_data`."""
+        cache.set(self.response_key, data, self.cache_timeout)
+
+    def cached_response(self, request, build):
+        data = self.get_cached_data(request)
+        if data is not None:
+            return Response(data)
+        response = build()
+        if response.status_code == 200:
+            self.set_cached_data(response.data)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().list, request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs)
+        )
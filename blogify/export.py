@@ -0,0 +1,197 @@
+"""
+Streaming NDJSON export of whole tables.
+
+Every dataset is read with `values()` through `.iterator(chunk_size=...)` (a
+server-side cursor on PostgreSQL), encoded as one JSON object per line and
+written out one chunk of rows at a time, so memory does not grow with the table
+and the first rows are sent as soon as the first chunk has been read. Output
+can be compressed with gzip or Brotli; the compressor is flushed after every
+chunk so that compressed output streams too.
+
+The export is served by `ExportView` (WSGI) and `AsyncExportView` (ASGI, which
+needs an asynchronous iterator to stream) and written to files by the
+`export_ndjson` management command.
+"""
+
+import datetime
+import zlib
+
+import brotli
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import permissions
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.views import APIView
+
+from .async_views import AsyncAPIView
+
+# Rows fetched per database round trip and encoded per output chunk.
+EXPORT_CHUNK_SIZE = 2000
+# The exported model and columns of each dataset.
+DATASETS = {
+    "articles": (
+        "blog.Article",
+        (
+            "id",
+            "title",
+            "content",
+            "author_id",
+            "published_date",
+            "updated_at",
+            "notified",
+        ),
+    ),
+    "news": ("news.NewsArticle", ("id", "title", "url", "created_at")),
+}
+# Supported compressions, by their `Content-Encoding` token, in order of preference.
+COMPRESSIONS = ("br", "gzip")
+FILE_EXTENSIONS = {None: ".ndjson", "gzip": ".ndjson.gz", "br": ".ndjson.br"}
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    """Writes datetimes at full precision, which `DjangoJSONEncoder` cuts to
+    milliseconds, so that an export imported again keeps its dates exactly."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+encoder = ExportEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def get_export_queryset(dataset):
+    """Returns the `values()` queryset of `dataset`, in primary key order.
+
+    Raises:
+        KeyError: If there is no such dataset.
+    """
+    model, fields = DATASETS[dataset]
+    return apps.get_model(model).objects.order_by("pk").values(*fields)
+
+
+class StreamCompressor:
+    """
+    Compresses a stream chunk by chunk.
+
+    Each chunk is flushed, so every piece of output can be decompressed as soon
+    as it is received. Without a compression, chunks pass through unchanged.
+
+    Attributes:
+        compression (str): "gzip", "br" or None.
+    """
+
+    def __init__(self, compression=None):
+        self.compression = compression
+        if compression == "gzip":
+            self.compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif compression == "br":
+            self.compressor = brotli.Compressor(quality=5)
+        elif compression is not None:
+            raise ValueError(f"Unknown compression {compression!r}.")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.compression == "gzip":
+            return self.compressor.compress(chunk) + self.compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+        if self.compression == "br":
+            return self.compressor.process(chunk) + self.compressor.flush()
+        return chunk
+
+    def finish(self) -> bytes:
+        if self.compression == "gzip":
+            return self.compressor.flush()
+        if self.compression == "br":
+            return self.compressor.finish()
+        return b""
+
+
+def encode_rows(rows) -> bytes:
+    return "".join(encoder.encode(row) + "\n" for row in rows).encode()
+
+
+def export_chunks(queryset, compression=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields the rows of `queryset` as NDJSON, one (compressed) chunk at a time."""
+    compressor = StreamCompressor(compression)
+    rows = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) == chunk_size:
+            yield compressor.compress(encode_rows(rows))
+            rows = []
+    yield compressor.compress(encode_rows(rows)) + compressor.finish()
+
+
+async def aexport_chunks(queryset, compression=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Asynchronous version of `export_chunks` for ASGI responses."""
+    compressor = StreamCompressor(compression)
+    rows = []
+    async for row in queryset.aiterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) == chunk_size:
+            yield compressor.compress(encode_rows(rows))
+            rows = []
+    yield compressor.compress(encode_rows(rows)) + compressor.finish()
+
+
+def negotiate_compression(accept_encoding):
+    """Returns the preferred compression allowed by an `Accept-Encoding` header."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        name, _, quality = params.strip().partition("=")
+        try:
+            refused = name == "q" and float(quality) == 0
+        except ValueError:
+            refused = False
+        if not refused:
+            accepted.add(token.strip().lower())
+    for compression in COMPRESSIONS:
+        if compression in accepted:
+            return compression
+    return None
+
+
+def export_response(request, dataset, chunks):
+    """Builds the streaming response for `dataset` from a chunk generator factory.
+
+    Raises:
+        NotFound: If there is no such dataset.
+    """
+    if dataset not in DATASETS:
+        raise NotFound(f"Unknown dataset {dataset!r}.")
+    compression = negotiate_compression(request.headers.get("Accept-Encoding", ""))
+    response = StreamingHttpResponse(
+        chunks(get_export_queryset(dataset), compression),
+        content_type="application/x-ndjson",
+    )
+    if compression:
+        response["Content-Encoding"] = compression
+    response["Vary"] = "Accept-Encoding"
+    response["Content-Disposition"] = f'attachment; filename="{dataset}.ndjson"'
+    return response
+
+
+class ExportView(APIView):
+    """Streams a whole dataset (`articles` or `news`) as NDJSON to staff users.
+
+    The response is compressed with Brotli or gzip when the client's
+    `Accept-Encoding` allows it."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, dataset):
+        return export_response(request, dataset, export_chunks)
+
+
+class AsyncExportView(AsyncAPIView):
+    """Asynchronous version of `ExportView`, which streams under ASGI."""
+
+    async def get(self, request, dataset):
+        user = await self.get_user(request)
+        if not user.is_staff:
+            raise PermissionDenied()
+        return export_response(request, dataset, aexport_chunks)
@@ -0,0 +1,80 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer mixin that accepts a `fields` argument limiting the output fields.
+
+    Passing `fields=None` (the default) keeps every field declared on the
+    serializer; with `many=True` the argument is handed to the child serializer.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """
+    View mixin for `?fields=` sparse fieldsets on read requests.
+
+    Clients pick the output fields with a comma-separated `fields` query parameter.
+    Without it, read requests get `list_fields`. Model fields listed in
+    `defer_fields` are deferred in the queryset unless they are part of the
+    response, so large columns are neither transferred nor kept in memory when the
+    client does not want them. Write requests always use the full serializer.
+
+    The serializer class must use `SparseFieldsetSerializerMixin`.
+
+    Attributes:
+        fields_query_param (str): The query parameter naming the fields.
+        list_fields (tuple): The fields returned by default; None means all.
+        defer_fields (tuple): Model fields to defer when they are not returned.
+    """
+
+    fields_query_param = "fields"
+    list_fields = None
+    defer_fields = ()
+
+    def get_sparse_fields(self):
+        """Returns the requested output fields, or None for all of them.
+
+        Raises:
+            ValidationError: If a requested field does not exist.
+        """
+        available = self.get_serializer_class().Meta.fields
+        params = getattr(self.request, "query_params", self.request.GET)
+        requested = params.get(self.fields_query_param)
+        if not requested:
+            return self.list_fields
+        fields = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            raise ValidationError(
+                {
+                    self.fields_query_param: f"Unknown field(s): {', '.join(unknown)}. "
+                    f"Available: {', '.join(available)}."
+                }
+            )
+        return fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return self.defer_unused_fields(queryset, self.get_sparse_fields())
+
+    def defer_unused_fields(self, queryset, fields):
+        """Defers the `defer_fields` that are not among the output `fields`."""
+        if fields is None:
+            return queryset
+        deferred = [name for name in self.defer_fields if name not in fields]
+        return queryset.defer(*deferred) if deferred else queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method in SAFE_METHODS:
+            kwargs.setdefault("fields", self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,248 @@
+"""
+In-process metrics in the Prometheus text format.
+
+Counters and histograms live in plain dictionaries in every process, so
+recording a value costs a lock and an addition. To combine several processes
+(web workers, the notification worker, the news scraper), set `METRICS_DIR` to a
+directory shared by all of them: each process then writes a snapshot of its
+values to `<METRICS_DIR>/<pid>.json` at most every `FLUSH_INTERVAL` seconds and
+when it exits, and `/metrics` adds up all snapshots. Snapshots of processes that
+have exited keep counting, as counters should; empty the directory when the
+deployment starts. Without `METRICS_DIR`, `/metrics` only shows the values of the
+process serving it.
+
+The module does not depend on Django, so that scripts such as the news scraper
+can record metrics too. Every metric is defined here, so that any process can
+render the snapshots of all the others.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from decouple import config
+
+METRICS_DIR = config("METRICS_DIR", default="")
+# Minimum seconds between two snapshots of the same process.
+FLUSH_INTERVAL = 1.0
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Registry:
+    """
+    The metrics of this process and their snapshots in `METRICS_DIR`.
+
+    Attributes:
+        directory (str): The shared snapshot directory, or "" for this process only.
+        metrics (dict): The registered metrics by name.
+    """
+
+    def __init__(self, directory=METRICS_DIR):
+        self.directory = directory
+        self.metrics = {}
+        self.lock = threading.Lock()
+        # Serializes snapshot writes; `lock` guards the values.
+        self.flush_lock = threading.Lock()
+        self.flushed_at = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        """Returns the values of this process as `{name: [[labels, value], ...]}`."""
+        with self.lock:
+            return {
+                name: [[list(labels), value] for labels, value in metric.values.items()]
+                for name, metric in self.metrics.items()
+                if metric.values
+            }
+
+    def flush(self, force=False) -> None:
+        """Writes the snapshot of this process, unless it was written just now.
+
+        Concurrent calls are serialized, and every write goes to its own
+        temporary file that atomically replaces the snapshot.
+
+        Raises:
+            OSError: If the snapshot cannot be written.
+        """
+        if not self.directory:
+            return
+        with self.flush_lock:
+            now = time.monotonic()
+            if not force and now - self.flushed_at < FLUSH_INTERVAL:
+                return
+            self.flushed_at = now
+            path = Path(self.directory) / f"{os.getpid()}.json"
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.directory, suffix=".tmp", delete=False
+            ) as temporary:
+                temporary.write(json.dumps(self.snapshot()))
+            try:
+                os.replace(temporary.name, path)
+            except OSError:
+                os.unlink(temporary.name)
+                raise
+
+    def collect(self) -> dict:
+        """Returns the values of all processes as `{name: {labels: value}}`."""
+        if self.directory:
+            self.flush(force=True)
+            snapshots = []
+            for path in Path(self.directory).glob("*.json"):
+                try:
+                    snapshots.append(json.loads(path.read_text()))
+                except (OSError, ValueError):
+                    continue
+        else:
+            snapshots = [self.snapshot()]
+        totals = {}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                merged = totals.setdefault(name, {})
+                for labels, value in values:
+                    labels = tuple(labels)
+                    merged[labels] = metric.merge(merged.get(labels), value)
+        return totals
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        totals = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for labels, value in sorted(totals.get(name, {}).items()):
+                labels = dict(zip(metric.labelnames, labels))
+                lines.extend(metric.samples(labels, value))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush, True)
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in labels.values()
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+class Counter:
+    """A value that only goes up, per combination of label values."""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = registry.lock
+        registry.register(self)
+
+    def inc(self, *labelvalues, amount=1) -> None:
+        with self.lock:
+            self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    @staticmethod
+    def merge(total, value):
+        return value if total is None else total + value
+
+    def samples(self, labels, value):
+        yield f"{self.name}{format_labels(labels)} {value}"
+
+
+class Histogram:
+    """
+    Observations counted into buckets, per combination of label values.
+
+    Each value is stored as the per-bucket counts (the last one for +Inf)
+    followed by the sum of the observations.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        buckets=LATENCY_BUCKETS,
+        registry=REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}
+        self.lock = registry.lock
+        registry.register(self)
+
+    def observe(self, amount, *labelvalues) -> None:
+        with self.lock:
+            value = self.values.get(labelvalues)
+            if value is None:
+                value = self.values[labelvalues] = [0] * (len(self.buckets) + 2)
+            value[bisect_left(self.buckets, amount)] += 1
+            value[-1] += amount
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return list(value)
+        return [a + b for a, b in zip(total, value)]
+
+    def samples(self, labels, value):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), value[:-1]):
+            cumulative += count
+            bucket_labels = format_labels({**labels, "le": bound})
+            yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+        yield f"{self.name}_sum{format_labels(labels)} {value[-1]}"
+        yield f"{self.name}_count{format_labels(labels)} {cumulative}"
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent producing the response, by view.",
+    ("view", "method", "status"),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run per request, by view.",
+    ("view",),
+    buckets=QUERY_BUCKETS,
+)
+NOTIFICATION_SEND_LATENCY = Histogram(
+    "notification_send_duration_seconds",
+    "Time taken by one successful Telegram sendMessage call.",
+)
+NOTIFICATIONS = Counter(
+    "notifications_total",
+    "Notification messages by outcome (sent or failed).",
+    ("outcome",),
+)
+NOTIFICATION_RETRIES = Counter(
+    "notification_retries_total",
+    "Notification messages retried, by reason (flood_control or network).",
+    ("reason",),
+)
+SCRAPER_ITEMS = Counter(
+    "scraper_items_total",
+    "News items by source and stage (fetched, skipped as known, saved).",
+    ("source", "outcome"),
+)
@@ -0,0 +1,363 @@
+"""
+Request instrumentation.
+
+`MetricsMiddleware` records the latency and the number of database queries of
+every request in `blogify.metrics`. `ProfilingMiddleware` reports where the time
+of a request went in a `Server-Timing` header and writes profiles of sampled and
+slow requests to disk. Queries are counted by an execute wrapper installed on
+every database connection, which adds to the `RequestStats` of the request being
+served; the stats are kept in a context variable, so queries run by async views
+through `sync_to_async` are counted too.
+"""
+
+import cProfile
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two stack samples of a request being profiled.
+STACK_SAMPLE_INTERVAL = 0.005
+# Only one cProfile profiler can be active per process (Python 3.12 raises for a
+# second one), so overlapping sampled requests fall back to stack sampling.
+profiler_lock = threading.Lock()
+
+request_stats = ContextVar("request_stats", default=None)
+
+
+@dataclass
+class RequestStats:
+    """What the request being served has spent so far.
+
+    Attributes:
+        queries (int): Database queries run.
+        db_seconds (float): Time spent in them.
+        render_seconds (float): Time spent rendering the response (DRF and
+            template responses only).
+    """
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    render_seconds: float = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    stats = request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def add_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def install_query_recorder():
+    """Adds `record_query` to every connection, including the open ones."""
+    connection_created.connect(add_query_recorder, dispatch_uid="record_query")
+    for connection in connections.all(initialized_only=True):
+        add_query_recorder(connection)
+
+
+class InstrumentedMiddleware:
+    """
+    Base class for middleware that measures the requests it wraps.
+
+    It works in both sync and async stacks, so async views are not pushed into
+    a thread. Subclasses implement `finish`, which gets the request, the
+    response, the request's `RequestStats` and the elapsed seconds, and may
+    implement `before` and `after`; `after` runs even if `before` or the rest of
+    the stack raises. Nested instrumented middleware share the `RequestStats` of the
+    outermost one.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        install_query_recorder()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        stats, token = self.start()
+        started = time.perf_counter()
+        try:
+            self.before(request)
+            response = self.get_response(request)
+        finally:
+            seconds = time.perf_counter() - started
+            self.after(request)
+            if token is not None:
+                request_stats.reset(token)
+        return self.finish(request, response, stats, seconds)
+
+    async def acall(self, request):
+        stats, token = self.start()
+        started = time.perf_counter()
+        try:
+            self.before(request)
+            response = await self.get_response(request)
+        finally:
+            seconds = time.perf_counter() - started
+            self.after(request)
+            if token is not None:
+                request_stats.reset(token)
+        return self.finish(request, response, stats, seconds)
+
+    @staticmethod
+    def start():
+        stats = request_stats.get()
+        if stats is not None:
+            return stats, None
+        stats = RequestStats()
+        return stats, request_stats.set(stats)
+
+    def before(self, request):
+        pass
+
+    def after(self, request):
+        pass
+
+    def finish(self, request, response, stats, seconds):
+        raise NotImplementedError
+
+
+def view_name(request):
+    """Returns the URL name of the matched view, e.g. "article-detail"."""
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "<unmatched>"
+
+
+class MetricsMiddleware(InstrumentedMiddleware):
+    """Records request latency and query counts per view in `blogify.metrics`."""
+
+    def finish(self, request, response, stats, seconds):
+        name = view_name(request)
+        metrics.REQUEST_LATENCY.observe(
+            seconds, name, request.method, str(response.status_code)
+        )
+        metrics.REQUEST_QUERIES.observe(stats.queries, name)
+        try:
+            metrics.REGISTRY.flush()
+        except OSError as e:
+            logger.warning(f"Could not write the metrics snapshot: {e!r}")
+        return response
+
+
+def fold_stack(frame) -> str:
+    """Returns a stack as `outermost;...;innermost`, the "folded" format read by
+    flame graph tools."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+@dataclass(eq=False)
+class SampledRequest:
+    """A request watched by a `StackSampler`.
+
+    Attributes:
+        started (float): When the request started (`time.perf_counter`).
+        threshold (float): Seconds after which its stacks are sampled.
+        thread_id (int): The thread serving it, or None to sample every thread
+            (async views run in a different thread than the middleware).
+        samples (Counter): The number of times each folded stack was seen.
+    """
+
+    started: float
+    threshold: float
+    thread_id: int = None
+    samples: Counter = field(default_factory=Counter)
+
+
+class StackSampler:
+    """
+    Samples the stacks of running requests from a background thread.
+
+    Every `interval` seconds, each watched request that has run longer than its
+    threshold gets the current stack of its thread added to its samples. The
+    thread is started with the first watched request and sleeps on a condition
+    while no request is watched, so it only wakes up while requests run.
+    """
+
+    def __init__(self, interval=STACK_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.requests = set()
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def watch(self, threshold, thread_id=None) -> SampledRequest:
+        request = SampledRequest(time.perf_counter(), threshold, thread_id)
+        with self.condition:
+            self.requests.add(request)
+            self.condition.notify()
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="stack-sampler", daemon=True
+                )
+                self.thread.start()
+        return request
+
+    def unwatch(self, request: SampledRequest) -> None:
+        with self.condition:
+            self.requests.discard(request)
+
+    def run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.requests)
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            with self.condition:
+                due = [r for r in self.requests if now - r.started >= r.threshold]
+            if not due:
+                continue
+            frames = sys._current_frames()
+            for request in due:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    if request.thread_id in (None, thread_id):
+                        request.samples[fold_stack(frame)] += 1
+
+
+class ProfilingMiddleware(InstrumentedMiddleware):
+    """
+    Reports where request time goes and keeps profiles of sampled and slow requests.
+
+    Every response gets a `Server-Timing` header splitting the request into
+    `db` (time in SQL queries), `render` (rendering a DRF or template response),
+    `serialize` (the rest of the view, which for the API views is mostly
+    serialization) and `total`, which browser developer tools display.
+
+    A `PROFILING_SAMPLE_RATE` fraction of requests is profiled with cProfile in
+    sync deployments, or with the stack sampler under ASGI, where the view runs
+    in another thread than the middleware. As only one cProfile profiler can run
+    at a time, requests overlapping one being profiled get the stack sampler too.
+    The result is written to `PROFILING_DIR` as a `.prof` file (for `pstats` or
+    snakeviz) or a `.folded` file (for flame graph tools). With `PROFILING_SLOW_MS` set, the stacks of
+    requests running longer than that are sampled as well and written out as
+    `.folded` files. Stack samples cover every thread the request may run in, so
+    under ASGI they can include concurrent requests.
+
+    The middleware is removed from the stack at startup unless
+    `PROFILING_ENABLED` is set, so it costs nothing when disabled.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.slow_seconds = settings.PROFILING_SLOW_MS / 1000
+        self.directory = Path(settings.PROFILING_DIR)
+        self.sampler = StackSampler()
+        if self.is_async:
+            self.process_template_response = self.aprocess_template_response
+
+    def before(self, request):
+        request.profiler = request.stack_samples = None
+        sampled = random.random() < self.sample_rate
+        if sampled and not self.is_async and self.start_profiler(request):
+            return
+        if sampled or self.slow_seconds:
+            request.stack_samples = self.sampler.watch(
+                0 if sampled else self.slow_seconds,
+                None if self.is_async else threading.get_ident(),
+            )
+
+    @staticmethod
+    def start_profiler(request) -> bool:
+        """Profiles the request with cProfile unless another request already is."""
+        if not profiler_lock.acquire(blocking=False):
+            return False
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool, e.g. a debugger, is active.
+            profiler_lock.release()
+            return False
+        request.profiler = profiler
+        return True
+
+    def after(self, request):
+        if getattr(request, "profiler", None) is not None:
+            request.profiler.disable()
+            profiler_lock.release()
+        if getattr(request, "stack_samples", None) is not None:
+            self.sampler.unwatch(request.stack_samples)
+
+    def process_template_response(self, request, response):
+        stats = request_stats.get()
+        started = time.perf_counter()
+
+        def rendered(response):
+            stats.render_seconds += time.perf_counter() - started
+
+        if stats is not None:
+            response.add_post_render_callback(rendered)
+        return response
+
+    async def aprocess_template_response(self, request, response):
+        return ProfilingMiddleware.process_template_response(self, request, response)
+
+    def finish(self, request, response, stats, seconds):
+        serialize = max(seconds - stats.db_seconds - stats.render_seconds, 0)
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;desc="{stats.queries} queries";dur={stats.db_seconds * 1000:.1f}',
+                f"serialize;dur={serialize * 1000:.1f}",
+                f"render;dur={stats.render_seconds * 1000:.1f}",
+                f"total;dur={seconds * 1000:.1f}",
+            ]
+        )
+        if request.profiler is not None:
+            request.profiler.dump_stats(self.profile_path(request, seconds, ".prof"))
+        elif request.stack_samples is not None and request.stack_samples.samples:
+            lines = (
+                f"{stack} {count}\n"
+                for stack, count in request.stack_samples.samples.items()
+            )
+            self.profile_path(request, seconds, ".folded").write_text("".join(lines))
+        return response
+
+    def profile_path(self, request, seconds, suffix) -> Path:
+        """Returns a file name telling when, what and how slow, e.g.
+        `20240601T120000.123456-article-list-create-412ms.prof`."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = timezone.now().strftime("%Y%m%dT%H%M%S.%f")
+        view = re.sub(r"[^\w.-]+", "-", view_name(request))
+        return self.directory / f"{stamp}-{view}-{seconds * 1000:.0f}ms{suffix}"
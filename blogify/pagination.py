@@ -0,0 +1,233 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (seek) pagination over a composite ordering.
+
+    The cursor holds the ordering values of the last row of the previous page, so
+    each page is fetched with a single range scan of the index on the ordering
+    fields (`WHERE a <= x AND (a < x OR (a = x AND b < y)) ORDER BY a, b
+    LIMIT n`, see `position_filter`). Unlike `PageNumberPagination` there is no
+    `COUNT(*)` and no `OFFSET`, so the cost of a page does not depend on how deep
+    it is.
+
+    Attributes:
+    - page_size: The number of items per page.
+    - cursor_query_param: The query parameter holding the opaque cursor.
+    - ordering: The default ordering, overridden by the `ordering` view attribute.
+      All fields must be sorted in the same direction and the last one must be
+      unique (normally `id`)."""
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    ordering = ("-id",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Returns a single page of results for the cursor given in the request.
+
+        Parameters:
+        - queryset: The queryset to paginate.
+        - request: The current request.
+        - view: The view that is paginating the queryset.
+
+        Returns:
+        - A list with at most `page_size` objects."""
+        queryset, cursor = self.get_page_queryset(queryset, request, view)
+        return self.set_page(list(queryset[: self.page_size + 1]), cursor)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Asynchronous version of `paginate_queryset` for native async views.
+
+        `request` may be a plain Django request as well as a DRF one."""
+        queryset, cursor = self.get_page_queryset(queryset, request, view)
+        results = [obj async for obj in queryset[: self.page_size + 1]]
+        return self.set_page(results, cursor)
+
+    def get_page_queryset(self, queryset, request, view):
+        """Orders and filters `queryset` for the requested page.
+
+        Returns:
+        - A `(queryset, cursor)` tuple; the queryset still has to be sliced to
+          `page_size + 1` rows, the extra row telling whether there are more."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(getattr(view, "ordering", None) or self.ordering)
+        self.fields = [name.lstrip("-") for name in self.ordering]
+        cursor = self.decode_cursor(request, queryset.model)
+
+        reverse, position = cursor if cursor else (False, None)
+        descending = self.ordering[0].startswith("-")
+        if reverse:
+            ordering = [self.invert(name) for name in self.ordering]
+        else:
+            ordering = list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.position_filter(position, descending=descending != reverse)
+            )
+        return queryset, cursor
+
+    def set_page(self, results, cursor):
+        """Stores the fetched rows as the current page and returns it."""
+        reverse = cursor[0] if cursor else False
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_paginated_data(self, data):
+        """Wraps the serialized page into the paginated payload."""
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(True, self.page[0])
+
+    def position_filter(self, position, descending):
+        """Builds the lexicographic `(a, b, ...) > (x, y, ...)` condition.
+
+        The expanded `a > x OR (a = x AND b > y) OR ...` is AND-ed with a leading
+        `a >= x`, which bounds the scan of the index on the ordering fields to a
+        single range; without it the planner may combine the branches with a
+        BitmapOr and a sort, whose cost grows with the page depth.
+
+        Parameters:
+        - position: The ordering values of the row the page starts after.
+        - descending: Whether the rows are walked in descending order.
+
+        Returns:
+        - A Q object selecting the rows that come after `position`."""
+        lookup = "lt" if descending else "gt"
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            step = Q(**{f"{name}__{lookup}": position[index]})
+            for previous, value in zip(self.fields[:index], position[:index]):
+                step &= Q(**{previous: value})
+            condition |= step
+        bound = "lte" if descending else "gte"
+        return Q(**{f"{self.fields[0]}__{bound}": position[0]}) & condition
+
+    def encode_cursor(self, reverse, obj):
+        """Returns the page URL for a cursor positioned at `obj`."""
+        position = [
+            obj._meta.get_field(name).value_to_string(obj) for name in self.fields
+        ]
+        payload = json.dumps([int(reverse), position], separators=(",", ":"))
+        token = urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        """Parses the cursor from the request.
+
+        Returns:
+        - None if no cursor was given, otherwise a `(reverse, position)` tuple.
+
+        Raises:
+        - NotFound: If the cursor is malformed."""
+        params = getattr(request, "query_params", request.GET)
+        token = params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            reverse, raw_position = json.loads(payload)
+            if len(raw_position) != len(self.fields):
+                raise ValueError(token)
+            position = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, raw_position)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), position
+
+    @staticmethod
+    def invert(name):
+        return name[1:] if name.startswith("-") else f"-{name}"
+
+
+class CursorOrPageNumberPagination(BasePagination):
+    """Page-number pagination by default, keyset pagination on request.
+
+    Clients opt into keyset pagination with `?pagination=cursor`; the `next` and
+    `previous` links it returns carry a `cursor` parameter, which keeps them in
+    that mode. Existing clients that use `?page=` keep getting page numbers and
+    the `count` field."""
+
+    mode_query_param = "pagination"
+    page_number_class = PageNumberPagination
+    keyset_class = KeysetPagination
+
+    def __init__(self):
+        self.page_number_paginator = self.page_number_class()
+        self.keyset_paginator = self.keyset_class()
+        self.paginator = self.page_number_paginator
+
+    def wants_keyset(self, request):
+        """Checks whether the request asks for keyset pagination."""
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == "cursor"
+            or self.keyset_paginator.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_keyset(request):
+            self.paginator = self.keyset_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_paginator.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return self.page_number_paginator.get_schema_operation_parameters(view)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, "display_page_controls", False)
+
+    def to_html(self):
+        return self.paginator.to_html()
@@ -46,9 +46,12 @@ INSTALLED_APPS = [
     "blog",
     "users",
     "news",
+    "search",
 ]
 
 MIDDLEWARE = [
+    "blogify.middleware.MetricsMiddleware",
+    "blogify.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -59,6 +62,15 @@ MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+# Request profiling (see blogify.middleware.ProfilingMiddleware). When disabled
+# the middleware removes itself at startup.
+PROFILING_ENABLED = config("PROFILING_ENABLED", default=False, cast=bool)
+# Fraction of requests profiled, e.g. 0.01 for one in a hundred.
+PROFILING_SAMPLE_RATE = config("PROFILING_SAMPLE_RATE", default=0.0, cast=float)
+# Requests running longer than this many milliseconds are sampled; 0 disables it.
+PROFILING_SLOW_MS = config("PROFILING_SLOW_MS", default=0, cast=float)
+PROFILING_DIR = config("PROFILING_DIR", default=str(BASE_DIR / "profiles"))
+
 ROOT_URLCONF = "blogify.urls"
 
 TEMPLATES = [
@@ -97,9 +109,35 @@ DATABASES = {
         "PASSWORD": config("DATABASE_PASSWORD"),
         "HOST": config("DATABASE_HOST"),
         "PORT": config("DATABASE_PORT"),
+        # Persistent connections, checked before reuse. They pay off in
+        # processes that serve requests from a fixed set of threads (WSGI
+        # servers, runserver, the notification worker). Django 5.0 under ASGI
+        # runs each request's sync code in a fresh thread, so a persistent
+        # connection would outlive its request unused; ASGI servers should set
+        # DATABASE_CONN_MAX_AGE=0 and pool connections outside Django instead.
+        "CONN_MAX_AGE": config("DATABASE_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The local-memory default is per process; point CACHE_BACKEND/CACHE_LOCATION at
+# a shared backend (e.g. Redis) when running more than one worker.
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="blogify"),
+    }
+}
+
+# Seconds the article and news API responses are cached; writes invalidate
+# them at once in this process and, with a shared backend, in every process.
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=300, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -166,4 +204,18 @@ REST_FRAMEWORK = {
 }
 
 TELEGRAM_TOKEN = config("TELEGRAM_TOKEN")
+# Notification fan-out: Telegram allows ~30 messages/s per bot and ~1/s per chat.
+TELEGRAM_SEND_RATE = config("TELEGRAM_SEND_RATE", default=30, cast=float)
+TELEGRAM_CHAT_SEND_RATE = config("TELEGRAM_CHAT_SEND_RATE", default=1, cast=float)
+TELEGRAM_SEND_CONCURRENCY = config("TELEGRAM_SEND_CONCURRENCY", default=32, cast=int)
+TELEGRAM_SEND_RETRIES = config("TELEGRAM_SEND_RETRIES", default=3, cast=int)
+# Articles published in a burst are announced in one digest, sent once no new
+# article has come for NOTIFICATION_DIGEST_QUIET seconds, but never later than
+# NOTIFICATION_DIGEST_WINDOW seconds after the first one.
+NOTIFICATION_DIGEST_QUIET = config("NOTIFICATION_DIGEST_QUIET", default=30, cast=float)
+NOTIFICATION_DIGEST_WINDOW = config(
+    "NOTIFICATION_DIGEST_WINDOW", default=300, cast=float
+)
+# Webhook mode: Telegram must send this secret with every update.
+TELEGRAM_WEBHOOK_SECRET = config("TELEGRAM_WEBHOOK_SECRET", default="")
 API_URL = config("API_URL")
@@ -0,0 +1,108 @@
+"""
+Test helpers shared by the apps' test suites.
+
+`QueryBudgetMixin` guards endpoints against extra queries and N+1 patterns: it
+records the number of SQL queries and the database time of a block of code,
+optionally at several data sizes, and fails the test when a budget is exceeded.
+Set `QUERY_BUDGET_REPORT` to a file name to have every measurement appended to
+it as a JSON line, e.g. to compare runs before and after a change.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin for per-endpoint query budgets.
+
+    Attributes:
+        data_sizes (tuple): The row counts `assertQueryBudgetAtSizes` measures at.
+    """
+
+    data_sizes = (1, 10, 100)
+
+    @contextmanager
+    def assertQueryBudget(self, label, queries, milliseconds=None, size=None):
+        """Fails if the block runs more than `queries` queries.
+
+        Args:
+            label (str): The name of the measured operation, used in reports.
+            queries (int): The maximum number of queries.
+            milliseconds (float): The maximum total database time, if any. Keep it
+                generous; it is meant to catch gross regressions, not jitter.
+            size (int): The data size the measurement was taken at, for reports.
+        """
+        timings = []
+
+        def timed(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timings.append(time.perf_counter() - started)
+
+        with CaptureQueriesContext(connection) as context:
+            with connection.execute_wrapper(timed):
+                yield context
+        captured = context.captured_queries
+        seconds = sum(timings)
+        self.record_query_budget(label, size, len(captured), seconds)
+        if len(captured) > queries:
+            statements = "\n".join(
+                f"{number}. {query['sql']}" for number, query in enumerate(captured, 1)
+            )
+            self.fail(
+                f"{label}: {len(captured)} queries exceed the budget of {queries}:\n"
+                f"{statements}"
+            )
+        if milliseconds is not None and seconds * 1000 > milliseconds:
+            self.fail(
+                f"{label}: {seconds * 1000:.1f} ms of database time exceed the "
+                f"budget of {milliseconds} ms"
+            )
+
+    def assertQueryBudgetAtSizes(self, label, queries, populate, request, milliseconds=None):
+        """Measures `request` at every size in `data_sizes`.
+
+        Each size must stay within the budget and use as many queries as the
+        smallest one, so a query count that grows with the data (an N+1) fails
+        even when it is still below the budget.
+
+        Args:
+            label (str): The name of the measured operation.
+            queries (int): The maximum number of queries per request.
+            populate (callable): Called with a row count; tops the data up to it.
+            request (callable): Runs the measured operation.
+            milliseconds (float): The maximum total database time per request.
+        """
+        counts = {}
+        for size in self.data_sizes:
+            populate(size)
+            with self.assertQueryBudget(label, queries, milliseconds, size) as context:
+                request()
+            counts[size] = len(context.captured_queries)
+        self.assertEqual(
+            len(set(counts.values())),
+            1,
+            f"{label}: the number of queries grows with the data: {counts}",
+        )
+
+    def record_query_budget(self, label, size, queries, seconds):
+        path = os.environ.get("QUERY_BUDGET_REPORT")
+        if not path:
+            return
+        entry = {
+            "test": self.id(),
+            "label": label,
+            "size": size,
+            "queries": queries,
+            "db_ms": round(seconds * 1000, 3),
+        }
+        with open(path, "a", encoding="utf-8") as report:
+            report.write(json.dumps(entry) + "\n")
@@ -19,12 +19,22 @@ from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
+from .export import AsyncExportView, ExportView
+from .views import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
     path("accounts/", include("allauth.urls")),
     path("api-auth/", include("rest_framework.urls")),
     path("", include("users.urls")),
     path("api/", include("blog.urls")),
     path("api/", include("news.urls")),
+    path("api/", include("search.urls")),
+    path("api/export/<str:dataset>/", ExportView.as_view(), name="export"),
+    path(
+        "api/async/export/<str:dataset>/",
+        AsyncExportView.as_view(),
+        name="async-export",
+    ),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
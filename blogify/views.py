@@ -0,0 +1,11 @@
+from django.http import HttpResponse
+
+from . import metrics
+
+
+def metrics_view(request):
+    """Serves the metrics of all processes in the Prometheus text format."""
+    return HttpResponse(
+        metrics.REGISTRY.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,123 @@
+"""
+Native async versions of the news API endpoints, mounted under `/api/async/`.
+
+The scraper talks to these: they run on the event loop under ASGI, so many
+concurrent scraper requests do not need a thread each. Payloads match the DRF
+views in `news.views`; the news list always uses keyset pages.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import ValidationError
+from blogify.async_views import AsyncAPIView
+from blogify.cache import bump_generation
+from blogify.fieldsets import SparseFieldsetMixin
+from blogify.pagination import KeysetPagination
+from .models import NewsArticle
+from .serializers import NewsArticleBulkSerializer, NewsArticleSerializer
+from .views import NewsArticleBulkCreate, NewsArticleListCreate, NewsArticleUrlList
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncNewsArticleListCreate(SparseFieldsetMixin, AsyncAPIView):
+    """Lists news articles in keyset pages and creates single ones."""
+
+    ordering = NewsArticleListCreate.ordering
+
+    def get_serializer_class(self):
+        return NewsArticleSerializer
+
+    async def get(self, request):
+        fields = self.get_sparse_fields()
+        paginator = KeysetPagination()
+        page = await paginator.apaginate_queryset(
+            NewsArticle.objects.all(), request, self
+        )
+        data = NewsArticleSerializer(page, many=True, fields=fields).data
+        return JsonResponse(paginator.get_paginated_data(data))
+
+    async def post(self, request):
+        # The unique check of `NewsArticleSerializer` would query synchronously,
+        # so the URL is validated without it and checked here.
+        serializer = NewsArticleBulkSerializer(data=self.get_data(request))
+        serializer.is_valid(raise_exception=True)
+        duplicate = ValidationError(
+            {"url": ["news article with this url already exists."]}
+        )
+        url = serializer.validated_data["url"]
+        if await NewsArticle.objects.filter(url=url).aexists():
+            raise duplicate
+        try:
+            article = await NewsArticle.objects.acreate(**serializer.validated_data)
+        except IntegrityError:
+            raise duplicate
+        return JsonResponse(NewsArticleSerializer(article).data, status=201)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncNewsArticleBulkCreate(AsyncAPIView):
+    """Creates many news articles at once; see `NewsArticleBulkCreate`.
+
+    Duplicates are skipped by `bulk_create(ignore_conflicts=True)`, so the insert
+    needs no transaction around the lookup of the already stored URLs."""
+
+    max_batch_size = NewsArticleBulkCreate.max_batch_size
+
+    async def post(self, request):
+        serializer = NewsArticleBulkSerializer(
+            data=self.get_data(request), many=True, max_length=self.max_batch_size
+        )
+        serializer.is_valid(raise_exception=True)
+
+        items = {}
+        for item in serializer.validated_data:
+            items.setdefault(item["url"], item)
+        existing = {
+            url
+            async for url in NewsArticle.objects.filter(url__in=items).values_list(
+                "url", flat=True
+            )
+        }
+        new_articles = [
+            NewsArticle(**item) for url, item in items.items() if url not in existing
+        ]
+        await NewsArticle.objects.abulk_create(new_articles, ignore_conflicts=True)
+        # bulk_create sends no post_save signals; there is no transaction to wait for.
+        await sync_to_async(bump_generation)("news")
+        return JsonResponse(
+            {
+                "created": len(new_articles),
+                "skipped": len(serializer.validated_data) - len(new_articles),
+            },
+            status=201,
+        )
+
+
+class AsyncNewsArticleUrlList(AsyncAPIView):
+    """Lists stored news URLs after `?after=<id>`; see `NewsArticleUrlList`."""
+
+    page_size = NewsArticleUrlList.page_size
+
+    async def get(self, request):
+        try:
+            after = int(request.GET.get("after", 0))
+        except ValueError:
+            return JsonResponse({"message": "after must be an integer."}, status=400)
+        rows = [
+            row
+            async for row in NewsArticle.objects.filter(id__gt=after)
+            .order_by("id")
+            .values_list("id", "url")[: self.page_size + 1]
+        ]
+        more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        return JsonResponse(
+            {
+                "urls": [url for _, url in rows],
+                "last_id": rows[-1][0] if rows else after,
+                "more": more,
+            }
+        )
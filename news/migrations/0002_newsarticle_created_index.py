@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['created_at', 'id'], name='news_article_created_idx'),
+        ),
+    ]
@@ -7,5 +7,10 @@ class NewsArticle(models.Model):
     url = models.URLField(unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="news_article_created_idx"),
+        ]
+
     def __str__(self):
         return self.title
@@ -1,40 +1,223 @@
 import aiohttp
 import asyncio
+import json
 import logging
-import requests
+import os
+import sys
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Callable
+from urllib.parse import urljoin
+from xml.etree import ElementTree
 from decouple import config
 from bs4 import BeautifulSoup
 
+if __package__ in (None, ""):
+    # Run as `python news/news_scraper.py`: make the project packages importable.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from blogify import metrics
 
-# Configure logging
-logging.basicConfig(
-    filename="news_scraper.log",
-    format="[%(asctime)s] [%(levelname)s] => %(message)s]",
-    level=logging.INFO,
-)
+# Maximum number of sources downloaded at the same time.
+MAX_CONCURRENT_FETCHES = 8
+# Articles sent per request to the bulk endpoint (its `max_batch_size`).
+SAVE_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class Source:
+    """
+    A page or feed the scraper collects news from.
+
+    Attributes:
+        name (str): A unique name used in logs.
+        url (str): The URL to download.
+        parse (Callable[[str], list[dict]]): Turns the downloaded document into
+            a list of `{"title", "url"}` dictionaries.
+        timeout (float): Seconds allowed for one download attempt.
+        retries (int): How many times a failed download is retried.
+    """
+
+    name: str
+    url: str
+    parse: Callable[[str], list[dict]]
+    timeout: float = 10.0
+    retries: int = 2
+
+
+SOURCES: dict[str, Source] = {}
+
+
+class ScraperState:
+    """
+    State kept between scraper runs in a JSON file.
+
+    Attributes:
+        path (str): The file the state is stored in.
+        validators (dict): The `ETag`/`Last-Modified` values of the last saved
+            response of each source, sent back as conditional request headers.
+        seen_urls (set[str]): URLs already stored by the API.
+        last_news_id (int): The highest `NewsArticle` id `seen_urls` is synced up to.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.validators = {}
+        self.pending_validators = {}
+        self.seen_urls = set()
+        self.last_news_id = 0
+
+    @classmethod
+    def load(cls, path: str) -> "ScraperState":
+        """Reads the state from `path`, starting afresh if the file is missing or broken."""
+        state = cls(path)
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            state.validators = data["validators"]
+            state.seen_urls = set(data["seen_urls"])
+            state.last_news_id = data["last_news_id"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Ignoring unreadable scraper state {path}: {e!r}")
+            state = cls(path)
+        return state
+
+    def save(self) -> None:
+        """Writes the state to its file atomically."""
+        data = {
+            "validators": self.validators,
+            "seen_urls": sorted(self.seen_urls),
+            "last_news_id": self.last_news_id,
+        }
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(temporary_path, self.path)
+
+    def conditional_headers(self, source: Source) -> dict:
+        """Returns the `If-None-Match`/`If-Modified-Since` headers for a source."""
+        validators = self.validators.get(source.name, {})
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def remember_validators(self, source: Source, headers) -> None:
+        """Holds the validators of a fresh response until its articles are saved."""
+        self.pending_validators[source.name] = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+
+    def commit(self, source: Source, news_items: list[dict]) -> None:
+        """Records that the articles of a source have been stored."""
+        self.seen_urls.update(item["url"] for item in news_items)
+        if source.name in self.pending_validators:
+            self.validators[source.name] = self.pending_validators.pop(source.name)
+
+    def unseen(self, news_items: list[dict]) -> list[dict]:
+        """Drops articles whose URL is already stored or repeated in the list."""
+        batch_urls = set()
+        unseen_items = []
+        for item in news_items:
+            url = item["url"]
+            if url not in self.seen_urls and url not in batch_urls:
+                batch_urls.add(url)
+                unseen_items.append(item)
+        return unseen_items
+
+
+def register_source(source: Source) -> Source:
+    """Adds a source to the registry used by `scrape` by default."""
+    SOURCES[source.name] = source
+    return source
+
+
+class TitlelineParser(HTMLParser):
+    """
+    Event-driven extractor for the `.titleline` elements of a Hacker News page.
+
+    It collects titles and links in a single pass over the document without
+    building a tree: the text of every element with the `titleline` class and the
+    `href` of the first link inside it are recorded as the parser streams by,
+    which gives the same records as `parse_hacker_news_soup`.
 
+    Attributes:
+        news_items (list[dict]): The `{"title", "url"}` records found so far.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.news_items = []
+        self._tag = None
+        self._depth = 0
+        self._text = []
+        self._url = None
+        self._has_link = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._tag is None:
+            for name, value in attrs:
+                if name == "class" and value and "titleline" in value.split():
+                    self._tag, self._depth = tag, 1
+                    self._text, self._url, self._has_link = [], None, False
+                    break
+        elif tag == self._tag:
+            self._depth += 1
+        elif tag == "a" and not self._has_link:
+            self._has_link = True
+            self._url = dict(attrs).get("href")
+
+    def handle_endtag(self, tag):
+        if tag == self._tag:
+            self._depth -= 1
+            if not self._depth:
+                self.news_items.append({"title": "".join(self._text), "url": self._url})
+                self._tag = None
 
-def fetch_news():
+    def handle_data(self, data):
+        if self._tag is not None:
+            self._text.append(data)
+
+
+def parse_hacker_news(html: str) -> list[dict]:
     """
-    Fetches news articles from Hacker News (https://news.ycombinator.com/).
+    Extracts the titles and URLs of the articles listed on a Hacker News page.
+
+    This is the fast path: the page is streamed through `TitlelineParser` instead
+    of being turned into a BeautifulSoup tree.
 
-    This function scrapes the Hacker News homepage and retrieves titles and URLs
-    of the listed articles. It returns a list of dictionaries, where each dictionary
-    contains a 'title' and a 'url' key.
+    Args:
+        html (str): The HTML of a Hacker News listing page.
 
     Returns:
         list[dict]: A list of dictionaries containing news article information
                     (title and URL), or an empty list if no articles are found.
     """
-    url = "https://news.ycombinator.com/"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Checking for HTTP errors
-    except requests.RequestException as e:
-        logging.exception(f"Error fetching the page: {e}")
-        return []
+    parser = TitlelineParser()
+    parser.feed(html)
+    parser.close()
+    return parser.news_items
+
+
+def parse_hacker_news_soup(html: str) -> list[dict]:
+    """
+    Extracts the same records as `parse_hacker_news` with a BeautifulSoup tree.
+
+    It is slower and allocates much more, but copes with markup the streaming
+    parser does not, so it remains available for sources that need it.
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    Args:
+        html (str): The HTML of a Hacker News listing page.
+
+    Returns:
+        list[dict]: A list of dictionaries containing news article information
+                    (title and URL), or an empty list if no articles are found.
+    """
+    soup = BeautifulSoup(html, "html.parser")
     news_items = []
     for item in soup.select(".titleline"):
         title = item.get_text()
@@ -43,40 +226,251 @@ def fetch_news():
     return news_items
 
 
-async def save_news(news_items: list[dict]) -> None:
+def parse_feed(xml: str) -> list[dict]:
+    """
+    Extracts the titles and links of the entries of an RSS 2.0 or Atom feed.
+
+    Args:
+        xml (str): The feed document.
+
+    Returns:
+        list[dict]: A list of dictionaries containing news article information
+                    (title and URL).
+    """
+    atom = "{http://www.w3.org/2005/Atom}"
+    root = ElementTree.fromstring(xml)
+    news_items = []
+    for item in root.iter("item"):
+        title, url = item.findtext("title"), item.findtext("link")
+        if title and url:
+            news_items.append({"title": title.strip(), "url": url.strip()})
+    for entry in root.iter(f"{atom}entry"):
+        title, link = entry.findtext(f"{atom}title"), entry.find(f"{atom}link")
+        if title and link is not None and link.get("href"):
+            news_items.append({"title": title.strip(), "url": link.get("href")})
+    return news_items
+
+
+register_source(Source("hn-front", "https://news.ycombinator.com/", parse_hacker_news))
+register_source(
+    Source("hn-page-2", "https://news.ycombinator.com/?p=2", parse_hacker_news)
+)
+register_source(
+    Source("hn-newest", "https://news.ycombinator.com/newest", parse_hacker_news)
+)
+register_source(Source("hn-show", "https://news.ycombinator.com/show", parse_hacker_news))
+register_source(Source("lobsters", "https://lobste.rs/rss", parse_feed))
+
+
+async def fetch_news(
+    session: aiohttp.ClientSession, source: Source, state: ScraperState = None
+) -> list[dict]:
+    """
+    Downloads one source and extracts its news articles.
+
+    Each attempt is limited to `source.timeout` seconds; failed attempts are retried
+    up to `source.retries` times with a growing delay. Relative links are resolved
+    against the source URL. With a `state`, the request is conditional on the
+    validators of the last saved response, and an unchanged source (304) is not
+    downloaded or parsed again.
+
+    Args:
+        session (aiohttp.ClientSession): The session shared by all downloads.
+        source (Source): The source to download.
+        state (ScraperState): The scraper state holding the source's validators.
+
+    Returns:
+        list[dict]: A list of dictionaries containing news article information
+                    (title and URL), or an empty list if the source failed or
+                    did not change.
+    """
+    timeout = aiohttp.ClientTimeout(total=source.timeout)
+    headers = state.conditional_headers(source) if state else {}
+    for attempt in range(source.retries + 1):
+        try:
+            async with session.get(
+                source.url, timeout=timeout, headers=headers
+            ) as response:
+                if response.status == 304:
+                    logging.info(f"{source.name} has not changed")
+                    return []
+                response.raise_for_status()  # Checking for HTTP errors
+                document = await response.text()
+                if state:
+                    state.remember_validators(source, response.headers)
+            break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == source.retries:
+                logging.error(f"Error fetching {source.name}: {e!r}")
+                return []
+            logging.warning(f"Retrying {source.name} after error: {e!r}")
+            await asyncio.sleep(0.5 * 2**attempt)
+
+    try:
+        news_items = source.parse(document)
+    except Exception as e:
+        logging.exception(f"Error parsing {source.name}: {e}")
+        return []
+    for item in news_items:
+        item["url"] = urljoin(source.url, item["url"])
+    logging.info(f"Fetched {len(news_items)} articles from {source.name}")
+    return news_items
+
+
+async def scrape(session: aiohttp.ClientSession, sources=None, state=None):
+    """
+    Downloads sources concurrently and yields their articles as each one finishes.
+
+    At most `MAX_CONCURRENT_FETCHES` downloads run at the same time, so the total
+    time is close to that of the slowest source rather than the sum of all of them.
+
+    Args:
+        session (aiohttp.ClientSession): The session shared by all downloads.
+        sources (Iterable[Source]): The sources to scrape, all registered ones by default.
+        state (ScraperState): The scraper state used for conditional requests.
+
+    Yields:
+        tuple[Source, list[dict]]: A source and the articles it returned.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+    async def fetch(source):
+        async with semaphore:
+            return source, await fetch_news(session, source, state)
+
+    sources = SOURCES.values() if sources is None else sources
+    for result in asyncio.as_completed([fetch(source) for source in sources]):
+        yield await result
+
+
+async def save_news(news_items: list[dict], session=None, api_url=None) -> dict:
     """
     Saves fetched news articles to the database via Django REST API.
 
-    This function iterates through the provided list of news articles (dictionaries)
-    and attempts to create them via the `NewsArticle` API endpoint. If an article with the
-    same title and URL already exists, it is skipped to avoid duplicates. Any exceptions
+    This function sends the news articles (dictionaries) to the bulk `NewsArticle`
+    API endpoint, `SAVE_BATCH_SIZE` articles per request. Articles whose URL already
+    exists are skipped by the endpoint to avoid duplicates. Any exceptions
     encountered during saving are logged for debugging purposes.
 
     Args:
         news_items (list[dict]): A list of dictionaries containing news article information
                                 (title and URL).
+        session (aiohttp.ClientSession): The session to send the requests with, a new
+                                         one by default.
+        api_url (str): The base URL of the API, `API_URL` from the environment by default.
+
+    Returns:
+        dict: The `created` and `skipped` counts, or None if not all articles were saved.
+    """
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await save_news(news_items, session, api_url)
+
+    api_url = f"{api_url or config('API_URL')}/api/async/news/bulk/"
+    total = {"created": 0, "skipped": 0}
+    for start in range(0, len(news_items), SAVE_BATCH_SIZE):
+        batch = news_items[start : start + SAVE_BATCH_SIZE]
+        try:
+            async with session.post(api_url, json=batch) as response:
+                if response.status != 201:
+                    logging.error(
+                        f"Failed to save articles: {response.status} "
+                        f"{await response.text()}"
+                    )
+                    return None
+                result = await response.json()
+        except Exception as e:
+            logging.error(f"Error saving articles: {e}")
+            return None
+        total["created"] += result["created"]
+        total["skipped"] += result["skipped"]
+    logging.info(
+        f"Saved {total['created']} articles, skipped {total['skipped']} existing ones"
+    )
+    return total
+
+
+async def sync_seen_urls(session, state: ScraperState, api_url=None) -> None:
+    """
+    Adds the URLs stored since the last sync to `state.seen_urls`.
+
+    Only articles with an id above `state.last_news_id` are requested, so an
+    up-to-date state costs one small request. If the API cannot be reached the
+    local set is used as it is.
+
+    Args:
+        session (aiohttp.ClientSession): The session to send the requests with.
+        state (ScraperState): The scraper state to update.
+        api_url (str): The base URL of the API, `API_URL` from the environment by default.
+    """
+    urls_url = f"{api_url or config('API_URL')}/api/async/news/urls/"
+    try:
+        while True:
+            async with session.get(
+                urls_url, params={"after": state.last_news_id}
+            ) as response:
+                response.raise_for_status()
+                data = await response.json()
+            state.seen_urls.update(data["urls"])
+            state.last_news_id = data["last_id"]
+            if not data["more"]:
+                break
+    except Exception as e:
+        logging.error(f"Error syncing stored news URLs: {e!r}")
+
+
+async def run(sources=None, api_url=None, state_path=None) -> int:
+    """
+    Scrapes the sources and saves the new articles of each one as soon as it arrives.
+
+    Sources are requested conditionally and articles whose URL is already stored
+    are dropped before anything is sent to the API, so a run over unchanged sources
+    downloads and writes next to nothing. The state is saved at the end of the run.
+
+    Args:
+        sources (Iterable[Source]): The sources to scrape, all registered ones by default.
+        api_url (str): The base URL of the API, `API_URL` from the environment by default.
+        state_path (str): The state file, `SCRAPER_STATE_FILE` from the environment by default.
+
+    Returns:
+        int: The number of new articles fetched.
     """
-    api_url = f"{config('API_URL')}/api/news/"
+    state = ScraperState.load(
+        state_path or config("SCRAPER_STATE_FILE", default="news_scraper_state.json")
+    )
+    fetched = 0
     async with aiohttp.ClientSession() as session:
-        for item in news_items:
-            try:
-                async with session.post(api_url, json=item) as response:
-                    if response.status == 201:
-                        logging.info(f"Successfully saved article: {item['title']}")
-                    elif response.status == 400:
-                        logging.warning(f"Article already exists: {item['title']}")
-                    else:
-                        logging.exception(
-                            f"Failed to save article {item['title']}: {response.status}"
-                        )
-            except Exception as e:
-                logging.error(f"Error saving article {item['title']}: {e}")
+        await sync_seen_urls(session, state, api_url)
+        async for source, news_items in scrape(session, sources, state):
+            unseen = state.unseen(news_items)
+            items = metrics.SCRAPER_ITEMS
+            items.inc(source.name, "fetched", amount=len(news_items))
+            items.inc(source.name, "skipped", amount=len(news_items) - len(unseen))
+            news_items = unseen
+            if news_items:
+                saved = await save_news(news_items, session, api_url)
+                if not saved:
+                    continue
+                items.inc(source.name, "saved", amount=saved["created"])
+                items.inc(source.name, "skipped", amount=saved["skipped"])
+                fetched += saved["created"]
+            state.commit(source, news_items)
+    state.save()
+    return fetched
 
 
-if __name__ == "__main__":
-    news_items = fetch_news()
-    if news_items:
-        asyncio.run(save_news(news_items))
+def main():
+    # Configure logging
+    logging.basicConfig(
+        filename="news_scraper.log",
+        format="[%(asctime)s] [%(levelname)s] => %(message)s]",
+        level=logging.INFO,
+    )
+    if asyncio.run(run()):
         logging.info("News articles fetched and saved successfully.")
     else:
         logging.info("No news articles fetched.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
 from rest_framework import serializers
+from blogify.fieldsets import SparseFieldsetSerializerMixin
 from .models import NewsArticle
 
 
-class NewsArticleSerializer(serializers.ModelSerializer):
+class NewsArticleSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer class for NewsArticle model.
 
     This serializer handles the serialization and deserialization of NewsArticle objects,
     converting between model instances and JSON representations. It specifies the fields
-    to be included in the serialized output.
+    to be included in the serialized output, which `fields` can narrow down further
+    (see `blogify.fieldsets`).
 
     Attributes:
         model (type): The model class that this serializer serializes.
@@ -18,3 +20,16 @@ class NewsArticleSerializer(serializers.ModelSerializer):
     class Meta:
         model = NewsArticle
         fields = ["title", "url"]
+
+
+class NewsArticleBulkSerializer(NewsArticleSerializer):
+    """
+    Serializer for one item of a bulk news upload.
+
+    It validates the same fields as `NewsArticleSerializer` but drops the per-item
+    unique check on `url`, which would cost one query per item. Duplicates are
+    skipped by the bulk insert itself instead.
+    """
+
+    class Meta(NewsArticleSerializer.Meta):
+        extra_kwargs = {"url": {"validators": []}}
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from blogify.cache import bump_generation_on_write
+from news.models import NewsArticle
+
+
+@receiver(post_save, sender=NewsArticle)
+@receiver(post_delete, sender=NewsArticle)
+def invalidate_news_responses(sender, instance, **kwargs):
+    """
+    Invalidates the cached news list pages.
+
+    Bulk inserts send no signals; the bulk endpoints invalidate the pages themselves.
+
+    Args:
+        sender (Model): The model class that sent the signal (`NewsArticle`).
+        instance (NewsArticle): The news article that was saved or deleted.
+        **kwargs: Additional keyword arguments passed by the signal.
+    """
+    bump_generation_on_write("news")
@@ -1,8 +1,40 @@
 from django.test import TestCase
+import asyncio
 import json
+import os
+import tempfile
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from django.test import TestCase, Client
 from django.urls import reverse
+from benchmarks.scraper import StandIn, build_page
+from blogify import metrics
+from blogify.cache import bump_generation
+from blogify.testing import QueryBudgetMixin
 from news.models import NewsArticle
+from news.news_scraper import (
+    Source,
+    parse_feed,
+    parse_hacker_news,
+    parse_hacker_news_soup,
+    run,
+    save_news,
+    scrape,
+)
+
+HN_PAGE = """<html><body><table>
+<tr class="athing" id="1"><td class="title"><span class="titleline">
+<a href="https://example.com/a">First &amp; story</a><span class="sitebit comhead">
+(<a href="from?site=example.com"><span class="sitestr">example.com</span></a>)</span>
+</span></td></tr>
+<tr class="athing" id="2"><td class="title"><span class="titleline">
+<a href="item?id=2">Ask HN: Second story</a></span></td></tr>
+</table></body></html>"""
+
+RSS_FEED = """<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>
+<item><title>Feed story</title><link>https://example.org/feed-story</link></item>
+</channel></rss>"""
 
 
 class NewsArticleTests(TestCase):
@@ -44,3 +76,407 @@ class NewsArticleTests(TestCase):
         self.assertEqual(articles.count(), 3)
         new_article = NewsArticle.objects.get(title="New Article")
         self.assertEqual(new_article.url, data["url"])
+
+    def test_get_news_articles_cursor_mode(self):
+        response = self.client.get(self.list_url, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertNotIn("count", data)
+        self.assertIsNone(data["next"])
+        self.assertEqual(
+            [item["url"] for item in data["results"]],
+            [self.article2.url, self.article1.url],
+        )
+
+    def test_bulk_inserts_invalidate_cached_pages(self):
+        self.assertEqual(self.client.get(self.list_url).json()["count"], 2)
+        self.client.post(
+            reverse("news-article-bulk-create"),
+            data=json.dumps([{"title": "Bulk", "url": "http://example.com/bulk"}]),
+            content_type="application/json",
+        )
+        self.assertEqual(self.client.get(self.list_url).json()["count"], 3)
+
+    def test_get_news_articles_sparse_fieldset(self):
+        response = self.client.get(self.list_url, {"fields": "url"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [{"url": self.article1.url}, {"url": self.article2.url}],
+        )
+
+
+class NewsArticleUrlListTests(TestCase):
+
+    def test_urls_after_id(self):
+        articles = [
+            NewsArticle.objects.create(title=f"Article {i}", url=f"http://example.com/{i}")
+            for i in range(3)
+        ]
+        url = reverse("news-article-url-list")
+
+        data = self.client.get(url).json()
+        self.assertEqual(data["urls"], [article.url for article in articles])
+        self.assertEqual(data["last_id"], articles[-1].id)
+        self.assertFalse(data["more"])
+
+        data = self.client.get(url, {"after": articles[0].id}).json()
+        self.assertEqual(data["urls"], [articles[1].url, articles[2].url])
+
+        data = self.client.get(url, {"after": articles[-1].id}).json()
+        self.assertEqual(data, {"urls": [], "last_id": articles[-1].id, "more": False})
+
+
+class NewsArticleBulkCreateTests(TestCase):
+
+    def setUp(self):
+        self.bulk_url = reverse("news-article-bulk-create")
+        NewsArticle.objects.create(title="Existing", url="http://example.com/1")
+
+    def post(self, data):
+        return self.client.post(
+            self.bulk_url, data=json.dumps(data), content_type="application/json"
+        )
+
+    def test_bulk_create_skips_existing_and_repeated_urls(self):
+        items = [
+            {"title": "Existing", "url": "http://example.com/1"},
+            {"title": "New 2", "url": "http://example.com/2"},
+            {"title": "New 3", "url": "http://example.com/3"},
+            {"title": "New 3 again", "url": "http://example.com/3"},
+        ]
+
+        response = self.post(items)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"created": 2, "skipped": 2})
+        self.assertEqual(NewsArticle.objects.count(), 3)
+        self.assertEqual(NewsArticle.objects.get(url="http://example.com/3").title, "New 3")
+
+    def test_bulk_create_runs_constant_queries(self):
+        items = [
+            {"title": f"New {i}", "url": f"http://example.com/new/{i}"} for i in range(50)
+        ]
+
+        with self.assertNumQueries(4):
+            response = self.post(items)
+
+        self.assertEqual(response.json(), {"created": 50, "skipped": 0})
+
+    def test_bulk_create_rejects_invalid_items(self):
+        response = self.post([{"title": "Broken", "url": "not a url"}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(NewsArticle.objects.count(), 1)
+
+    def test_bulk_create_rejects_oversized_batches(self):
+        items = [
+            {"title": f"New {i}", "url": f"http://example.com/new/{i}"} for i in range(501)
+        ]
+
+        response = self.post(items)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(NewsArticle.objects.count(), 1)
+
+
+class NewsQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    def populate(self, size):
+        start = NewsArticle.objects.count()
+        NewsArticle.objects.bulk_create(
+            NewsArticle(title=f"News {n}", url=f"http://example.com/{n}")
+            for n in range(start, size)
+        )
+        # Measure the uncached path; bulk_create sends no signals.
+        bump_generation("news")
+
+    def test_news_list(self):
+        url = reverse("news-article-list-create")
+        self.assertQueryBudgetAtSizes(
+            "NewsArticleListCreate GET",
+            2,
+            self.populate,
+            lambda: self.client.get(url),
+            milliseconds=200,
+        )
+        self.assertQueryBudgetAtSizes(
+            "NewsArticleListCreate GET cursor",
+            1,
+            self.populate,
+            lambda: self.client.get(url, {"pagination": "cursor"}),
+        )
+
+    def test_news_create(self):
+        data = {"title": "New", "url": "http://example.com/new"}
+        with self.assertQueryBudget("NewsArticleListCreate POST", 2):
+            response = self.client.post(
+                reverse("news-article-list-create"),
+                data=json.dumps(data),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 201)
+
+
+class AsyncNewsViewTests(TestCase):
+
+    async def test_list_and_create(self):
+        url = reverse("async-news-article-list-create")
+        created, duplicate, invalid = [
+            await self.async_client.post(url, item, content_type="application/json")
+            for item in [
+                {"title": "One", "url": "http://example.com/1"},
+                {"title": "Again", "url": "http://example.com/1"},
+                {"title": "Bad", "url": "nope"},
+            ]
+        ]
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(duplicate.status_code, 400)
+        self.assertIn("url", duplicate.json())
+        self.assertEqual(invalid.status_code, 400)
+
+        response = await self.async_client.get(url, {"fields": "title"})
+        self.assertEqual(response.json()["results"], [{"title": "One"}])
+
+    async def test_bulk_create_and_url_list(self):
+        await NewsArticle.objects.acreate(title="Old", url="http://example.com/old")
+        items = [
+            {"title": "Old", "url": "http://example.com/old"},
+            {"title": "New", "url": "http://example.com/new"},
+            {"title": "New", "url": "http://example.com/new"},
+        ]
+        response = await self.async_client.post(
+            reverse("async-news-article-bulk-create"),
+            items,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"created": 1, "skipped": 2})
+
+        response = await self.async_client.get(
+            reverse("async-news-article-url-list"), {"after": 0}
+        )
+        self.assertEqual(
+            response.json()["urls"], ["http://example.com/old", "http://example.com/new"]
+        )
+        self.assertFalse(response.json()["more"])
+        response = await self.async_client.get(
+            reverse("async-news-article-url-list"), {"after": "x"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class HackerNewsParserTests(TestCase):
+
+    def test_streaming_parser_matches_beautifulsoup(self):
+        tricky_page = """<table><tr><td class="title">
+        <span class="titleline extra"><a href="https://example.com/x?a=1&amp;b=2">
+        Caf&eacute; &#8211; <b>bold</b> &lt;tags&gt;</a> <span class="sitebit">
+        (<a href="from?site=x">x</a>)</span><br></span>
+        <span class="subline"><a href="user?id=someone">someone</a></span>
+        <span class="titleline"><a href='https://example.com/y'>Y</a><!-- note --></span>
+        </td></tr></table>"""
+
+        for page in [HN_PAGE, tricky_page]:
+            with self.subTest(page=page[:40]):
+                self.assertEqual(parse_hacker_news(page), parse_hacker_news_soup(page))
+
+    def test_streaming_parser_matches_beautifulsoup_on_recorded_page(self):
+        page = build_page(90)
+
+        news_items = parse_hacker_news(page)
+        self.assertEqual(len(news_items), 90)
+        self.assertEqual(news_items, parse_hacker_news_soup(page))
+
+    def test_streaming_parser_records(self):
+        self.assertEqual(
+            [item["url"] for item in parse_hacker_news(HN_PAGE)],
+            ["https://example.com/a", "item?id=2"],
+        )
+        self.assertEqual(
+            parse_hacker_news(HN_PAGE)[0]["title"].split(),
+            ["First", "&", "story", "(example.com)"],
+        )
+
+
+class ScraperPipelineTests(TestCase):
+
+    def scrape(self, handlers, sources):
+        async def scenario():
+            app = web.Application()
+            for path, handler in handlers.items():
+                app.router.add_get(path, handler)
+            async with TestServer(app) as server:
+                async with aiohttp.ClientSession() as session:
+                    sources_ = [
+                        Source(name, str(server.make_url(path)), parse, **options)
+                        for name, path, parse, options in sources
+                    ]
+                    return [
+                        (source.name, items)
+                        async for source, items in scrape(session, sources_)
+                    ]
+
+        return asyncio.run(scenario())
+
+    def test_sources_are_streamed_as_they_complete(self):
+        async def slow(request):
+            await asyncio.sleep(0.3)
+            return web.Response(text=HN_PAGE, content_type="text/html")
+
+        async def fast(request):
+            return web.Response(text=RSS_FEED, content_type="application/rss+xml")
+
+        results = self.scrape(
+            {"/slow": slow, "/fast": fast},
+            [("slow", "/slow", parse_hacker_news, {}), ("fast", "/fast", parse_feed, {})],
+        )
+
+        self.assertEqual([name for name, _ in results], ["fast", "slow"])
+        self.assertEqual(
+            results[0][1], [{"title": "Feed story", "url": "https://example.org/feed-story"}]
+        )
+        slow_items = results[1][1]
+        self.assertEqual(slow_items[0]["url"], "https://example.com/a")
+        self.assertTrue(slow_items[1]["url"].endswith("/item?id=2"))
+
+    def test_failing_source_is_retried_then_skipped(self):
+        calls = {"flaky": 0, "down": 0}
+
+        async def flaky(request):
+            calls["flaky"] += 1
+            if calls["flaky"] == 1:
+                return web.Response(status=503)
+            return web.Response(text=HN_PAGE, content_type="text/html")
+
+        async def down(request):
+            calls["down"] += 1
+            return web.Response(status=500)
+
+        with self.assertLogs(level="WARNING") as logs:
+            results = dict(
+                self.scrape(
+                    {"/flaky": flaky, "/down": down},
+                    [
+                        ("flaky", "/flaky", parse_hacker_news, {"retries": 1}),
+                        ("down", "/down", parse_hacker_news, {"retries": 1}),
+                    ],
+                )
+            )
+
+        self.assertEqual(len(results["flaky"]), 2)
+        self.assertEqual(results["down"], [])
+        self.assertEqual(calls, {"flaky": 2, "down": 2})
+        self.assertTrue(any("Error fetching down" in line for line in logs.output))
+
+
+class SaveNewsTests(TestCase):
+
+    def test_large_scrapes_are_sent_in_batches(self):
+        news_items = parse_hacker_news(build_page(1200))
+        stand_in = StandIn({})
+
+        async def scenario():
+            async with TestServer(stand_in.app) as server:
+                api_url = str(server.make_url("")).rstrip("/")
+                return await save_news(news_items, api_url=api_url)
+
+        self.assertEqual(asyncio.run(scenario()), {"created": 1200, "skipped": 0})
+        self.assertEqual(stand_in.requests["POST /api/async/news/bulk/"], 3)
+
+
+class IncrementalScrapeTests(TestCase):
+
+    def setUp(self):
+        state_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(state_dir.cleanup)
+        self.state_path = os.path.join(state_dir.name, "state.json")
+        html = HN_PAGE.replace("item?id=2", "https://example.com/b")
+        self.page = {"etag": '"v1"', "html": html}
+        self.stored = []
+        self.requests = []
+        self.duplicates = 0
+
+    async def page_view(self, request):
+        self.requests.append(("page", request.headers.get("If-None-Match")))
+        if self.page["etag"] is None:
+            return web.Response(text=self.page["html"], content_type="text/html")
+        if request.headers.get("If-None-Match") == self.page["etag"]:
+            return web.Response(status=304)
+        return web.Response(
+            text=self.page["html"],
+            content_type="text/html",
+            headers={"ETag": self.page["etag"]},
+        )
+
+    async def urls_view(self, request):
+        self.requests.append(("urls", request.query["after"]))
+        after = int(request.query["after"])
+        return web.json_response(
+            {"urls": self.stored[after:], "last_id": len(self.stored), "more": False}
+        )
+
+    async def bulk_view(self, request):
+        items = await request.json()
+        self.requests.append(("bulk", len(items)))
+        created = items[self.duplicates :]
+        self.stored.extend(item["url"] for item in created)
+        return web.json_response(
+            {"created": len(created), "skipped": self.duplicates}, status=201
+        )
+
+    def run_scraper(self):
+        async def scenario():
+            app = web.Application()
+            app.router.add_get("/page", self.page_view)
+            app.router.add_get("/api/async/news/urls/", self.urls_view)
+            app.router.add_post("/api/async/news/bulk/", self.bulk_view)
+            async with TestServer(app) as server:
+                source = Source("page", str(server.make_url("/page")), parse_hacker_news)
+                api_url = str(server.make_url("")).rstrip("/")
+                return await run([source], api_url=api_url, state_path=self.state_path)
+
+        self.requests.clear()
+        return asyncio.run(scenario())
+
+    def test_unchanged_source_is_not_downloaded_again(self):
+        self.assertEqual(self.run_scraper(), 2)
+        self.assertEqual(
+            self.requests, [("urls", "0"), ("page", None), ("bulk", 2)]
+        )
+
+        self.assertEqual(self.run_scraper(), 0)
+        self.assertEqual(self.requests, [("urls", "0"), ("page", '"v1"')])
+        self.assertEqual(self.run_scraper(), 0)
+        self.assertEqual(self.requests, [("urls", "2"), ("page", '"v1"')])
+
+    def test_items_are_counted_in_the_metrics(self):
+        items = metrics.SCRAPER_ITEMS.values
+        before = {key: items.get(("page", key), 0) for key in ("fetched", "saved", "skipped")}
+
+        self.run_scraper()
+        self.page["etag"] = '"v2"'
+        self.run_scraper()
+
+        counted = {key: items[("page", key)] - before[key] for key in before}
+        self.assertEqual(counted, {"fetched": 4, "saved": 2, "skipped": 2})
+
+    def test_items_skipped_by_the_api_are_not_counted_as_fetched(self):
+        self.duplicates = 1
+
+        self.assertEqual(self.run_scraper(), 1)
+
+    def test_known_urls_are_not_saved_again(self):
+        self.run_scraper()
+        self.page["etag"] = '"v2"'
+
+        self.assertEqual(self.run_scraper(), 0)
+        self.assertEqual(self.requests, [("urls", "0"), ("page", '"v1"')])
+
+    def test_state_is_rebuilt_from_the_api(self):
+        self.stored = ["https://example.com/a"]
+        self.page["etag"] = None
+
+        self.assertEqual(self.run_scraper(), 1)
+        self.assertEqual(self.requests[-1], ("bulk", 1))
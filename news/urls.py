@@ -1,6 +1,30 @@
 from django.urls import path
-from .views import NewsArticleListCreate
+from .async_views import (
+    AsyncNewsArticleBulkCreate,
+    AsyncNewsArticleListCreate,
+    AsyncNewsArticleUrlList,
+)
+from .views import NewsArticleBulkCreate, NewsArticleListCreate, NewsArticleUrlList
 
 urlpatterns = [
     path("news/", NewsArticleListCreate.as_view(), name="news-article-list-create"),
+    path(
+        "news/bulk/", NewsArticleBulkCreate.as_view(), name="news-article-bulk-create"
+    ),
+    path("news/urls/", NewsArticleUrlList.as_view(), name="news-article-url-list"),
+    path(
+        "async/news/",
+        AsyncNewsArticleListCreate.as_view(),
+        name="async-news-article-list-create",
+    ),
+    path(
+        "async/news/bulk/",
+        AsyncNewsArticleBulkCreate.as_view(),
+        name="async-news-article-bulk-create",
+    ),
+    path(
+        "async/news/urls/",
+        AsyncNewsArticleUrlList.as_view(),
+        name="async-news-article-url-list",
+    ),
 ]
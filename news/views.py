@@ -1,22 +1,38 @@
+from django.db import transaction
 from django.shortcuts import render
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from blogify.cache import CachedResponseMixin, bump_generation_on_write
+from blogify.fieldsets import SparseFieldsetMixin
+from blogify.pagination import CursorOrPageNumberPagination
 from .models import NewsArticle
-from .serializers import NewsArticleSerializer
+from .serializers import NewsArticleBulkSerializer, NewsArticleSerializer
 
 
-class NewsArticleListCreate(generics.ListCreateAPIView):
+class NewsArticleListCreate(
+    CachedResponseMixin, SparseFieldsetMixin, generics.ListCreateAPIView
+):
     """
     API view to retrieve list of news articles or create new ones.
 
     This view handles two types of requests:
 
-    1. GET: Returns a list of all news articles in the database.
+    1. GET: Returns a list of all news articles in the database. `?fields=title`
+       limits the output to the given fields.
     2. POST: Allows the creation of new news articles. The request body should contain
        the necessary data fields as defined in the `NewsArticleSerializer`.
 
     Attributes:
         queryset (QuerySet): The queryset that provides the list of news articles.
         serializer_class (Serializer): The serializer class used to validate and serialize data.
+        pagination_class (type): Page numbers by default, keyset pages when the client
+                                 passes `?pagination=cursor`.
+        ordering (tuple): The keyset ordering, backed by the `(created_at, id)` index.
+        authentication_classes (list): Empty; the endpoint is public, so the session
+                                       and user are not looked up.
+        cache_namespace (str): Pages are cached per query string until the news
+                               change.
 
     Methods:
         get_queryset(): Returns the queryset of all news articles.
@@ -25,3 +41,100 @@ class NewsArticleListCreate(generics.ListCreateAPIView):
 
     queryset = NewsArticle.objects.all()
     serializer_class = NewsArticleSerializer
+    pagination_class = CursorOrPageNumberPagination
+    ordering = ("-created_at", "-id")
+    authentication_classes = []
+    cache_namespace = "news"
+
+
+class NewsArticleBulkCreate(generics.GenericAPIView):
+    """
+    API view to create many news articles in one request.
+
+    The request body is a list of objects with the fields of `NewsArticleSerializer`.
+    Items are validated together and inserted with a single `bulk_create` in one
+    transaction. Items whose URL is already stored, or repeated within the batch,
+    are skipped rather than failing the request.
+
+    Attributes:
+        serializer_class (Serializer): The serializer used to validate each item.
+        max_batch_size (int): The maximum number of items accepted per request.
+
+    Methods:
+        post(request, *args, **kwargs): Inserts the items and reports how many
+            were created and how many were skipped.
+    """
+
+    serializer_class = NewsArticleBulkSerializer
+    max_batch_size = 500
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.max_batch_size
+        )
+        serializer.is_valid(raise_exception=True)
+
+        items = {}
+        for item in serializer.validated_data:
+            items.setdefault(item["url"], item)
+        with transaction.atomic():
+            existing = set(
+                NewsArticle.objects.filter(url__in=items).values_list("url", flat=True)
+            )
+            new_articles = [
+                NewsArticle(**item) for url, item in items.items() if url not in existing
+            ]
+            NewsArticle.objects.bulk_create(new_articles, ignore_conflicts=True)
+            # bulk_create sends no post_save signals.
+            bump_generation_on_write("news")
+
+        return Response(
+            {
+                "created": len(new_articles),
+                "skipped": len(serializer.validated_data) - len(new_articles),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class NewsArticleUrlList(APIView):
+    """
+    API view listing the URLs of stored news articles in insertion order.
+
+    The scraper uses it to keep its local set of already saved URLs up to date.
+    Passing the `last_id` of the previous response as `?after=` returns only the
+    articles added since, so a refresh costs one indexed range query on the primary
+    key. Rows are read with `values_list`, without model instances or a serializer.
+
+    Attributes:
+        page_size (int): The maximum number of URLs returned per request.
+
+    Methods:
+        get(request, *args, **kwargs): Returns `urls`, the `last_id` to resume
+            from and whether `more` URLs are available.
+    """
+
+    page_size = 5000
+
+    def get(self, request, *args, **kwargs):
+        try:
+            after = int(request.query_params.get("after", 0))
+        except ValueError:
+            return Response(
+                {"message": "after must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        rows = list(
+            NewsArticle.objects.filter(id__gt=after)
+            .order_by("id")
+            .values_list("id", "url")[: self.page_size + 1]
+        )
+        more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        return Response(
+            {
+                "urls": [url for _, url in rows],
+                "last_id": rows[-1][0] if rows else after,
+                "more": more,
+            }
+        )
@@ -0,0 +1,255 @@
+"""
+Full-text search over blog articles and news.
+
+On PostgreSQL the search runs against the `search_vector` columns added by the
+`search` migration: generated `tsvector` columns with a GIN index, matched with
+`websearch_to_tsquery` and ordered by `ts_rank`. Other databases (SQLite in
+development and tests) use `InvertedIndex`, an in-process index built from the
+tables on first use and kept current by the `search.signals` receivers.
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from itertools import islice
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from blog.models import Article
+from news.models import NewsArticle
+
+# Weight of a title match relative to a body match in the fallback index.
+TITLE_WEIGHT = 4.0
+# Number of rows read per round trip while building the fallback index.
+INDEX_CHUNK_SIZE = 2000
+TSQUERY = "websearch_to_tsquery('english', %s)"
+TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class SearchType:
+    """A searchable model.
+
+    Attributes:
+        model (type): The model class.
+        fields (tuple): `(field name, weight)` pairs of the indexed text fields.
+    """
+
+    model: type
+    fields: tuple
+
+
+SEARCH_TYPES = {
+    "article": SearchType(Article, (("title", TITLE_WEIGHT), ("content", 1.0))),
+    "news": SearchType(NewsArticle, (("title", TITLE_WEIGHT),)),
+}
+
+
+def tokenize(text):
+    """Splits `text` into lowercase word tokens."""
+    return TOKEN_RE.findall(text.casefold())
+
+
+def load_titles(name, ids):
+    """Returns `{id: title}` for the rows of type `name` that still exist."""
+    model = SEARCH_TYPES[name].model
+    return dict(model.objects.filter(pk__in=ids).values_list("pk", "title"))
+
+
+class PostgresSearchBackend:
+    """Searches the generated `tsvector` columns through their GIN indexes."""
+
+    def search(self, query, types, limit):
+        """Returns up to `limit` hits for `query`, best first.
+
+        Args:
+            query (str): The search text, in `websearch_to_tsquery` syntax
+                (quoted phrases, `or` and `-word` are supported).
+            types (list): Names from `SEARCH_TYPES` to search.
+            limit (int): The maximum number of hits.
+
+        Returns:
+            list: Dicts with `type`, `id`, `title` and `rank` keys.
+        """
+        hits = []
+        for name in types:
+            rows = (
+                SEARCH_TYPES[name]
+                .model.objects.filter(
+                    RawSQL(
+                        f"search_vector @@ {TSQUERY}",
+                        (query,),
+                        output_field=BooleanField(),
+                    )
+                )
+                .annotate(
+                    rank=RawSQL(
+                        f"ts_rank(search_vector, {TSQUERY})",
+                        (query,),
+                        output_field=FloatField(),
+                    )
+                )
+                .order_by("-rank", "-id")
+                .values("id", "title", "rank")[:limit]
+            )
+            hits += [{"type": name, **row} for row in rows]
+        return sorted(hits, key=lambda hit: hit["rank"], reverse=True)[:limit]
+
+    def update(self, name, instance):
+        """Nothing to do: PostgreSQL regenerates the column on every write."""
+
+    def remove(self, name, pk):
+        """Nothing to do: the row and its index entry go away together."""
+
+
+class InvertedIndex:
+    """
+    An in-process inverted index used when the database has no full-text search.
+
+    Each searchable type is loaded from the database on its first search. After
+    that, saves and deletes reported by the signal receivers are applied directly,
+    and every search first picks up rows with a primary key above the highest one
+    indexed so far, which covers `bulk_create` (it sends no signals). All terms of
+    the query must match; hits are scored by the weighted term frequency times the
+    inverse document frequency. Hits are checked against the database before they
+    are returned, so deleted rows never show up, but edits made by other processes
+    are only seen once this process restarts.
+
+    Attributes:
+        postings (dict): Maps a term to `{(type, id): weight}`.
+        documents (dict): Maps `(type, id)` to the terms indexed for it.
+        last_id (dict): The highest primary key loaded per type; a type is missing
+            until it has been loaded.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.last_id = {}
+
+    def reset(self):
+        """Forgets everything, so that the next search reloads from the database."""
+        with self.lock:
+            self.postings.clear()
+            self.documents.clear()
+            self.last_id.clear()
+
+    @staticmethod
+    def _weights(name, texts):
+        weights = Counter()
+        for (field, weight), text in zip(SEARCH_TYPES[name].fields, texts):
+            for term in tokenize(text or ""):
+                weights[term] += weight
+        return weights
+
+    def _index(self, key, weights):
+        self._remove(key)
+        self.documents[key] = list(weights)
+        for term, weight in weights.items():
+            self.postings[term][key] = weight
+
+    def _remove(self, key):
+        for term in self.documents.pop(key, ()):
+            postings = self.postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self.postings[term]
+
+    def sync(self, name):
+        """Indexes the rows of type `name` added since the last sync.
+
+        Rows are read and tokenized outside the lock, one chunk at a time, and
+        only added to the index under it, so searches never wait for the
+        database; rows a concurrent sync has indexed meanwhile are skipped.
+        """
+        search_type = SEARCH_TYPES[name]
+        with self.lock:
+            last_id = self.last_id.get(name, 0)
+        rows = (
+            search_type.model.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", *(field for field, weight in search_type.fields))
+            .iterator(chunk_size=INDEX_CHUNK_SIZE)
+        )
+        while chunk := list(islice(rows, INDEX_CHUNK_SIZE)):
+            documents = [(pk, self._weights(name, texts)) for pk, *texts in chunk]
+            with self.lock:
+                indexed = self.last_id.get(name, 0)
+                for pk, weights in documents:
+                    if pk > indexed:
+                        self._index((name, pk), weights)
+                self.last_id[name] = max(indexed, documents[-1][0])
+        with self.lock:
+            self.last_id.setdefault(name, last_id)
+
+    def update(self, name, instance):
+        """Re-indexes a saved object, if its type has been loaded."""
+        fields = SEARCH_TYPES[name].fields
+        with self.lock:
+            if name in self.last_id:
+                texts = [getattr(instance, field) for field, weight in fields]
+                self._index((name, instance.pk), self._weights(name, texts))
+
+    def remove(self, name, pk):
+        """Drops a deleted object from the index."""
+        with self.lock:
+            self._remove((name, pk))
+
+    def search(self, query, types, limit):
+        """Returns up to `limit` hits for `query`, best first.
+
+        Args:
+            query (str): The search text; every word in it must match.
+            types (list): Names from `SEARCH_TYPES` to search.
+            limit (int): The maximum number of hits.
+
+        Returns:
+            list: Dicts with `type`, `id`, `title` and `rank` keys.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        for name in types:
+            self.sync(name)
+        with self.lock:
+            total = len(self.documents)
+            postings = sorted(
+                (self.postings.get(term, {}) for term in terms), key=len
+            )
+            scores = {
+                key: sum(
+                    matches[key] * math.log(1 + total / len(matches))
+                    for matches in postings
+                )
+                for key in postings[0]
+                if key[0] in types and all(key in matches for matches in postings[1:])
+            }
+        best = heapq.nlargest(
+            limit, scores.items(), key=lambda item: (item[1], item[0][1])
+        )
+        titles = {
+            name: load_titles(name, [pk for (kind, pk), score in best if kind == name])
+            for name in types
+        }
+        return [
+            {"type": name, "id": pk, "title": titles[name][pk], "rank": score}
+            for (name, pk), score in best
+            if pk in titles[name]
+        ]
+
+
+postgres_backend = PostgresSearchBackend()
+inverted_index = InvertedIndex()
+
+
+def get_backend():
+    """Returns the search backend suited to the default database."""
+    if connection.vendor == "postgresql":
+        return postgres_backend
+    return inverted_index
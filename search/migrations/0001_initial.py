@@ -0,0 +1,56 @@
+# Generated by Django 5.0.6 on 2026-10-18 19:10
+
+from django.db import migrations
+
+# The columns are generated by PostgreSQL from the indexed text, so they stay
+# current on every INSERT and UPDATE, bulk ones included, without any help from
+# Django. They are not declared on the models; `search.backends` queries them
+# with raw expressions.
+SEARCH_COLUMNS = [
+    (
+        "blog_article",
+        "blog_article_search_idx",
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+    ),
+    (
+        "news_newsarticle",
+        "news_newsarticle_search_idx",
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A')",
+    ),
+]
+
+
+def add_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, index, expression in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {index} ON {table} USING GIN (search_vector)"
+        )
+
+
+def remove_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, index, expression in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index}")
+        schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('blog', '0006_subscriber_chat_id_unique'),
+        ('news', '0002_newsarticle_created_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vectors, remove_search_vectors),
+    ]
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blog.models import Article
+from news.models import NewsArticle
+from .backends import get_backend
+
+SEARCH_TYPE_NAMES = {Article: "article", NewsArticle: "news"}
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=NewsArticle)
+def index_saved_object(sender, instance, **kwargs):
+    """Keeps the search index current when an article or a news item is saved."""
+    get_backend().update(SEARCH_TYPE_NAMES[sender], instance)
+
+
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=NewsArticle)
+def unindex_deleted_object(sender, instance, **kwargs):
+    """Drops a deleted article or news item from the search index."""
+    get_backend().remove(SEARCH_TYPE_NAMES[sender], instance.pk)
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from blog.models import Article
+from news.models import NewsArticle
+from .backends import inverted_index, tokenize
+
+
+class SearchTests(APITestCase):
+
+    def setUp(self):
+        # The fallback index lives for the whole process; start every test empty.
+        inverted_index.reset()
+        self.addCleanup(inverted_index.reset)
+        self.url = reverse("search")
+        self.user = User.objects.create_user(username="reader", password="password123")
+        self.in_title = Article.objects.create(
+            title="Tuning PostgreSQL indexes",
+            content="Notes from a long week.",
+            author=self.user,
+        )
+        self.in_body = Article.objects.create(
+            title="Weekly notes",
+            content="We spent the week tuning PostgreSQL.",
+            author=self.user,
+        )
+        self.unrelated = Article.objects.create(
+            title="Gardening", content="Tomatoes and basil.", author=self.user
+        )
+        self.news = NewsArticle.objects.create(
+            title="PostgreSQL 17 released", url="http://example.com/pg17"
+        )
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(hit["type"], hit["id"]) for hit in response.data["results"]]
+
+    def test_title_matches_rank_above_body_matches(self):
+        self.client.force_authenticate(self.user)
+        hits = self.search(q="tuning postgresql", type="article")
+        self.assertEqual(
+            hits, [("article", self.in_title.id), ("article", self.in_body.id)]
+        )
+
+    def test_all_terms_must_match(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.search(q="postgresql basil"), [])
+
+    def test_searches_news_and_articles(self):
+        self.client.force_authenticate(self.user)
+        hits = self.search(q="postgresql")
+        self.assertEqual(len(hits), 3)
+        self.assertIn(("news", self.news.id), hits)
+
+    def test_anonymous_users_only_see_news(self):
+        self.assertEqual(self.search(q="postgresql"), [("news", self.news.id)])
+
+    def test_index_follows_saves_deletes_and_bulk_inserts(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.search(q="tomatoes"), [("article", self.unrelated.id)])
+
+        self.unrelated.content = "Peppers and basil."
+        self.unrelated.save()
+        self.in_title.delete()
+        NewsArticle.objects.bulk_create(
+            [NewsArticle(title="Growing tomatoes", url="http://example.com/tomatoes")]
+        )
+
+        self.assertEqual(self.search(q="peppers"), [("article", self.unrelated.id)])
+        self.assertEqual(self.search(q="indexes"), [])
+        tomatoes = NewsArticle.objects.get(url="http://example.com/tomatoes")
+        self.assertEqual(self.search(q="tomatoes", type="news"), [("news", tomatoes.id)])
+
+    def test_index_is_loaded_without_holding_the_lock(self):
+        locked = []
+
+        def record(execute, sql, params, many, context):
+            locked.append(inverted_index.lock.locked())
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            inverted_index.sync("article")
+
+        self.assertTrue(locked)
+        self.assertNotIn(True, locked)
+        self.assertEqual(inverted_index.last_id["article"], self.unrelated.id)
+
+    def test_limit_and_validation(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(len(self.search(q="postgresql", limit=1)), 1)
+        invalid = [{}, {"q": " "}, {"q": "x", "type": "users"}, {"q": "x", "limit": "a"}]
+        for params in invalid:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("Новая статья: PostgreSQL-17!"),
+            ["новая", "статья", "postgresql", "17"],
+        )
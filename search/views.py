@@ -0,0 +1,54 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .backends import SEARCH_TYPES, get_backend
+
+
+class SearchView(APIView):
+    """
+    API endpoint for full-text search across blog articles and news.
+
+    Query parameters:
+        q (str): The search text (required).
+        type (str): Comma-separated types to search, `article` and/or `news`.
+                    Defaults to both.
+        limit (int): The maximum number of results, at most `max_limit`.
+
+    Blog articles are only listed for authenticated users, as on the article
+    endpoints; anonymous users get news results only. Results are ordered by
+    relevance and contain the type, id, title and rank of every hit.
+
+    Attributes:
+        default_limit (int): The number of results returned without `limit`.
+        max_limit (int): The largest accepted `limit`.
+    """
+
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request, format=None):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(
+                {"message": "The q parameter is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        types = request.query_params.get("type")
+        types = types.split(",") if types else list(SEARCH_TYPES)
+        if any(name not in SEARCH_TYPES for name in types):
+            return Response(
+                {"message": f"type must be one of: {', '.join(SEARCH_TYPES)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            return Response(
+                {"message": "limit must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, self.max_limit))
+        if not request.user.is_authenticated:
+            types = [name for name in types if name != "article"]
+        results = get_backend().search(query, types, limit) if types else []
+        return Response({"results": results})
@@ -1,4 +1,8 @@
+import argparse
+import asyncio
 import logging
+import os
+import time
 import aiohttp
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
@@ -10,9 +14,187 @@ logging.basicConfig(
     level=logging.INFO,
 )
 
+# Seconds the latest article is served from memory before it is revalidated.
+LATEST_ARTICLE_TTL = config("BOT_LATEST_ARTICLE_TTL", default=10, cast=float)
+# Keep-alive connections kept open to the API.
+API_CONNECTION_LIMIT = 20
+API_TIMEOUT = aiohttp.ClientTimeout(total=10)
+# Seconds to wait after a failed refresh before asking the API again.
+LATEST_ARTICLE_RETRY = 5.0
+# Where the bot reads articles and stores subscribers: "rest" talks to the API
+# over HTTP, "orm" uses the Django models in-process.
+BOT_BACKEND = config("TELEGRAM_BOT_BACKEND", default="rest")
+# Updates handled at the same time; further updates wait in the update queue.
+MAX_CONCURRENT_UPDATES = config("BOT_MAX_CONCURRENT_UPDATES", default=64, cast=int)
+# The public HTTPS URL of the webhook view and the secret Telegram sends with it.
+WEBHOOK_URL = config("TELEGRAM_WEBHOOK_URL", default="")
+WEBHOOK_SECRET = config("TELEGRAM_WEBHOOK_SECRET", default="")
 
-# Create an Application Object
-application = Application.builder().token(config("TELEGRAM_TOKEN")).build()
+
+class LatestArticleCache:
+    """
+    In-process cache of the latest article with conditional revalidation.
+
+    The article is served from memory for `ttl` seconds. After that, the first
+    caller revalidates it with `If-None-Match`, which costs a 304 without a body
+    while the article is unchanged. A lock makes the refresh single-flight:
+    callers that arrive during a refresh wait for it and reuse its result, so a
+    burst of /latest commands costs at most one API request. If the API fails,
+    the last known article keeps being served, and the API is not asked again
+    for `LATEST_ARTICLE_RETRY` seconds, so callers during an outage do not wait
+    out one timeout after another.
+
+    Attributes:
+        ttl (float): Seconds a fetched article is considered fresh.
+        data (dict): The last known article, or None.
+        etag (str): The `ETag` of `data`, or None.
+    """
+
+    def __init__(self, ttl: float = LATEST_ARTICLE_TTL):
+        self.ttl = ttl
+        self.data = None
+        self.etag = None
+        self.fetched_at = None
+        self.retry_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def is_fresh(self) -> bool:
+        now = time.monotonic()
+        if now < self.retry_at:
+            return True
+        return self.fetched_at is not None and now - self.fetched_at < self.ttl
+
+    async def get(self, session: aiohttp.ClientSession, url: str):
+        """Returns the latest article, fetching or revalidating it if needed."""
+        if self.is_fresh():
+            return self.data
+        async with self.lock:
+            if self.is_fresh():
+                return self.data
+            headers = {"If-None-Match": self.etag} if self.etag else {}
+            try:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        self.fetched_at = time.monotonic()
+                    elif response.status == 200:
+                        self.data = await response.json()
+                        self.etag = response.headers.get("ETag")
+                        self.fetched_at = time.monotonic()
+                    elif response.status == 404:
+                        self.data = self.etag = None
+                        self.fetched_at = time.monotonic()
+                    else:
+                        logging.error(
+                            f"Failed to fetch latest article: {response.status}"
+                        )
+                        self.retry_at = time.monotonic() + LATEST_ARTICLE_RETRY
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.error(f"Failed to fetch latest article: {e!r}")
+                self.retry_at = time.monotonic() + LATEST_ARTICLE_RETRY
+            return self.data
+
+
+class RestBackend:
+    """
+    Reads articles and stores subscribers through the blog API.
+
+    All requests share one keep-alive session, opened and closed with the bot,
+    and the latest article is served from a `LatestArticleCache`.
+    """
+
+    def __init__(self, api_url: str = None):
+        self.api_url = api_url or config("API_URL")
+        self.session = None
+        self.latest_article_cache = LatestArticleCache()
+
+    async def open(self) -> None:
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=API_CONNECTION_LIMIT),
+            timeout=API_TIMEOUT,
+        )
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+    async def latest_article(self):
+        return await self.latest_article_cache.get(
+            self.session, f"{self.api_url}/api/async/articles/latest/"
+        )
+
+    async def subscribe(self, chat_id) -> bool:
+        data = {
+            "username": config("TELEGRAM_USER"),
+            "password": config("TELEGRAM_PASSWORD"),
+            "chat_id": chat_id,
+        }
+        async with self.session.post(
+            f"{self.api_url}/api/async/subscribe/", json=data
+        ) as response:
+            return response.status == 201
+
+
+class OrmBackend:
+    """
+    Reads articles and stores subscribers with the Django ORM, in-process.
+
+    Meant for deployments where the bot runs next to Django, e.g. in webhook
+    mode inside the ASGI process: there is no HTTP hop and no credentials to
+    send. The latest article comes from the same cache as the API's.
+    """
+
+    async def open(self) -> None:
+        from django.apps import apps
+
+        if not apps.ready:
+            import django
+
+            os.environ.setdefault("DJANGO_SETTINGS_MODULE", "blogify.settings")
+            django.setup()
+
+    async def close(self) -> None:
+        pass
+
+    async def latest_article(self):
+        from blog.cache import aget_latest_article
+
+        return await aget_latest_article()
+
+    async def subscribe(self, chat_id) -> bool:
+        from blog.models import Subscriber
+
+        subscriber, created = await Subscriber.objects.aget_or_create(
+            chat_id=str(chat_id)
+        )
+        return created
+
+
+BACKENDS = {"rest": RestBackend, "orm": OrmBackend}
+
+
+def get_backend(name: str = None):
+    """Returns a new instance of the backend named by `TELEGRAM_BOT_BACKEND`."""
+    name = name or BOT_BACKEND
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown TELEGRAM_BOT_BACKEND {name!r}; expected one of {sorted(BACKENDS)}."
+        )
+
+
+async def post_init(application: Application) -> None:
+    """Opens the data backend shared by all handlers for the bot's lifetime."""
+    backend = application.bot_data.get("backend") or get_backend()
+    await backend.open()
+    application.bot_data["backend"] = backend
+
+
+async def post_shutdown(application: Application) -> None:
+    """Closes the data backend."""
+    backend = application.bot_data.pop("backend", None)
+    if backend is not None:
+        await backend.close()
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -35,17 +217,9 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         await update.message.reply_text("An error occurred. Please try again later.")
 
 
-async def get_latest_article():
+async def get_latest_article(context: ContextTypes.DEFAULT_TYPE):
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{config('API_URL')}/api/articles/latest/"
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logging.error(f"Failed to fetch latest article: {response.status}")
-                    return None
+        return await context.bot_data["backend"].latest_article()
     except Exception as e:
         logging.exception(f"Error in get_latest_article: {e}")
         return None
@@ -53,7 +227,7 @@ async def get_latest_article():
 
 async def latest(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
-        response = await get_latest_article()
+        response = await get_latest_article(context)
         if response:
             message = f"Recent article:\n\n{response['title']}\n\n{response['content']}"
         else:
@@ -67,36 +241,134 @@ async def latest(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 async def subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
-        chat_id = update.message.chat_id
-        data = {
-            "username": config("TELEGRAM_USER"),
-            "password": config("TELEGRAM_PASSWORD"),
-            "chat_id": chat_id,
-        }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{config('API_URL')}/api/subscribe/", json=data
-            ) as response:
-
-                if response.status == 201:
-                    message = "You have successfully subscribed to the blog updates."
-                else:
-                    message = "You have already subscribed to the blog updates."
-                await update.message.reply_text(message)
+        if await context.bot_data["backend"].subscribe(update.message.chat_id):
+            message = "You have successfully subscribed to the blog updates."
+        else:
+            message = "You have already subscribed to the blog updates."
+        await update.message.reply_text(message)
     except Exception as e:
         logging.error(f"Error in subscribe command: {e}")
         await update.message.reply_text("An error occurred. Please try again later.")
 
 
+def build_application(
+    token: str = None,
+    base_url: str = None,
+    concurrent_updates: int = MAX_CONCURRENT_UPDATES,
+    backend=None,
+) -> Application:
+    """
+    Creates the bot application with its command handlers.
+
+    Up to `concurrent_updates` updates are handled at the same time, so a slow
+    handler only delays its own chat; the connection pool to Telegram is sized
+    to match so that concurrent replies do not queue for a connection.
+
+    Args:
+        token (str): The bot token; defaults to `TELEGRAM_TOKEN`.
+        base_url (str): The Bot API URL the token is appended to, e.g. a local
+            stand-in for Telegram in tests.
+        concurrent_updates (int): The maximum number of updates in flight.
+        backend: The data backend; defaults to the one named by
+            `TELEGRAM_BOT_BACKEND`, created when the application starts.
+
+    Returns:
+        Application: The application, not yet initialized.
+    """
+    builder = (
+        Application.builder()
+        .token(token or config("TELEGRAM_TOKEN"))
+        .concurrent_updates(concurrent_updates)
+        .connection_pool_size(concurrent_updates)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if base_url:
+        builder = builder.base_url(base_url)
+    application = builder.build()
+    if backend is not None:
+        application.bot_data["backend"] = backend
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("help", help_command))
+    application.add_handler(CommandHandler("latest", latest))
+    application.add_handler(CommandHandler("subscribe", subscribe))
+    return application
+
+
+# Create an Application Object
+application = build_application()
+start_lock = asyncio.Lock()
+
+
+async def start_application(application: Application) -> None:
+    """
+    Starts `application` on the running event loop unless it already runs.
+
+    In webhook mode nothing calls `run_webhook`: the ASGI process receives the
+    updates, and the application is started on its event loop on first use.
+    """
+    async with start_lock:
+        if application.running:
+            return
+        await application.initialize()
+        await application.post_init(application)
+        await application.start()
+
+
+async def stop_application(application: Application) -> None:
+    """Stops an application started by `start_application`."""
+    if application.running:
+        await application.stop()
+        await application.post_shutdown(application)
+    await application.shutdown()
+
+
+async def feed_update(application: Application, data: dict) -> None:
+    """
+    Queues an update received by the webhook.
+
+    The update is handed to the application's update queue and processed in the
+    background, so the webhook answers Telegram at once instead of after the
+    handler, and at most `concurrent_updates` handlers run at the same time.
+
+    Args:
+        application (Application): The application that processes the update.
+        data (dict): The update as sent by Telegram.
+    """
+    await start_application(application)
+    await application.update_queue.put(Update.de_json(data, application.bot))
+
+
+async def set_webhook(application: Application) -> None:
+    """Points Telegram at `TELEGRAM_WEBHOOK_URL` instead of long polling."""
+    async with application.bot as bot:
+        await bot.set_webhook(
+            WEBHOOK_URL,
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=Update.ALL_TYPES,
+            max_connections=MAX_CONCURRENT_UPDATES,
+        )
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Run the blog's Telegram bot.")
+    parser.add_argument(
+        "--webhook",
+        action="store_true",
+        help="Register TELEGRAM_WEBHOOK_URL with Telegram and exit; the updates "
+        "are then served by the ASGI application instead of being polled.",
+    )
+    options = parser.parse_args()
     try:
-        # add software handlers
-        application.add_handler(CommandHandler("start", start))
-        application.add_handler(CommandHandler("help", help_command))
-        application.add_handler(CommandHandler("latest", latest))
-        application.add_handler(CommandHandler("subscribe", subscribe))
-
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
+        if options.webhook:
+            if not WEBHOOK_URL or not WEBHOOK_SECRET:
+                parser.error(
+                    "TELEGRAM_WEBHOOK_URL and TELEGRAM_WEBHOOK_SECRET are required."
+                )
+            asyncio.run(set_webhook(application))
+        else:
+            # run_polling removes a registered webhook before polling.
+            application.run_polling(allowed_updates=Update.ALL_TYPES)
     except Exception as e:
         logging.error(f"Error in main function: {e}")
 
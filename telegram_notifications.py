@@ -1,8 +1,14 @@
+import asyncio
 import logging
-from asgiref.sync import sync_to_async
+import time
+from dataclasses import dataclass
+from functools import lru_cache
 from blog.models import Subscriber
 from django.conf import settings
+from blogify import metrics
 from telegram import Bot
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+from telegram.request import HTTPXRequest
 
 logging.basicConfig(
     filename="telegram_bot.log",
@@ -10,30 +16,265 @@ logging.basicConfig(
     level=logging.INFO,
 )
 
+# Base delay in seconds for retrying network errors, doubled on every attempt.
+RETRY_BACKOFF = 1.0
+# Number of subscriber chat IDs fetched from the database per round trip.
+SUBSCRIBER_CHUNK_SIZE = 2000
+# Telegram rejects messages longer than this many characters.
+MESSAGE_LIMIT = 4096
 
-async def notify_subscribers(article):
+
+@dataclass
+class DeliveryReport:
+    """Counters describing the outcome of one fan-out.
+
+    Attributes:
+        sent (int): Messages accepted by Telegram.
+        failed (int): Recipients given up on (blocked the bot, bad chat, retries exhausted).
+        retried (int): Retries caused by flood control or network errors.
+    """
+
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket refilled at `rate` tokens per second.
+
+    Waiters re-check the bucket after sleeping, and no await happens between the
+    check and the withdrawal, so the bucket needs no lock and is not tied to an
+    event loop. `block` empties the bucket for a while, which is how a `RetryAfter`
+    from Telegram pauses every sender at once.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): The maximum number of tokens, i.e. the allowed burst.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it."""
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block(self, seconds: float) -> None:
+        """Hands out no tokens for the next `seconds` seconds."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+class RateLimiter:
+    """
+    Combines Telegram's global and per-chat message limits.
+
+    Telegram allows a bot about 30 messages per second overall and about one
+    message per second to the same chat. Fan-outs share the limiter returned by
+    `get_limiter`, so that back-to-back notifications respect the per-chat limit
+    too. A chat's bucket is dropped once it has been idle long enough to refill,
+    when it is no different from a new one, so memory does not grow with the
+    number of subscribers.
+
+    Attributes:
+        bucket (TokenBucket): The bucket shared by all chats.
+        chat_rate (float): Messages per second allowed to a single chat.
+        chats (dict): The buckets of the chats messaged recently.
+    """
+
+    def __init__(self, rate: float, chat_rate: float):
+        self.bucket = TokenBucket(rate)
+        self.chat_rate = chat_rate
+        self.chats = {}
+        self.evicted_at = time.monotonic()
+
+    async def acquire(self, chat_id) -> None:
+        """Waits until a message to `chat_id` is allowed by both limits."""
+        self.evict_idle()
+        chat_bucket = self.chats.get(chat_id)
+        if chat_bucket is None:
+            chat_bucket = self.chats[chat_id] = TokenBucket(self.chat_rate)
+        await chat_bucket.acquire()
+        await self.bucket.acquire()
+
+    def evict_idle(self) -> None:
+        """Drops the buckets that have refilled, at most once per refill time."""
+        now = time.monotonic()
+        refill = 1 / self.chat_rate
+        if now - self.evicted_at < refill:
+            return
+        self.evicted_at = now
+        self.chats = {
+            chat_id: bucket
+            for chat_id, bucket in self.chats.items()
+            if now - bucket.updated < refill or now < bucket.blocked_until
+        }
+
+    def block(self, seconds: float) -> None:
+        """Pauses all sending, e.g. after Telegram's flood control kicked in."""
+        self.bucket.block(seconds)
+
+
+@lru_cache
+def get_limiter(rate: float, chat_rate: float) -> RateLimiter:
+    """Returns the `RateLimiter` shared by all fan-outs of this process."""
+    return RateLimiter(rate, chat_rate)
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """Returns the `RetryAfter` delay in seconds (an int or a timedelta, depending on the PTB version)."""
+    retry_after = error.retry_after
+    if hasattr(retry_after, "total_seconds"):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+async def send_message(bot, chat_id, text, limiter, report, retries) -> None:
+    """
+    Sends one message, retrying flood-control and network errors.
+
+    Errors are isolated per recipient: a chat that blocked the bot or a message
+    Telegram rejects is counted as failed and logged, and never aborts the fan-out.
+
+    Args:
+        bot (Bot): The Telegram bot to send with.
+        chat_id (str): The recipient chat.
+        text (str): The message text.
+        limiter (RateLimiter): The rate limiter shared by all senders.
+        report (DeliveryReport): The report to update.
+        retries (int): How many times a failed send may be retried.
+    """
+    for attempt in range(retries + 1):
+        await limiter.acquire(chat_id)
+        started = time.perf_counter()
+        try:
+            await bot.send_message(chat_id=chat_id, text=text)
+        except RetryAfter as e:
+            reason = "flood_control"
+            limiter.block(retry_after_seconds(e))
+        except BadRequest as e:
+            logging.warning(f"Telegram rejected the message to {chat_id}: {e}")
+            break
+        except NetworkError:
+            reason = "network"
+            await asyncio.sleep(RETRY_BACKOFF * 2**attempt)
+        except TelegramError as e:
+            logging.warning(f"Could not notify {chat_id}: {e}")
+            break
+        except Exception as e:
+            logging.exception(f"Error notifying {chat_id}: {e}")
+            break
+        else:
+            report.sent += 1
+            metrics.NOTIFICATION_SEND_LATENCY.observe(time.perf_counter() - started)
+            metrics.NOTIFICATIONS.inc("sent")
+            return
+        if attempt < retries:
+            report.retried += 1
+            metrics.NOTIFICATION_RETRIES.inc(reason)
+    report.failed += 1
+    metrics.NOTIFICATIONS.inc("failed")
+
+
+def message_text(articles) -> str:
+    """
+    Returns the message announcing `articles`.
+
+    A single article is sent with its title and content. Several articles are
+    sent as one digest listing their titles. Either is cut to Telegram's message
+    limit, which it would otherwise reject.
+    """
+    if len(articles) == 1:
+        text = f"Новая статья:\n\n{articles[0].title}\n\n{articles[0].content}"
+    else:
+        text = f"Новые статьи ({len(articles)}):\n\n" + "\n".join(
+            f"• {article.title}" for article in articles
+        )
+    if len(text) > MESSAGE_LIMIT:
+        text = text[: MESSAGE_LIMIT - 1] + "…"
+    return text
+
+
+async def notify_subscribers(*articles) -> DeliveryReport:
     """
-    Asynchronously notifies subscribers about a new blog article.
+    Asynchronously announces new blog articles to every subscriber.
 
-    This function retrieves all subscribers from the `Subscriber` model,
-    creates a Telegram bot instance using the `TELEGRAM_TOKEN` from Django settings,
-    and sends a message to each subscriber's chat ID with details about the new article.
+    All `articles` go out as one message per subscriber, built by `message_text`:
+    the article itself, or a digest of titles for several, so a burst of
+    publications costs one fan-out. The chat IDs are streamed from the database
+    in chunks of `SUBSCRIBER_CHUNK_SIZE` (a server-side cursor on PostgreSQL) and
+    fed to the senders through a bounded queue, so memory does not grow with the
+    number of subscribers and the first message goes out before the table has
+    been read. `TELEGRAM_SEND_CONCURRENCY` senders share one connection pool and
+    the process-wide `RateLimiter`, tuned to `TELEGRAM_SEND_RATE` messages per
+    second overall and `TELEGRAM_CHAT_SEND_RATE` per chat. Flood-control
+    (`RetryAfter`) responses pause all senders for the requested time; other
+    failures only affect their own recipient.
+
+    Delivery is at least once: if the fan-out fails as a whole part way through,
+    the caller retries the whole digest, and subscribers who already got it get
+    it again.
 
     Args:
-        article (object): The new blog article object to be notified about.
-            Its attributes (`title` and `content`) are expected to be strings.
+        *articles (object): The new blog articles to be notified about.
+            Their attributes (`title` and `content`) are expected to be strings.
+
+    Returns:
+        DeliveryReport: How many messages were sent, failed and retried.
 
     Raises:
-        Exception: Any exception that occurs during the notification process.
-            The exception details are logged to the `telegram_bot.log` file.
-    """
-    try:
-        subscribers = await sync_to_async(list)(Subscriber.objects.all())
-        bot = Bot(token=settings.TELEGRAM_TOKEN)
-        for subscriber in subscribers:
-            await bot.send_message(
-                chat_id=subscriber.chat_id,
-                text=f"Новая статья:\n\n{article.title}\n\n{article.content}",
+        Exception: Errors that stop the fan-out as a whole (e.g. the database is
+            unavailable); they are left to the caller, which retries the digest.
+    """
+    concurrency = settings.TELEGRAM_SEND_CONCURRENCY
+    limiter = get_limiter(settings.TELEGRAM_SEND_RATE, settings.TELEGRAM_CHAT_SEND_RATE)
+    report = DeliveryReport()
+    text = message_text(articles)
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def produce():
+        chat_ids = (
+            Subscriber.objects.order_by("pk")
+            .values_list("chat_id", flat=True)
+            .aiterator(chunk_size=SUBSCRIBER_CHUNK_SIZE)
+        )
+        async for chat_id in chat_ids:
+            await queue.put(chat_id)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def sender(bot):
+        while (chat_id := await queue.get()) is not None:
+            await send_message(
+                bot, chat_id, text, limiter, report, settings.TELEGRAM_SEND_RETRIES
             )
-    except Exception as e:
-        logging.exception(f"Error in notify_subscribers: {e}")
+
+    request = HTTPXRequest(connection_pool_size=concurrency)
+    async with Bot(token=settings.TELEGRAM_TOKEN, request=request) as bot:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(produce())
+            for _ in range(concurrency):
+                group.create_task(sender(bot))
+    titles = ", ".join(repr(article.title) for article in articles)
+    logging.info(
+        f"Notified subscribers about {titles}: {report.sent} sent, "
+        f"{report.failed} failed, {report.retried} retries"
+    )
+    return report
@@ -1,5 +1,4 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
 
 
 class UsersConfig(AppConfig):
@@ -8,5 +7,3 @@ class UsersConfig(AppConfig):
 
     def ready(self) -> None:
         from . import signals
-
-        post_save.connect(signals.create_user_profile)
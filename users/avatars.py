@@ -0,0 +1,116 @@
+"""
+Background processing of uploaded avatars.
+
+`Profile.save` schedules `process_avatar` when the avatar file changes. It runs
+after the transaction commits, in a small thread pool, so profile updates do not
+wait for image decoding. The job writes a JPEG and a WebP copy of the avatar for
+every size in `AVATAR_SIZES` next to the original and then marks the profile as
+processed; until then templates fall back to the original file. Avatars whose job
+was lost (e.g. the process restarted) are picked up by `manage.py
+process_avatars`.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Square bounding boxes, in pixels, of the precomputed avatar variants.
+AVATAR_SIZES = (64, 200, 400)
+# Output formats of every variant: (PIL format, file extension, save options).
+AVATAR_FORMATS = (
+    ("JPEG", "jpg", {"quality": 85, "optimize": True}),
+    ("WEBP", "webp", {"quality": 80, "method": 4}),
+)
+AVATAR_WORKERS = 2
+
+_executor = None
+
+
+def variant_name(name, size, extension):
+    """Returns the storage name of one variant of the avatar stored as `name`."""
+    root, _ = os.path.splitext(name)
+    return f"{root}_{size}.{extension}"
+
+
+def render_variants(file):
+    """Decodes an image once and encodes every size and format of it.
+
+    For JPEG files the decoder is put in draft mode, which lets libjpeg scale the
+    image down by up to 8x while decoding, so large photos are never fully decoded.
+
+    Parameters:
+    - file: An open file with the original image.
+
+    Returns:
+    - A dict mapping `(size, extension)` to the encoded bytes."""
+    image = Image.open(file)
+    largest = max(AVATAR_SIZES)
+    image.draft("RGB", (largest, largest))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+    variants = {}
+    for size in sorted(AVATAR_SIZES, reverse=True):
+        image.thumbnail((size, size), Image.LANCZOS)
+        for image_format, extension, options in AVATAR_FORMATS:
+            frame = image.convert("RGB") if image_format == "JPEG" else image
+            buffer = BytesIO()
+            frame.save(buffer, image_format, **options)
+            variants[size, extension] = buffer.getvalue()
+    return variants
+
+
+def process_avatar(profile_id, name):
+    """Writes the variants of an avatar and marks the profile as processed.
+
+    The profile is only updated if it still uses the avatar `name`, so a job for
+    an avatar that has been replaced in the meantime cannot mark the new one as done.
+
+    Parameters:
+    - profile_id: The primary key of the profile.
+    - name: The storage name of the uploaded avatar."""
+    from .models import Profile
+
+    storage = Profile._meta.get_field("avatar").storage
+    with storage.open(name) as file:
+        variants = render_variants(file)
+    for (size, extension), content in variants.items():
+        target = variant_name(name, size, extension)
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(content))
+    Profile.objects.filter(pk=profile_id, avatar=name).update(avatar_processed=True)
+
+
+def run_in_background(profile_id, name):
+    """Runs `process_avatar` in a worker thread with its own database connection."""
+    try:
+        process_avatar(profile_id, name)
+    except Exception as e:
+        logger.exception(f"Error processing avatar {name} of profile {profile_id}: {e}")
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=AVATAR_WORKERS, thread_name_prefix="avatars"
+        )
+    return _executor
+
+
+def schedule_avatar_processing(profile):
+    """Queues the processing of `profile.avatar` for after the current transaction."""
+    profile_id, name = profile.pk, profile.avatar.name
+    transaction.on_commit(
+        lambda: get_executor().submit(run_in_background, profile_id, name)
+    )
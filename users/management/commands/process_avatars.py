@@ -0,0 +1,36 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from users.avatars import process_avatar
+from users.models import Profile
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Builds the resized variants of avatars that have not been processed yet.
+
+    Uploads are normally processed in the background right after they are saved;
+    this command catches up on avatars uploaded before the variants existed and on
+    jobs lost to a process restart."""
+
+    help = "Build missing avatar sizes."
+
+    def handle(self, *args, **options):
+        default = Profile._meta.get_field("avatar").get_default()
+        pending = (
+            Profile.objects.filter(avatar_processed=False)
+            .exclude(avatar__in=["", default])
+            .values_list("pk", "avatar")
+        )
+        processed = failed = 0
+        for profile_id, name in pending.iterator():
+            try:
+                process_avatar(profile_id, name)
+            except Exception as e:
+                logger.exception(f"Error processing avatar {name}: {e}")
+                failed += 1
+            else:
+                processed += 1
+        self.stdout.write(f"Processed {processed} avatar(s), {failed} failed.")
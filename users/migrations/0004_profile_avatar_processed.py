@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_profile_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_processed',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.db import models
-from PIL import Image
+from .avatars import AVATAR_SIZES, schedule_avatar_processing, variant_name
 
 
 class Profile(models.Model):
@@ -10,14 +10,26 @@ class Profile(models.Model):
     Attributes:
     - user: A one-to-one relationship to the User model.
     - avatar: Field for uploading a profile picture.
+    - avatar_processed: Whether the resized variants of the avatar have been written.
 
     Methods:
     - __str__: Returns a string representation of the Profile object.
-    - save: Overridden method to save the Profile object while resizing the uploaded image.
+    - save: Overridden method to save the Profile object and schedule the resizing
+      of a newly uploaded image.
+    - avatar_url: Returns the URL of the avatar variant for a display size.
     """
 
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     avatar = models.ImageField(default="avatars/default.jpg", upload_to="avatars")
+    avatar_processed = models.BooleanField(default=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remembers the avatar loaded from the database to detect changes on save."""
+        instance = super().from_db(db, field_names, values)
+        if "avatar" in field_names:
+            instance._loaded_avatar = values[field_names.index("avatar")]
+        return instance
 
     def __str__(self):
         """Returns a string representation of the Profile object.
@@ -26,16 +38,49 @@ class Profile(models.Model):
         - A string containing the username and the word "Profile"."""
         return f"{self.user.username} Profile"
 
+    def avatar_changed(self):
+        """Returns True if the avatar differs from the one loaded from the database."""
+        if "avatar" in self.get_deferred_fields():
+            return False
+        return self.avatar.name != getattr(self, "_loaded_avatar", None)
+
     def save(self, *args, **kwargs):
-        """Overridden method to save a Profile object with resizing the loaded image.
+        """Overridden method to save a Profile object.
+
+        The image is not touched here. When a new avatar has been uploaded, its
+        resized variants are built in the background once the transaction commits
+        (see `users.avatars`); saves that keep the avatar do no image work at all.
 
         Parameters:
         - *args: Position arguments.
         - **kwargs: Named arguments."""
+        changed = self.avatar_changed()
+        default = self._meta.get_field("avatar").get_default()
+        process = changed and self.avatar.name not in ("", default)
+        if changed:
+            self.avatar_processed = False
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "avatar" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "avatar_processed"}
         super().save(*args, **kwargs)
-        img = Image.open(self.avatar.path)
+        self._loaded_avatar = self.avatar.name
+        if process:
+            schedule_avatar_processing(self)
+
+    def avatar_url(self, size, extension="jpg"):
+        """Returns the URL of the smallest avatar variant at least `size` pixels wide.
 
-        if img.height > 300 or img.width > 300:
-            output_size = (300, 300)
-            img.thumbnail(output_size)
-            img.save(self.avatar.path)
+        Falls back to the original upload while the variants are being built.
+
+        Parameters:
+        - size: The display size in pixels.
+        - extension: "jpg" or "webp".
+
+        Returns:
+        - A URL, or None if the variants are not ready and `extension` is not "jpg"."""
+        if not self.avatar_processed:
+            return self.avatar.url if extension == "jpg" else None
+        fitting = [candidate for candidate in AVATAR_SIZES if candidate >= size]
+        variant = min(fitting) if fitting else max(AVATAR_SIZES)
+        storage = self.avatar.storage
+        return storage.url(variant_name(self.avatar.name, variant, extension))
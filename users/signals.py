@@ -1,4 +1,3 @@
-from sys import argv
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
@@ -6,19 +5,20 @@ from .models import Profile
 
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
     """Creates a user profile when a new user is created.
 
     Parameters:
     - sender: The model class that initiates the signal.
     - instance: Instance of the object on which the operation is performed.
     - created: Flag indicating whether the object was created.
+    - raw: True while fixtures are loaded; they bring their own profiles.
     - **kwargs: Additional arguments.
 
     Actions:
-    - When creating a new user, creates a user profile if it has not already been created.
+    - When creating a new user, creates their profile with a single INSERT. A
+      user that has just been created cannot have a profile yet, so there is
+      nothing to look up first.
     """
-    if created and isinstance(instance, User) and "test" not in argv:
-        user = User.objects.filter(id=instance.id)
-        if not Profile.objects.filter(user_id=instance.id) and user:
-            Profile.objects.create(user=user[0])
+    if created and not raw:
+        Profile.objects.create(user=instance)
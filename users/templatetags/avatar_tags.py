@@ -0,0 +1,26 @@
+from django import template
+
+register = template.Library()
+
+
+@register.inclusion_tag("users/avatar.html")
+def avatar_picture(profile, size):
+    """Renders a profile's avatar at `size` pixels with the best fitting variants.
+
+    The WebP variants are offered to browsers that support them, and the
+    double-size variant is offered to high-density screens.
+
+    Parameters:
+    - profile: The Profile object.
+    - size: The display size in pixels.
+
+    Returns:
+    - The template context for `users/avatar.html`."""
+    return {
+        "profile": profile,
+        "size": size,
+        "src": profile.avatar_url(size),
+        "src_2x": profile.avatar_url(size * 2),
+        "webp": profile.avatar_url(size, "webp"),
+        "webp_2x": profile.avatar_url(size * 2, "webp"),
+    }
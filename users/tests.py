@@ -1,3 +1,161 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+from blogify.testing import QueryBudgetMixin
+from .avatars import AVATAR_SIZES, process_avatar, variant_name
+from .models import Profile
 
-# Create your tests here.
+
+def image_bytes(size=(1600, 1200), image_format="JPEG", mode="RGB", color="teal"):
+    buffer = BytesIO()
+    Image.new(mode, size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class AvatarTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="pic", password="password123")
+        self.profile = self.user.profile
+
+    def upload(self, profile, content=None, name="me.jpg"):
+        with self.captureOnCommitCallbacks() as callbacks:
+            profile.avatar.save(name, ContentFile(content or image_bytes()))
+        return callbacks
+
+    def test_saves_without_a_new_avatar_do_no_image_work(self):
+        profile = Profile.objects.get(pk=self.profile.pk)
+        with mock.patch("users.avatars.Image.open") as image_open:
+            with self.captureOnCommitCallbacks() as callbacks:
+                profile.save()
+        image_open.assert_not_called()
+        self.assertEqual(callbacks, [])
+
+    def test_new_avatar_is_processed_after_commit(self):
+        profile = Profile.objects.get(pk=self.profile.pk)
+        with mock.patch("users.avatars.get_executor") as get_executor:
+            callbacks = self.upload(profile)
+            get_executor.assert_not_called()
+            callbacks[0]()
+        get_executor.return_value.submit.assert_called_once_with(
+            mock.ANY, profile.pk, profile.avatar.name
+        )
+        self.assertFalse(Profile.objects.get(pk=profile.pk).avatar_processed)
+
+    def test_variants_are_written_in_every_size_and_format(self):
+        self.upload(self.profile)
+        name = self.profile.avatar.name
+
+        process_avatar(self.profile.pk, name)
+
+        storage = self.profile.avatar.storage
+        for size in AVATAR_SIZES:
+            for extension, image_format in [("jpg", "JPEG"), ("webp", "WEBP")]:
+                with storage.open(variant_name(name, size, extension)) as file:
+                    image = Image.open(file)
+                    self.assertEqual(image.format, image_format)
+                    self.assertEqual(image.size, (size, size * 3 // 4))
+        self.assertTrue(Profile.objects.get(pk=self.profile.pk).avatar_processed)
+
+    def test_transparent_png_keeps_alpha_in_webp(self):
+        self.upload(self.profile, image_bytes((500, 500), "PNG", "RGBA", (0, 128, 128, 100)), "me.png")
+        process_avatar(self.profile.pk, self.profile.avatar.name)
+
+        storage = self.profile.avatar.storage
+        with storage.open(variant_name(self.profile.avatar.name, 64, "webp")) as file:
+            self.assertEqual(Image.open(file).mode, "RGBA")
+
+    def test_job_for_a_replaced_avatar_does_not_mark_the_new_one(self):
+        self.upload(self.profile, name="old.jpg")
+        old_name = self.profile.avatar.name
+        self.upload(self.profile, name="new.jpg")
+
+        process_avatar(self.profile.pk, old_name)
+
+        self.assertFalse(Profile.objects.get(pk=self.profile.pk).avatar_processed)
+
+    def test_templates_use_the_fitting_variant(self):
+        self.upload(self.profile)
+        profile = Profile.objects.get(pk=self.profile.pk)
+        template = Template("{% load avatar_tags %}{% avatar_picture profile 200 %}")
+
+        html = template.render(Context({"profile": profile}))
+        self.assertIn(f'src="{profile.avatar.url}"', html)
+        self.assertNotIn("webp", html)
+
+        call_command("process_avatars", stdout=mock.Mock())
+        profile.refresh_from_db()
+        self.assertEqual(profile.avatar_url(150), profile.avatar.url[:-4] + "_200.jpg")
+        html = template.render(Context({"profile": profile}))
+        self.assertIn("_200.webp 1x, ", html)
+        self.assertIn("_400.jpg 2x", html)
+
+    def test_profile_update_does_not_process_the_upload(self):
+        self.client.login(username="pic", password="password123")
+        upload = SimpleUploadedFile("me.jpg", image_bytes(), content_type="image/jpeg")
+
+        with mock.patch("users.avatars.render_variants") as render_variants:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.post(
+                    "/profile_update/",
+                    {"username": "pic", "email": "", "avatar": upload},
+                )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(callbacks), 1)
+        render_variants.assert_not_called()
+
+
+class ProfileQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="budget", password="password123")
+        self.client.login(username="budget", password="password123")
+
+    def populate(self, size):
+        for n in range(User.objects.count(), size):
+            User.objects.create_user(username=f"user{n}")
+
+    def test_profile_pages(self):
+        self.assertQueryBudgetAtSizes(
+            "ProfileDetailView GET",
+            3,
+            self.populate,
+            lambda: self.client.get("/profile/"),
+        )
+        self.assertQueryBudgetAtSizes(
+            "ProfileUpdateView GET",
+            3,
+            self.populate,
+            lambda: self.client.get("/profile_update/"),
+        )
+
+    def test_profile_update(self):
+        data = {"username": "budget", "email": "budget@example.com"}
+        with self.assertQueryBudget("ProfileUpdateView POST", 6):
+            response = self.client.post("/profile_update/", data)
+        self.assertEqual(response.status_code, 302)
+
+    def test_user_creation_creates_the_profile_with_one_insert(self):
+        counter = iter(range(1000))
+        self.assertQueryBudgetAtSizes(
+            "create_user_profile",
+            2,
+            self.populate,
+            lambda: User.objects.create(username=f"new{next(counter)}"),
+        )
+        self.assertEqual(Profile.objects.count(), User.objects.count())